@@ -0,0 +1,91 @@
+"""Streaming ZIP downloads of many stored files."""
+import io
+import zipfile
+from pathlib import Path
+from typing import Iterable, Iterator, Optional
+from fastapi.responses import StreamingResponse
+from core import compressed_formats, media_type_aliases
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class _ChunkSink(io.RawIOBase):
+    """
+    Write-only, unseekable stream that hands written bytes back to the caller.
+
+    ZipFile notices the stream cannot seek and writes each entry's sizes in a
+    data descriptor after its contents, so nothing has to be rewound.
+    """
+    def __init__(self):
+        self.chunks: list[bytes] = []
+
+    def writable(self) -> bool:
+        return True
+
+    def write(self, data) -> int:
+        self.chunks.append(bytes(data))
+        return len(data)
+
+    def drain(self) -> Iterator[bytes]:
+        """Yield and forget everything written so far."""
+        chunks, self.chunks = self.chunks, []
+        yield from chunks
+
+
+def unique_names(names: Iterable[str]) -> list[str]:
+    """Suffix repeated archive names with (1), (2), ... so no entry shadows another."""
+    seen = set()
+    result = []
+    for name in names:
+        stem, dot, extension = name.rpartition('.')
+        if not dot:
+            stem, extension = name, ''
+        candidate = name
+        counter = 0
+        while candidate in seen:
+            counter += 1
+            candidate = f"{stem} ({counter}){dot}{extension}"
+        seen.add(candidate)
+        result.append(candidate)
+    return result
+
+
+def stream_zip(entries: list[tuple[str, Path]], filename: str, notes: Optional[dict[str, str]] = None) -> StreamingResponse:
+    """
+    Stream a ZIP archive of files on disk, built while it is being sent.
+
+    Nothing is staged in memory or a temporary file, at most one chunk of
+    one file is held at a time. Already-compressed formats are stored as is,
+    everything else is deflated.
+
+    Args:
+        entries: (name inside the archive, path on disk) for each file
+        filename: Name the client should save the archive under
+        notes: Short text files to add after the entries, by name inside the archive
+    """
+    def generate():
+        sink = _ChunkSink()
+        with zipfile.ZipFile(sink, mode='w', allowZip64=True) as archive:
+            for name, path in entries:
+                # Uploads are stored under their checksum, the archive name carries the extension
+                extension = Path(name).suffix.lstrip('.').lower()
+                info = zipfile.ZipInfo.from_file(path, arcname=name)
+                if media_type_aliases.get(extension, extension) in compressed_formats:
+                    info.compress_type = zipfile.ZIP_STORED
+                else:
+                    info.compress_type = zipfile.ZIP_DEFLATED
+                with open(path, 'rb') as source, archive.open(info, mode='w', force_zip64=True) as destination:
+                    while chunk := source.read(CHUNK_SIZE):
+                        destination.write(chunk)
+                        yield from sink.drain()
+                yield from sink.drain()
+            for name, text in (notes or {}).items():
+                archive.writestr(name, text, compress_type=zipfile.ZIP_DEFLATED)
+        # Closing the archive writes the central directory
+        yield from sink.drain()
+
+    return StreamingResponse(
+        generate(),
+        media_type="application/zip",
+        headers={"Content-Disposition": f'attachment; filename="{filename}"'}
+    )
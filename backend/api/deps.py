@@ -1,30 +1,48 @@
 """FastAPI dependency injection functions for database connections."""
 from typing import Generator
-from db import FileDB, ConversionDB, ConversionRelationsDB
-
-
-def get_file_db() -> Generator[FileDB, None, None]:
-    """Dependency that provides a FileDB instance and ensures cleanup."""
-    db = FileDB()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_conversion_db() -> Generator[ConversionDB, None, None]:
-    """Dependency that provides a ConversionDB instance and ensures cleanup."""
-    db = ConversionDB()
-    try:
-        yield db
-    finally:
-        db.close()
-
-
-def get_conversion_relations_db() -> Generator[ConversionRelationsDB, None, None]:
-    """Dependency that provides a ConversionRelationsDB instance and ensures cleanup."""
-    db = ConversionRelationsDB()
-    try:
-        yield db
-    finally:
-        db.close()
+from fastapi import Depends
+from db import get_connection_pool, PooledConnection, FileDB, ConversionDB, ConversionRelationsDB, JobDB, BlobDB, UploadDB
+
+
+def get_db_connection() -> Generator[PooledConnection, None, None]:
+    """
+    Dependency that borrows a pooled connection while the endpoint runs.
+
+    FastAPI caches dependencies per request, so every database dependency
+    below shares this one connection and can write in a single transaction.
+    They depend on it with function scope: the connection goes back to the
+    pool when the endpoint returns, before a file download, stream or
+    background task starts, so slow clients never hold one.
+    """
+    with get_connection_pool().connection() as conn:
+        yield conn
+
+
+def get_file_db(conn: PooledConnection = Depends(get_db_connection, scope="function")) -> FileDB:
+    """Dependency that provides a FileDB instance on the endpoint's connection."""
+    return FileDB(conn)
+
+
+def get_conversion_db(conn: PooledConnection = Depends(get_db_connection, scope="function")) -> ConversionDB:
+    """Dependency that provides a ConversionDB instance on the endpoint's connection."""
+    return ConversionDB(conn)
+
+
+def get_conversion_relations_db(conn: PooledConnection = Depends(get_db_connection, scope="function")) -> ConversionRelationsDB:
+    """Dependency that provides a ConversionRelationsDB instance on the endpoint's connection."""
+    return ConversionRelationsDB(conn)
+
+
+def get_job_db(conn: PooledConnection = Depends(get_db_connection, scope="function")) -> JobDB:
+    """Dependency that provides a JobDB instance on the endpoint's connection."""
+    return JobDB(conn)
+
+
+def get_blob_db(conn: PooledConnection = Depends(get_db_connection, scope="function")) -> BlobDB:
+    """Dependency that provides a BlobDB instance on the endpoint's connection."""
+    return BlobDB(conn)
+
+
+def get_upload_db(conn: PooledConnection = Depends(get_db_connection, scope="function")) -> UploadDB:
+    """Dependency that provides an UploadDB instance on the endpoint's connection."""
+    return UploadDB(conn)
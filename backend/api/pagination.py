@@ -0,0 +1,119 @@
+"""Keyset pagination and streaming helpers for list endpoints."""
+import base64
+import json
+from typing import Callable, Iterator, Literal, Optional
+from fastapi import HTTPException
+from fastapi.encoders import jsonable_encoder
+from fastapi.responses import StreamingResponse
+from db import get_connection_pool, PooledConnection
+
+MAX_PAGE_SIZE = 1000
+
+StreamFormat = Literal["json", "ndjson"]
+
+
+def encode_cursor(row: dict) -> str:
+    """Opaque cursor pointing just past the given row."""
+    raw = json.dumps([row['created_at'], row['id']]).encode()
+    return base64.urlsafe_b64encode(raw).decode()
+
+
+def decode_cursor(cursor: Optional[str]) -> tuple[str, str] | None:
+    """Turn a cursor from encode_cursor() back into (created_at, id)."""
+    if cursor is None:
+        return None
+    try:
+        created_at, row_id = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        return str(created_at), str(row_id)
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+
+def fetch_size(limit: Optional[int]) -> Optional[int]:
+    """Rows to fetch for a page, one extra tells whether another page follows."""
+    return None if limit is None else limit + 1
+
+
+def paginate(rows: Iterator[dict], limit: Optional[int]) -> tuple[list[dict], Optional[str]]:
+    """
+    Collect one page from rows fetched with fetch_size(limit).
+
+    Returns:
+        The page and the cursor of the next page, None if this is the last one
+    """
+    items = []
+    for row in rows:
+        if limit is not None and len(items) == limit:
+            return items, encode_cursor(items[-1])
+        items.append(row)
+    return items, None
+
+
+def fetch_page(
+    fetch: Callable[[PooledConnection, Optional[int]], Iterator[dict]],
+    limit: Optional[int]
+) -> tuple[list[dict], Optional[str]]:
+    """
+    Fetch one page on a pooled connection borrowed for this call only.
+
+    Listing routes take no database dependency, so a streamed listing never
+    holds a request connection while borrowing its own.
+
+    Args:
+        fetch: Called with a pooled connection and a row limit, yields rows
+        limit: Page size, None to fetch everything
+
+    Returns:
+        The page and the cursor of the next page, see paginate()
+    """
+    with get_connection_pool().connection() as conn:
+        return paginate(fetch(conn, fetch_size(limit)), limit)
+
+
+def stream_listing(
+    key: str,
+    fetch: Callable[[PooledConnection, Optional[int]], Iterator[dict]],
+    limit: Optional[int],
+    stream_format: StreamFormat,
+    transform: Callable[[dict], dict] = lambda row: row
+) -> StreamingResponse:
+    """
+    Stream a listing row by row straight from the database cursor.
+
+    "json" produces the same body as the buffered endpoint, {key: [...],
+    "next_cursor": ...}. "ndjson" produces one record per line, followed by
+    a {"next_cursor": ...} line only when another page exists.
+
+    Args:
+        key: Name of the list in the JSON body
+        fetch: Called with a pooled connection and a row limit, yields rows
+        limit: Page size, None to stream everything
+        stream_format: "json" or "ndjson"
+        transform: Applied to each row before it is serialized
+    """
+    def generate():
+        # Borrowed once the body starts and held until the last row, the route itself holds none
+        with get_connection_pool().connection() as conn:
+            if stream_format == "json":
+                yield f'{{"{key}": ['
+            last_row = None
+            next_cursor = None
+            count = 0
+            for row in fetch(conn, fetch_size(limit)):
+                if limit is not None and count == limit:
+                    next_cursor = encode_cursor(last_row)
+                    break
+                last_row = row
+                record = json.dumps(jsonable_encoder(transform(row)))
+                if stream_format == "json":
+                    yield ("," if count else "") + record
+                else:
+                    yield record + "\n"
+                count += 1
+            if stream_format == "json":
+                yield f'], "next_cursor": {json.dumps(next_cursor)}}}'
+            elif next_cursor is not None:
+                yield json.dumps({"next_cursor": next_cursor}) + "\n"
+
+    media_type = "application/json" if stream_format == "json" else "application/x-ndjson"
+    return StreamingResponse(generate(), media_type=media_type)
@@ -1,22 +1,70 @@
 import json
-from pathlib import Path
 import uuid
-import hashlib
-from fastapi import APIRouter, Depends, HTTPException
-from converters import ConverterInterface
-from registry import ConverterRegistry
+from typing import Optional, Sequence
+from fastapi import APIRouter, Depends, HTTPException, Query
+from fastapi.responses import StreamingResponse
+from registry import ConversionStep, get_converter_registry
 from core import get_settings, sanitize_extension, delete_file_and_metadata
-from db import ConversionDB, FileDB, ConversionRelationsDB
-from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db
-from api.schemas import ConversionRequest, ConversionListResponse, FileMetadata, ErrorResponse, FileDeleteResponse
+from db import PooledConnection, ConversionDB, FileDB, ConversionRelationsDB, JobDB
+from workers import get_job_queue, JOB_QUEUED, JOB_RUNNING
+from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db, get_job_db
+from api.archive import stream_zip, unique_names
+from api.pagination import MAX_PAGE_SIZE, StreamFormat, decode_cursor, fetch_page, stream_listing
+from api.schemas import ConversionRequest, ConversionOptions, BatchConversionRequest, BatchMetadata, ConversionListResponse, JobMetadata, ErrorResponse, FileDeleteResponse
+from api.routes.files import archive_entries
+from api.routes.jobs import job_to_response, batch_to_response
 
 
 router = APIRouter(prefix="/conversions", tags=["conversions"])
-registry = ConverterRegistry()
 settings = get_settings()
-UPLOAD_DIR = settings.upload_dir
-TEMP_DIR = settings.tmp_dir
-CONVERTED_DIR = settings.output_dir
+registry = get_converter_registry()
+
+
+def new_job(og_id: str, output_format: str, plan: Sequence[ConversionStep], options: dict | None = None) -> dict:
+    """Build the JobDB row for a queued conversion of a file along a conversion plan."""
+    params = {
+        'output_format': output_format,
+        'steps': [[step.converter.__name__, step.input_format, step.output_format] for step in plan]
+    }
+    if options:
+        params['options'] = options
+    return {
+        'id': str(uuid.uuid4()),
+        'converter_id': ' -> '.join(step.converter.__name__ for step in plan),
+        'status': JOB_QUEUED,
+        'params_json': json.dumps(params),
+        'original_file_id': og_id
+    }
+
+
+def conversion_options(options: Optional[ConversionOptions], plan: Sequence[ConversionStep]) -> tuple[dict, Optional[str]]:
+    """
+    Turn requested options into the dict stored with the job.
+
+    Returns:
+        The options and an error message if no step of the plan supports one of them
+    """
+    if options is None:
+        return {}, None
+    requested = options.model_dump(exclude_none=True)
+    supported = set().union(*(step.converter.supported_options for step in plan))
+    unsupported = sorted(requested.keys() - supported)
+    if unsupported:
+        return requested, f"Unsupported options for {plan[0].input_format} to {plan[-1].output_format}: {', '.join(unsupported)}"
+    return requested, None
+
+
+def conversion_plan(input_format: str, output_format: str, options: Optional[ConversionOptions]) -> Optional[tuple[ConversionStep, ...]]:
+    """
+    Cheapest plan for a conversion.
+
+    A file converted to its own format is rewritten in one step when options
+    are given, for instance to crop an image and keep its format.
+    """
+    plan = registry.plan_conversion(input_format, output_format)
+    if plan is None and options is not None and registry.get_normalized_format(input_format) == registry.get_normalized_format(output_format):
+        plan = registry.plan_rewrite(input_format, options.model_dump(exclude_none=True).keys())
+    return plan
 
 
 @router.get(
@@ -25,38 +73,31 @@ CONVERTED_DIR = settings.output_dir
         responses={
             200: {
                 "model": ConversionListResponse,
-                "description": "List of completed conversions with original and converted file metadata"
+                "description": "List of completed conversions with original and converted file metadata, newest first"
+            },
+            400: {
+                "model": ErrorResponse,
+                "description": "Invalid cursor"
             }
         }
 )
 def list_conversions(
-    conv_db: ConversionDB = Depends(get_conversion_db),
-    conv_rel_db: ConversionRelationsDB = Depends(get_conversion_relations_db)
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size, omit to list every conversion"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    stream: Optional[StreamFormat] = Query(None, description="Stream the listing row by row as json or ndjson")
 ):
-    """List all completed conversions with their converted and original file metadata."""
-    # Get converted files and relations with denormalized original file metadata
-    converted_files = conv_db.list_files()
-    converted_files_dict = {f['id']: f for f in converted_files}
-
-    relations = conv_rel_db.list_relations()
-    # For each relation, create a conversion-centric record with original file metadata from the relation
-    # This uses denormalized data so original files can be deleted without breaking history
-    conversion_records = []
-    for rel in relations:
-        conv_id = rel['converted_file_id']
-        if conv_id in converted_files_dict:
-            record = dict(converted_files_dict[conv_id])
-            # Build original_file metadata from denormalized relation data
-            record['original_file'] = {
-                'id': rel['original_file_id'],
-                'original_filename': rel['original_filename'],
-                'media_type': rel['original_media_type'],
-                'extension': rel['original_extension'],
-                'size_bytes': rel['original_size_bytes']
-            }
-            conversion_records.append(record)
-    
-    return {"conversions": conversion_records}
+    """List completed conversions with their converted and original file metadata."""
+    # Single JOIN of converted files and relations, original file metadata comes from the
+    # denormalized relation data so original files can be deleted without breaking history
+    after = decode_cursor(cursor)
+
+    def fetch(conn: PooledConnection, size: Optional[int]):
+        return ConversionRelationsDB(conn).iter_conversion_records(size, after)
+
+    if stream is not None:
+        return stream_listing("conversions", fetch, limit, stream)
+    conversions, next_cursor = fetch_page(fetch, limit)
+    return {"conversions": conversions, "next_cursor": next_cursor}
 
 
 @router.post(
@@ -64,12 +105,12 @@ def list_conversions(
         summary="Create a new conversion",
         responses={
             200: {
-                "model": FileMetadata,
-                "description": "Successful conversion - returns metadata of the converted file"
+                "model": JobMetadata,
+                "description": "Conversion queued - returns the job tracking it, poll /api/jobs/{id} for the result"
             },
             400: {
                 "model": ErrorResponse,
-                "description": "Invalid input or conversion error (no converter found)"
+                "description": "Invalid input or conversion error (no converter found, unsupported options)"
             },
             404: {
                 "model": ErrorResponse,
@@ -77,54 +118,191 @@ def list_conversions(
             }
         }
 )
-async def create_conversion(
+def create_conversion(
     conversion_request: ConversionRequest,
     file_db: FileDB = Depends(get_file_db),
     conversion_db: ConversionDB = Depends(get_conversion_db),
-    conversion_relations_db: ConversionRelationsDB = Depends(get_conversion_relations_db)
+    job_db: JobDB = Depends(get_job_db)
 ):
-    """Create a new conversion for a previously uploaded file."""
+    """Queue a new conversion for a previously uploaded file."""
     og_id = conversion_request.id
     output_format = sanitize_extension(conversion_request.output_format)
     og_metadata = file_db.get_file_metadata(og_id)
-    input_format = og_metadata['media_type']
-    converted_id = str(uuid.uuid4())
-    converted_metadata = dict(og_metadata)
 
     # Ensure the original file was uploaded and exists in the database
     if og_metadata is None:
         raise HTTPException(status_code=404, detail=f"No file found with id {og_id}")
-    
-    # Find the appropriate converter for this conversion
-    converter_type = registry.get_converter_for_conversion(input_format, output_format)
-    if converter_type is None:
+    input_format = og_metadata['media_type']
+
+    # Find the cheapest chain of converters for this conversion
+    plan = conversion_plan(input_format, output_format, conversion_request.options)
+    if plan is None:
         raise HTTPException(status_code=400, detail=f"No converter found for {input_format} to {output_format}")
+    options, error = conversion_options(conversion_request.options, plan)
+    if error:
+        raise HTTPException(status_code=400, detail=error)
+
+    # Record the job and hand it to the worker pool, the conversion itself happens in the background
+    job = new_job(og_id, output_format, plan, options)
+    job_db.insert_job(job)
+    get_job_queue().submit(job['id'])
+
+    return job_to_response(job_db.get_job(job['id']), conversion_db)
+
+
+@router.post(
+        "/batch",
+        summary="Convert many files to one or more formats each",
+        responses={
+            200: {
+                "model": BatchMetadata,
+                "description": "Conversions queued - returns the batch tracking them, poll /api/conversions/batch/{id} for progress"
+            },
+            400: {
+                "model": ErrorResponse,
+                "description": "Some items cannot be converted, nothing was queued"
+            }
+        }
+)
+def create_batch_conversion(
+    batch_request: BatchConversionRequest,
+    file_db: FileDB = Depends(get_file_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db),
+    job_db: JobDB = Depends(get_job_db)
+):
+    """Queue conversions for many previously uploaded files at once."""
+    job_count = sum(len(item.output_formats) for item in batch_request.items)
+    if job_count > settings.batch_max_jobs:
+        raise HTTPException(status_code=400, detail=f"A batch may create at most {settings.batch_max_jobs} conversions, got {job_count}")
+
+    # Validate every item before queueing anything, so a batch is accepted or rejected as a whole
+    files = file_db.get_files_metadata([item.id for item in batch_request.items])
+    batch_id = str(uuid.uuid4())
+    jobs = []
+    errors = []
+    for item in batch_request.items:
+        og_metadata = files.get(item.id)
+        if og_metadata is None:
+            errors.append(f"No file found with id {item.id}")
+            continue
+        input_format = og_metadata['media_type']
+        for requested_format in item.output_formats:
+            output_format = sanitize_extension(requested_format)
+            plan = conversion_plan(input_format, output_format, item.options)
+            if plan is None:
+                errors.append(f"No converter found for {input_format} to {output_format} (file {item.id})")
+                continue
+            options, error = conversion_options(item.options, plan)
+            if error:
+                errors.append(f"{error} (file {item.id})")
+                continue
+            jobs.append({**new_job(item.id, output_format, plan, options), 'batch_id': batch_id})
+    if errors:
+        raise HTTPException(status_code=400, detail="; ".join(errors))
+
+    job_db.insert_jobs(jobs)
+    job_queue = get_job_queue()
+    for job in jobs:
+        job_queue.submit(job['id'])
+
+    return batch_to_response(batch_id, job_db.list_jobs_by_batch(batch_id), conversion_db)
+
+
+@router.get(
+        "/batch/{batch_id}",
+        summary="Get the status of a batch conversion",
+        responses={
+            200: {
+                "model": BatchMetadata,
+                "description": "Batch status, with per-job status and results"
+            },
+            404: {
+                "model": ErrorResponse,
+                "description": "Batch not found"
+            }
+        }
+)
+def get_batch_conversion(
+    batch_id: str,
+    job_db: JobDB = Depends(get_job_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """Get the status of every conversion in a batch."""
+    jobs = job_db.list_jobs_by_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail=f"No batch found with id {batch_id}")
+    return batch_to_response(batch_id, jobs, conversion_db)
+
+
+@router.get(
+        "/batch/{batch_id}/archive",
+        summary="Download the finished conversions of a batch as one ZIP archive",
+        response_class=StreamingResponse,
+        responses={
+            200: {
+                "content": {"application/zip": {}},
+                "description": "ZIP archive of every completed conversion, streamed as it is built. Conversions deleted since are listed in MISSING.txt"
+            },
+            404: {
+                "model": ErrorResponse,
+                "description": "Batch not found"
+            }
+        }
+)
+def download_batch_archive(
+    batch_id: str,
+    file_db: FileDB = Depends(get_file_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db),
+    job_db: JobDB = Depends(get_job_db)
+):
+    """
+    Download every completed conversion of a batch as a ZIP archive.
+
+    Converted files deleted since the batch ran are left out and listed in a
+    MISSING.txt entry, so one deletion does not cost the whole download.
+    """
+    jobs = job_db.list_jobs_by_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail=f"No batch found with id {batch_id}")
+    converted_ids = [job['converted_file_id'] for job in jobs if job['converted_file_id']]
+    entries, missing = archive_entries(converted_ids, file_db, conversion_db, skip_missing=True)
+    notes = None
+    if missing:
+        # The note must not shadow a converted file of the same name
+        note_name = unique_names([name for name, _ in entries] + ["MISSING.txt"])[-1]
+        notes = {note_name: "Converted files deleted since the batch ran:\n" + "".join(f"{file_id}\n" for file_id in missing)}
+    return stream_zip(entries, f"batch-{batch_id}.zip", notes)
+
+
+@router.delete(
+        "/batch/{batch_id}",
+        summary="Cancel the unfinished conversions of a batch",
+        responses={
+            200: {
+                "model": BatchMetadata,
+                "description": "Cancellation requested - returns the batch's current state"
+            },
+            404: {
+                "model": ErrorResponse,
+                "description": "Batch not found"
+            }
+        }
+)
+def cancel_batch_conversion(
+    batch_id: str,
+    job_db: JobDB = Depends(get_job_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """Cancel every queued or running conversion of a batch."""
+    jobs = job_db.list_jobs_by_batch(batch_id)
+    if not jobs:
+        raise HTTPException(status_code=404, detail=f"No batch found with id {batch_id}")
+    job_queue = get_job_queue()
+    for job in jobs:
+        if job['status'] in (JOB_QUEUED, JOB_RUNNING):
+            job_queue.cancel(job['id'])
+    return batch_to_response(batch_id, job_db.list_jobs_by_batch(batch_id), conversion_db)
 
-    # Perform the conversion using the converter interface
-    converter: ConverterInterface = converter_type(og_metadata['storage_path'], f'{TEMP_DIR}/', input_format, output_format)
-    output_files = converter.convert()
-    moved_output_file = Path(output_files[0]).rename(f'{CONVERTED_DIR}/{converted_id}.{output_format}')
-
-    # Store the converted file metadata in the conversion database and create a relation to the original file
-    converted_metadata['id'] = converted_id
-    converted_metadata['media_type'] = f"{output_format}"
-    converted_metadata['extension'] = f".{output_format}"
-    converted_metadata['storage_path'] = str(moved_output_file)
-    converted_metadata['size_bytes'] = moved_output_file.stat().st_size
-    converted_metadata['sha256_checksum'] = hashlib.sha256(moved_output_file.read_bytes()).hexdigest()
-    converted_metadata.pop('created_at', None)  # Remove created_at from original metadata if it exists
-    conversion_db.insert_file_metadata(converted_metadata)
-    # Store relation with denormalized original file metadata
-    conversion_relations_db.insert_conversion_relation({
-        'original_file_id': og_id,
-        'converted_file_id': converted_id,
-        'original_filename': og_metadata['original_filename'],
-        'original_media_type': og_metadata['media_type'],
-        'original_extension': og_metadata['extension'],
-        'original_size_bytes': og_metadata['size_bytes']
-    })
-
-    return converted_metadata
 
 @router.delete(
     "/{conversion_id}",
@@ -147,6 +325,7 @@ def delete_conversion(
 ):
     """Delete a converted file and its relation to the original file"""
     # Find converted file ID related to this original file ID, if it exists
-    delete_file_and_metadata(conversion_id, conversion_db)
-    conversion_relations_db.delete_relation_by_converted(conversion_id)
+    with conversion_db.conn.transaction():
+        delete_file_and_metadata(conversion_id, conversion_db)
+        conversion_relations_db.delete_relation_by_converted(conversion_id)
     return {"message": "Conversion history deleted successfully"}
\ No newline at end of file
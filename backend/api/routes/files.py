@@ -2,60 +2,114 @@ import os
 import uuid
 import hashlib
 
-from fastapi import APIRouter, File, UploadFile, HTTPException, Depends
-from fastapi.responses import FileResponse
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, File, Form, UploadFile, HTTPException, Depends, Query
+from fastapi.responses import FileResponse, JSONResponse, StreamingResponse
 from pathlib import Path
-from core import get_settings, detect_media_type, sanitize_extension, delete_file_and_metadata
-from db import FileDB, ConversionDB, ConversionRelationsDB
-from registry import ConverterRegistry
-from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db
-from api.schemas import FileListResponse, FileUploadResponse, FileDeleteResponse, ErrorResponse
+from core import get_settings, detect_media_type, sanitize_extension, delete_file_and_metadata, place_blob, reference_blob, release_blob
+from db import get_connection_pool, PooledConnection, FileDB, ConversionDB, ConversionRelationsDB, BlobDB
+from registry import get_converter_registry
+from workers import get_preview, ensure_probe, probe_upload, PREVIEW_PENDING, PREVIEW_UNAVAILABLE
+from api.deps import get_file_db, get_conversion_db, get_conversion_relations_db, get_blob_db
+from api.archive import stream_zip, unique_names
+from api.pagination import MAX_PAGE_SIZE, StreamFormat, decode_cursor, fetch_page, stream_listing
+from api.schemas import ArchiveRequest, FileListResponse, FileUploadResponse, FileDeleteResponse, ErrorResponse, MediaProbe
 
 router = APIRouter(prefix="/files", tags=["files"])
 
-# Define upload directory
+# Define temporary upload directory
 settings = get_settings()
-converter_registry = ConverterRegistry()
-UPLOAD_DIR = settings.upload_dir
-CONVERTED_DIR = settings.output_dir
+converter_registry = get_converter_registry()
+TEMP_DIR = settings.tmp_dir
 
 
-async def save_file(file: UploadFile, db: FileDB) -> dict:
-    """Save an uploaded file to disk and store its metadata in the database."""
+def save_file(file: UploadFile, background_tasks: BackgroundTasks) -> dict:
+    """
+    Save an uploaded file to the blob store and store its metadata in the database.
+
+    Uploads with the same contents as an existing blob only add a metadata
+    row and a reference to that blob. Reads, writes and hashing are
+    blocking, call this from the thread pool.
+    """
     uuid_str = str(uuid.uuid4())
     original_filename = file.filename or "upload"
     file_extension = sanitize_extension(Path(original_filename).suffix.lower())
     unique_filename = f"{uuid_str}"
     if file_extension:
         unique_filename += f".{file_extension}"
-    os.makedirs(UPLOAD_DIR, exist_ok=True)
+    os.makedirs(TEMP_DIR, exist_ok=True)
 
-    file_path = Path(UPLOAD_DIR) / unique_filename
+    temp_path = Path(TEMP_DIR) / unique_filename
     hasher = hashlib.sha256()
     size_bytes = 0
-    # Stream upload to disk and compute hash in one pass
-    with file_path.open("wb") as buffer:
-        while True:
-            chunk = await file.read(1024 * 1024)  # Read in 1MB chunks
-            if not chunk:
-                break
-            buffer.write(chunk)
-            hasher.update(chunk)
-            size_bytes += len(chunk)
-    
-    media_type = detect_media_type(file_path)
+    # Stream upload to a temporary file and compute hash in one pass
+    try:
+        with temp_path.open("wb") as buffer:
+            while True:
+                chunk = file.file.read(1024 * 1024)  # Read in 1MB chunks
+                if not chunk:
+                    break
+                buffer.write(chunk)
+                hasher.update(chunk)
+                size_bytes += len(chunk)
+
+        return register_file(temp_path, original_filename, file_extension, hasher.hexdigest(), size_bytes, background_tasks)
+    finally:
+        temp_path.unlink(missing_ok=True)
+
 
+def register_file(
+    temp_path: Path,
+    original_filename: str,
+    file_extension: str,
+    sha256_checksum: str,
+    size_bytes: int,
+    background_tasks: BackgroundTasks
+) -> dict:
+    """
+    Move a fully received upload into the blob store and record its metadata.
+
+    The media type is detected and the file moved with no pooled connection
+    held, one is only borrowed for the database writes. Contents that were
+    never probed are probed once the response is sent, see
+    workers.probes.probe_upload().
+
+    Args:
+        temp_path: Received file, consumed by this call
+        original_filename: Name the client uploaded the file under
+        file_extension: Sanitized extension of original_filename
+        sha256_checksum: Checksum computed while the file was received
+        size_bytes: Size of the file
+        background_tasks: Tasks of the request, the probe is added to them
+
+    Returns:
+        Metadata of the stored file, with its compatible conversion formats
+        and its probe if the same contents were probed before
+    """
+    media_type = detect_media_type(temp_path)
+    file_path = place_blob(temp_path, sha256_checksum)
     metadata = {
-        "id": uuid_str,
+        "id": str(uuid.uuid4()),
         "storage_path": str(file_path),
         "original_filename": original_filename,
         "media_type": media_type,
         "extension": file_extension,
         "size_bytes": size_bytes,
-        "sha256_checksum": hasher.hexdigest(),
+        "sha256_checksum": sha256_checksum,
     }
-    db.insert_file_metadata(metadata)
+    with get_connection_pool().connection() as conn:
+        blob_db = BlobDB(conn)
+        reference_blob(sha256_checksum, size_bytes, blob_db)
+        try:
+            FileDB(conn).insert_file_metadata(metadata)
+        except Exception:
+            release_blob(sha256_checksum, blob_db)
+            raise
+        probe = blob_db.get_probe(sha256_checksum)
     metadata["compatible_formats"] = converter_registry.get_compatible_formats(media_type)
+    metadata["probe"] = probe
+    if metadata["probe"] is None:
+        background_tasks.add_task(probe_upload, sha256_checksum, str(file_path), media_type)
     return metadata
 
 
@@ -65,16 +119,39 @@ async def save_file(file: UploadFile, db: FileDB) -> dict:
     responses={
         200: {
             "model": FileListResponse,
-            "description": "List of all uploaded files"
+            "description": "List of uploaded files, newest first"
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Invalid cursor"
         }
     }
 )
-def list_files(file_db: FileDB = Depends(get_file_db)):
-    """List all uploaded files"""
-    files = file_db.list_files()
-    for file in files:
+def list_files(
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size, omit to list every file"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page"),
+    stream: Optional[StreamFormat] = Query(None, description="Stream the listing row by row as json or ndjson")
+):
+    """List uploaded files, newest first, optionally paginated or streamed"""
+    after = decode_cursor(cursor)
+
+    def fetch(conn: PooledConnection, size: Optional[int]):
+        return FileDB(conn).iter_files(size, after)
+
+    def add_compatible_formats(file: dict) -> dict:
         file["compatible_formats"] = converter_registry.get_compatible_formats(file["media_type"])
-    return {"files": files}
+        return file
+
+    if stream is not None:
+        return stream_listing(
+            "files",
+            fetch,
+            limit,
+            stream,
+            add_compatible_formats
+        )
+    files, next_cursor = fetch_page(fetch, limit)
+    return {"files": [add_compatible_formats(file) for file in files], "next_cursor": next_cursor}
 
 
 @router.post(
@@ -91,22 +168,119 @@ def list_files(file_db: FileDB = Depends(get_file_db)):
         }
     }
 )
-async def upload_file(
-    file: UploadFile = File(...),
-    file_db: FileDB = Depends(get_file_db)
+def upload_file(
+    background_tasks: BackgroundTasks,
+    file: UploadFile = File(...)
 ):
     """Upload a file and save it to the server"""
+    # A sync route runs in the thread pool, copying, hashing and the blob store move stay off the event loop
     try:
-        metadata = await save_file(file, file_db)
+        metadata = save_file(file, background_tasks)
         return {"message": "File uploaded successfully", "metadata": metadata}
     except Exception as e:
         raise HTTPException(status_code=500, detail=f"Upload failed: {str(e)}")
     finally:
-        await file.close()
+        file.file.close()
+
+def archive_entries(
+    file_ids: list[str],
+    file_db: FileDB,
+    conversion_db: ConversionDB,
+    skip_missing: bool = False
+) -> tuple[list[tuple[str, Path]], list[str]]:
+    """
+    Resolve converted or uploaded files to (name in archive, path on disk) pairs.
+
+    Converted files are named after the file they were converted from, with
+    the new extension.
+
+    Args:
+        skip_missing: Leave out files that no longer exist instead of failing
+
+    Returns:
+        The entries, and the IDs of the files left out
+
+    Raises:
+        HTTPException: 404 if any of the files does not exist, unless skip_missing
+    """
+    conversions = conversion_db.get_files_metadata(file_ids)
+    uploads = file_db.get_files_metadata([file_id for file_id in file_ids if file_id not in conversions])
+    names = []
+    paths = []
+    missing = []
+    for file_id in file_ids:
+        metadata = conversions.get(file_id) or uploads.get(file_id)
+        file_path = Path(metadata['storage_path']) if metadata else None
+        if file_path is None or not file_path.is_file():
+            if not skip_missing:
+                raise HTTPException(status_code=404, detail=f"File not found: {file_id}")
+            missing.append(file_id)
+            continue
+        if file_id in conversions:
+            names.append(f"{Path(metadata['original_filename']).stem}{metadata['extension']}")
+        else:
+            names.append(metadata['original_filename'])
+        paths.append(file_path)
+    return list(zip(unique_names(names), paths)), missing
+
+
+@router.post(
+    "/archive",
+    summary="Download many files as one ZIP archive",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/zip": {}},
+            "description": "ZIP archive, streamed as it is built"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "File not found"
+        }
+    }
+)
+def download_archive(
+    archive_request: ArchiveRequest,
+    file_db: FileDB = Depends(get_file_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """Download converted or uploaded files as a ZIP archive"""
+    entries, _ = archive_entries(list(dict.fromkeys(archive_request.ids)), file_db, conversion_db)
+    return stream_zip(entries, "transmute.zip")
+
+
+@router.post(
+    "/archive/form",
+    summary="Download many files as one ZIP archive, from an HTML form",
+    response_class=StreamingResponse,
+    responses={
+        200: {
+            "content": {"application/zip": {}},
+            "description": "ZIP archive, streamed as it is built"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "File not found"
+        }
+    }
+)
+def download_archive_form(
+    archive_request: ArchiveRequest = Form(...),
+    file_db: FileDB = Depends(get_file_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """
+    Same as POST /files/archive with the IDs as repeated "ids" form fields.
+
+    A browser submitting a form saves the response straight to disk as it
+    streams in, instead of buffering the whole archive in page memory.
+    """
+    return download_archive(archive_request, file_db, conversion_db)
+
 
 @router.get(
     "/{file_id}",
-    summary="Download a converted file",
+    summary="Download a converted or uploaded file",
     response_class=FileResponse,
     responses={
         200: {
@@ -119,17 +293,116 @@ async def upload_file(
         }
     }
 )
-def get_file(file_id: str):
-    """Download a converted file"""
-    # Find file with matching ID
-    for file_path in CONVERTED_DIR.iterdir():
-        if file_path.stem == file_id:
-            return FileResponse(
-                path=file_path,
-                filename=file_path.name,
-                media_type="application/octet-stream"
-            )
-    raise HTTPException(status_code=404, detail="File not found")
+def get_file(
+    file_id: str,
+    file_db: FileDB = Depends(get_file_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """Download a converted or uploaded file"""
+    # Resolve the file through its metadata row rather than scanning the storage directories
+    metadata = conversion_db.get_file_metadata(file_id)
+    if metadata is not None:
+        filename = Path(metadata['storage_path']).name
+    else:
+        metadata = file_db.get_file_metadata(file_id)
+        if metadata is None:
+            raise HTTPException(status_code=404, detail="File not found")
+        # Uploads are stored under their checksum, hand them back under their original name
+        filename = metadata['original_filename']
+    file_path = Path(metadata['storage_path'])
+    if not file_path.is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    return FileResponse(
+        path=file_path,
+        filename=filename,
+        media_type="application/octet-stream"
+    )
+
+
+@router.get(
+    "/{file_id}/preview",
+    summary="Get a preview of a converted or uploaded file",
+    response_class=FileResponse,
+    responses={
+        200: {
+            "content": {"image/webp": {}, "application/json": {}},
+            "description": "WebP thumbnail of an image or video, or the first rows of a table as JSON"
+        },
+        202: {
+            "model": ErrorResponse,
+            "description": "Preview is being generated, try again shortly"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "File not found or it has no preview"
+        }
+    }
+)
+def get_file_preview(
+    file_id: str,
+    file_db: FileDB = Depends(get_file_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """
+    Get a small preview of a converted or uploaded file.
+
+    Previews are generated in the background on first request, which answers
+    202 until the preview is ready. They are cached by file contents, so
+    they are served with long-lived cache headers.
+    """
+    metadata = conversion_db.get_file_metadata(file_id) or file_db.get_file_metadata(file_id)
+    if metadata is None or not Path(metadata['storage_path']).is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    status, preview_path, media_type = get_preview(metadata)
+    if status == PREVIEW_UNAVAILABLE:
+        raise HTTPException(status_code=404, detail="No preview available for this file")
+    if status == PREVIEW_PENDING:
+        return JSONResponse(
+            status_code=202,
+            content={"detail": "Preview is being generated"},
+            headers={"Retry-After": "1", "Cache-Control": "no-store"}
+        )
+    return FileResponse(
+        path=preview_path,
+        media_type=media_type,
+        # The URL names a file whose contents never change, the preview never goes stale
+        headers={"Cache-Control": "public, max-age=31536000, immutable"}
+    )
+
+
+@router.get(
+    "/{file_id}/probe",
+    summary="Get the media probe of an uploaded file",
+    responses={
+        200: {
+            "model": MediaProbe,
+            "description": "Dimensions, duration, codec and layout of the file"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "File not found or it cannot be probed"
+        }
+    }
+)
+def get_file_probe(file_id: str):
+    """
+    Get the width, height, duration, codec and layout of an uploaded file.
+
+    Uploads are probed in the background once received. Files still being
+    probed, or uploaded before probing existed, are probed on request. The
+    route takes no database dependency, so no connection is held while probing.
+    """
+    with get_connection_pool().connection() as conn:
+        metadata = FileDB(conn).get_file_metadata(file_id)
+    if metadata is None or not Path(metadata['storage_path']).is_file():
+        raise HTTPException(status_code=404, detail="File not found")
+    try:
+        probe = ensure_probe(metadata['sha256_checksum'], metadata['storage_path'], metadata['media_type'])
+    except Exception:
+        probe = None
+    if probe is None:
+        raise HTTPException(status_code=404, detail="File cannot be probed")
+    return probe
 
 
 @router.delete(
@@ -148,9 +421,10 @@ def get_file(file_id: str):
 )
 def delete_file(
     file_id: str,
-    file_db: FileDB = Depends(get_file_db)
+    file_db: FileDB = Depends(get_file_db),
+    blob_db: BlobDB = Depends(get_blob_db)
 ):
     """Delete an uploaded file"""
     # Find converted file ID related to this original file ID, if it exists
-    delete_file_and_metadata(file_id, file_db)
+    delete_file_and_metadata(file_id, file_db, blob_db=blob_db)
     return {"message": "File deleted successfully"}
@@ -1,13 +1,12 @@
 from fastapi import APIRouter, HTTPException
 from core import get_settings
 from api.schemas import AppInfo, HealthStatus, ReadinessResponse
-import sqlite3
+from db import get_connection_pool
 import os
 
 router = APIRouter(prefix="/health", tags=["health"])
 
 settings = get_settings()
-DB_PATH = settings.db_path
 UPLOAD_DIR = settings.upload_dir
 
 
@@ -63,9 +62,8 @@ def readiness():
     checks = {}
     # SQLite check
     try:
-        conn = sqlite3.connect(DB_PATH)
-        conn.execute("SELECT 1")
-        conn.close()
+        with get_connection_pool().connection() as conn:
+            conn.execute("SELECT 1")
         checks["database"] = "ok"
     except Exception as e:
         checks["database"] = f"error: {e}"
@@ -1,8 +1,140 @@
-from fastapi import APIRouter
+import json
+from typing import Optional
+from fastapi import APIRouter, Depends, HTTPException, Query
+from db import get_connection_pool, ConversionDB, JobDB, PooledConnection
+from workers import get_job_queue, JOB_QUEUED, JOB_RUNNING, JOB_COMPLETED, JOB_FAILED, JOB_CANCELLED
+from api.deps import get_conversion_db, get_job_db
+from api.pagination import MAX_PAGE_SIZE, decode_cursor, fetch_page
+from api.schemas import JobMetadata, JobListResponse, ErrorResponse
 
 router = APIRouter(prefix="/jobs", tags=["jobs"])
 
 
-@router.get("/")
-def list_jobs():
-    return {"jobs": []}
+def job_to_response(job: dict, conversion_db: ConversionDB) -> dict:
+    """Turn a JobDB row into the API representation, attaching the converted file once available."""
+    response = dict(job)
+    response['params'] = json.loads(response.pop('params_json') or "{}")
+    response['result'] = None
+    if job['converted_file_id']:
+        response['result'] = conversion_db.get_file_metadata(job['converted_file_id'])
+    return response
+
+
+def jobs_to_response(jobs: list[dict], conversion_db: ConversionDB) -> list[dict]:
+    """Like job_to_response() for many jobs, fetching the converted files in one query."""
+    converted = conversion_db.get_files_metadata([job['converted_file_id'] for job in jobs if job['converted_file_id']])
+    responses = []
+    for job in jobs:
+        response = dict(job)
+        response['params'] = json.loads(response.pop('params_json') or "{}")
+        response['result'] = converted.get(job['converted_file_id'])
+        responses.append(response)
+    return responses
+
+
+def batch_to_response(batch_id: str, jobs: list[dict], conversion_db: ConversionDB) -> dict:
+    """Summarize the jobs of a batch into its overall status and per-status counts."""
+    counts = {}
+    for job in jobs:
+        counts[job['status']] = counts.get(job['status'], 0) + 1
+    if counts.get(JOB_QUEUED) == len(jobs):
+        status = JOB_QUEUED
+    elif counts.get(JOB_QUEUED) or counts.get(JOB_RUNNING):
+        status = JOB_RUNNING
+    elif counts.get(JOB_COMPLETED) == len(jobs):
+        status = JOB_COMPLETED
+    elif counts.get(JOB_FAILED):
+        status = JOB_FAILED
+    else:
+        # Every job that did not complete was cancelled
+        status = JOB_CANCELLED
+    return {"id": batch_id, "status": status, "counts": counts, "jobs": jobs_to_response(jobs, conversion_db)}
+
+
+@router.get(
+    "/",
+    summary="List conversion jobs",
+    responses={
+        200: {
+            "model": JobListResponse,
+            "description": "List of conversion jobs, newest first"
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Invalid cursor"
+        }
+    }
+)
+def list_jobs(
+    status: Optional[str] = None,
+    limit: Optional[int] = Query(None, ge=1, le=MAX_PAGE_SIZE, description="Page size, omit to list every job"),
+    cursor: Optional[str] = Query(None, description="next_cursor of the previous page")
+):
+    """List conversion jobs, newest first, optionally filtered by status and paginated"""
+    after = decode_cursor(cursor)
+
+    def fetch(conn: PooledConnection, size: Optional[int]):
+        return JobDB(conn).iter_jobs(size, after, status)
+
+    jobs, next_cursor = fetch_page(fetch, limit)
+    with get_connection_pool().connection() as conn:
+        return {"jobs": jobs_to_response(jobs, ConversionDB(conn)), "next_cursor": next_cursor}
+
+
+@router.get(
+    "/{job_id}",
+    summary="Get the status of a conversion job",
+    responses={
+        200: {
+            "model": JobMetadata,
+            "description": "Job status, with converted file metadata once completed"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Job not found"
+        }
+    }
+)
+def get_job(
+    job_id: str,
+    job_db: JobDB = Depends(get_job_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """Get the status of a conversion job"""
+    job = job_db.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job found with id {job_id}")
+    return job_to_response(job, conversion_db)
+
+
+@router.delete(
+    "/{job_id}",
+    summary="Cancel a conversion job",
+    responses={
+        200: {
+            "model": JobMetadata,
+            "description": "Cancellation requested - returns the job's current state"
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Job has already finished"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Job not found"
+        }
+    }
+)
+def cancel_job(
+    job_id: str,
+    job_db: JobDB = Depends(get_job_db),
+    conversion_db: ConversionDB = Depends(get_conversion_db)
+):
+    """Cancel a queued or running conversion job"""
+    job = job_db.get_job(job_id)
+    if job is None:
+        raise HTTPException(status_code=404, detail=f"No job found with id {job_id}")
+    if job['status'] not in (JOB_QUEUED, JOB_RUNNING):
+        raise HTTPException(status_code=400, detail=f"Job {job_id} has already finished")
+    get_job_queue().cancel(job_id)
+    return job_to_response(job_db.get_job(job_id), conversion_db)
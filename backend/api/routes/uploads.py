@@ -0,0 +1,340 @@
+import hashlib
+import os
+import threading
+import uuid
+from pathlib import Path
+from typing import Optional
+from fastapi import APIRouter, BackgroundTasks, Depends, HTTPException, Query, Request, Response
+from fastapi.concurrency import run_in_threadpool
+from starlette.requests import ClientDisconnect
+from core import get_settings, sanitize_extension
+from db import get_connection_pool, UploadDB
+from api.deps import get_upload_db
+from api.routes.files import register_file
+from api.schemas import UploadCreateRequest, UploadStatus, FileUploadResponse, FileDeleteResponse, ErrorResponse
+
+router = APIRouter(prefix="/uploads", tags=["uploads"])
+
+settings = get_settings()
+# Partially received files live here until the upload is completed
+UPLOAD_DIR = settings.upload_dir
+HASH_READ_SIZE = 1024 * 1024
+
+
+class _HashState:
+    """sha256 of the first `offset` bytes of an upload."""
+    def __init__(self):
+        self.hasher = hashlib.sha256()
+        self.offset = 0
+        # Chunks of one upload are written from several threads at once
+        self.lock = threading.Lock()
+
+
+# Running checksums of in-progress uploads, keyed by upload ID. A state lost
+# to a restart is rebuilt from disk.
+_hash_states: dict[str, _HashState] = {}
+
+
+def contiguous_offset(received: list[list[int]]) -> int:
+    """Number of bytes received without gaps from the start of the file."""
+    if received and received[0][0] == 0:
+        return received[0][1]
+    return 0
+
+
+def upload_status(upload: dict) -> dict:
+    return {
+        "id": upload['id'],
+        "original_filename": upload['original_filename'],
+        "size_bytes": upload['size_bytes'],
+        "offset": contiguous_offset(upload['received']),
+        "received": upload['received'],
+    }
+
+
+def catch_up_hash(upload_id: str, storage_path: str, offset: int) -> _HashState:
+    """
+    Advance an upload's running checksum to offset.
+
+    Bytes hashed as they arrived are not read again, only ranges that
+    arrived ahead of a gap are read back from the partial file once the gap
+    is filled.
+    """
+    state = _hash_states.setdefault(upload_id, _HashState())
+    with state.lock:
+        if state.offset < offset:
+            with open(storage_path, 'rb') as f:
+                f.seek(state.offset)
+                while state.offset < offset:
+                    chunk = f.read(min(HASH_READ_SIZE, offset - state.offset))
+                    if not chunk:
+                        break
+                    state.hasher.update(chunk)
+                    state.offset += len(chunk)
+    return state
+
+
+def write_chunk(fd: int, chunk: bytes, position: int, state: _HashState):
+    """Write a chunk at position, hashing it while it is in memory if it extends the checksummed prefix."""
+    os.pwrite(fd, chunk, position)
+    with state.lock:
+        if state.offset == position:
+            state.hasher.update(chunk)
+            state.offset += len(chunk)
+
+
+def expire_uploads():
+    """
+    Delete resumable uploads nobody wrote to for cleanup_ttl_hours, with what they received.
+
+    Abandoned uploads are sparse files of up to their declared size, they
+    are swept on startup and whenever a new upload starts.
+    """
+    with get_connection_pool().connection() as conn:
+        upload_db = UploadDB(conn)
+        for upload in upload_db.list_expired_uploads(settings.cleanup_ttl_hours):
+            Path(upload['storage_path']).unlink(missing_ok=True)
+            upload_db.delete_upload(upload['id'])
+            _hash_states.pop(upload['id'], None)
+
+
+def get_upload_or_404(upload_id: str, upload_db: UploadDB) -> dict:
+    upload = upload_db.get_upload(upload_id)
+    if upload is None:
+        raise HTTPException(status_code=404, detail=f"No upload found with id {upload_id}")
+    return upload
+
+
+def fetch_upload_or_404(upload_id: str) -> dict:
+    """get_upload_or_404() on a connection borrowed for that call only."""
+    with get_connection_pool().connection() as conn:
+        return get_upload_or_404(upload_id, UploadDB(conn))
+
+
+def record_received_range(upload_id: str, start: int, end: int) -> Optional[list[list[int]]]:
+    """UploadDB.add_received_range() on a connection borrowed for that call only."""
+    with get_connection_pool().connection() as conn:
+        return UploadDB(conn).add_received_range(upload_id, start, end)
+
+
+@router.post(
+    "/",
+    summary="Start a resumable upload",
+    responses={
+        200: {
+            "model": UploadStatus,
+            "description": "Upload created, send its bytes with PUT /api/uploads/{id}?offset=N"
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Declared size is too large"
+        }
+    }
+)
+def create_upload(upload_request: UploadCreateRequest):
+    """Start a resumable upload of a file with a known size"""
+    if upload_request.size_bytes > settings.resumable_upload_max_bytes:
+        raise HTTPException(status_code=400, detail=f"Uploads may be at most {settings.resumable_upload_max_bytes} bytes")
+    # Borrows a connection of its own, none may be held here
+    expire_uploads()
+    upload_id = str(uuid.uuid4())
+    file_extension = sanitize_extension(Path(upload_request.filename).suffix.lower())
+    # Keep the extension so media type detection works on the partial file as is
+    storage_path = UPLOAD_DIR / (f"{upload_id}.{file_extension}" if file_extension else upload_id)
+    with open(storage_path, 'wb') as f:
+        f.truncate(upload_request.size_bytes)
+    with get_connection_pool().connection() as conn:
+        upload_db = UploadDB(conn)
+        upload_db.insert_upload({
+            'id': upload_id,
+            'original_filename': upload_request.filename,
+            'extension': file_extension,
+            'size_bytes': upload_request.size_bytes,
+            'storage_path': str(storage_path)
+        })
+        return upload_status(upload_db.get_upload(upload_id))
+
+
+@router.head(
+    "/{upload_id}",
+    summary="Query how much of an upload has been received",
+    responses={
+        200: {"description": "Upload-Offset and Upload-Length headers describe the upload"},
+        404: {"description": "Upload not found"}
+    }
+)
+def head_upload(
+    upload_id: str,
+    upload_db: UploadDB = Depends(get_upload_db)
+):
+    """Offset query, resume the upload from the Upload-Offset header"""
+    upload = get_upload_or_404(upload_id, upload_db)
+    return Response(headers={
+        "Upload-Offset": str(contiguous_offset(upload['received'])),
+        "Upload-Length": str(upload['size_bytes']),
+        "Cache-Control": "no-store"
+    })
+
+
+@router.get(
+    "/{upload_id}",
+    summary="Get the state of a resumable upload",
+    responses={
+        200: {
+            "model": UploadStatus,
+            "description": "Contiguous offset and every byte range received so far"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload not found"
+        }
+    }
+)
+def get_upload(
+    upload_id: str,
+    upload_db: UploadDB = Depends(get_upload_db)
+):
+    """Get the byte ranges of an upload received so far"""
+    return upload_status(get_upload_or_404(upload_id, upload_db))
+
+
+@router.put(
+    "/{upload_id}",
+    summary="Send a chunk of a resumable upload",
+    responses={
+        200: {
+            "model": UploadStatus,
+            "description": "Chunk stored"
+        },
+        400: {
+            "model": ErrorResponse,
+            "description": "Chunk extends past the declared size"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload not found"
+        }
+    }
+)
+async def put_upload_chunk(
+    upload_id: str,
+    request: Request,
+    offset: int = Query(..., ge=0, description="Position of the first byte of the request body in the file")
+):
+    """
+    Write the request body at offset.
+
+    Chunks may arrive in any order and in parallel. If the connection drops
+    mid-chunk, the bytes written so far still count, query the upload and
+    resume from its offset. The body is read on the event loop, writes,
+    hashing and database calls run in the thread pool. A pooled connection
+    is only borrowed to look the upload up and to record the received range,
+    none is held while the body arrives or the checksum catches up.
+    """
+    upload = await run_in_threadpool(fetch_upload_or_404, upload_id)
+    size_bytes = upload['size_bytes']
+    content_length = request.headers.get('content-length')
+    if offset > size_bytes or (content_length is not None and offset + int(content_length) > size_bytes):
+        raise HTTPException(status_code=400, detail=f"Chunk extends past the declared size of {size_bytes} bytes")
+
+    state = _hash_states.setdefault(upload_id, _HashState())
+    position = offset
+    fd = os.open(upload['storage_path'], os.O_WRONLY)
+    try:
+        async for chunk in request.stream():
+            if position + len(chunk) > size_bytes:
+                raise HTTPException(status_code=400, detail=f"Chunk extends past the declared size of {size_bytes} bytes")
+            await run_in_threadpool(write_chunk, fd, chunk, position, state)
+            position += len(chunk)
+    except ClientDisconnect:
+        pass
+    finally:
+        os.close(fd)
+        if position > offset:
+            received = await run_in_threadpool(record_received_range, upload_id, offset, position)
+    if position == offset:
+        return upload_status(upload)
+
+    if received is None:
+        raise HTTPException(status_code=404, detail=f"No upload found with id {upload_id}")
+    upload['received'] = received
+    # Filling a gap reads back whatever arrived after it, possibly gigabytes
+    await run_in_threadpool(catch_up_hash, upload_id, upload['storage_path'], contiguous_offset(received))
+    return upload_status(upload)
+
+
+@router.post(
+    "/{upload_id}/complete",
+    summary="Finish a resumable upload",
+    responses={
+        200: {
+            "model": FileUploadResponse,
+            "description": "File uploaded successfully"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload not found"
+        },
+        409: {
+            "model": ErrorResponse,
+            "description": "Some bytes have not been received yet"
+        }
+    }
+)
+def complete_upload(
+    upload_id: str,
+    background_tasks: BackgroundTasks
+):
+    """
+    Register a fully received upload as a file, like a regular upload.
+
+    Catching up the checksum and moving the file into the blob store run
+    with no pooled connection held, one is only borrowed for the lookup and
+    for the final writes.
+    """
+    upload = fetch_upload_or_404(upload_id)
+    size_bytes = upload['size_bytes']
+    offset = contiguous_offset(upload['received'])
+    if offset < size_bytes:
+        raise HTTPException(status_code=409, detail=f"Upload is incomplete, {offset} of {size_bytes} bytes received")
+
+    # The checksum was kept up to date as chunks arrived, this only reads whatever is missing after a restart
+    state = catch_up_hash(upload_id, upload['storage_path'], size_bytes)
+    metadata = register_file(
+        Path(upload['storage_path']),
+        upload['original_filename'],
+        upload['extension'],
+        state.hasher.hexdigest(),
+        size_bytes,
+        background_tasks
+    )
+    with get_connection_pool().connection() as conn:
+        UploadDB(conn).delete_upload(upload_id)
+    _hash_states.pop(upload_id, None)
+    return {"message": "File uploaded successfully", "metadata": metadata}
+
+
+@router.delete(
+    "/{upload_id}",
+    summary="Abort a resumable upload",
+    responses={
+        200: {
+            "model": FileDeleteResponse,
+            "description": "Upload aborted and its partial file deleted"
+        },
+        404: {
+            "model": ErrorResponse,
+            "description": "Upload not found"
+        }
+    }
+)
+def delete_upload(
+    upload_id: str,
+    upload_db: UploadDB = Depends(get_upload_db)
+):
+    """Abort a resumable upload and delete what was received"""
+    upload = get_upload_or_404(upload_id, upload_db)
+    Path(upload['storage_path']).unlink(missing_ok=True)
+    upload_db.delete_upload(upload_id)
+    _hash_states.pop(upload_id, None)
+    return {"message": "Upload aborted successfully"}
@@ -1,10 +1,113 @@
-from pydantic import BaseModel, Field
-from typing import Optional
+from pydantic import BaseModel, Field, model_validator
+from typing import Annotated, Literal, Optional, Union
+
+FilterValue = Union[bool, int, float, str]
+
+
+class RowFilter(BaseModel):
+    column: str = Field(..., example="country", description="Column to test")
+    op: Literal["==", "!=", "<", "<=", ">", ">=", "in", "not in"] = Field(..., example="in", description="Comparison, rows with a missing value never match")
+    value: Union[FilterValue, list[FilterValue]] = Field(..., example=["NL", "BE"], description="Value to compare with, a list for in and not in")
+
+    @model_validator(mode="after")
+    def check_value(self):
+        if (self.op in ("in", "not in")) != isinstance(self.value, list):
+            raise ValueError("in and not in take a list of values, other comparisons a single value")
+        return self
+
+
+class CropTransform(BaseModel):
+    op: Literal["crop"]
+    left: int = Field(..., ge=0, example=100, description="Left edge of the kept region, in pixels")
+    top: int = Field(..., ge=0, example=50, description="Top edge of the kept region, in pixels")
+    width: int = Field(..., ge=1, example=800, description="Width of the kept region")
+    height: int = Field(..., ge=1, example=600, description="Height of the kept region")
+
+
+class RotateTransform(BaseModel):
+    op: Literal["rotate"]
+    degrees: float = Field(..., example=90, description="Clockwise rotation, multiples of 90 are lossless")
+    expand: bool = Field(True, description="Grow the canvas to fit the rotated image instead of cutting off its corners")
+
+
+class AutoOrientTransform(BaseModel):
+    op: Literal["auto_orient"]
+
+
+class ResizeTransform(BaseModel):
+    op: Literal["resize"]
+    width: Optional[int] = Field(None, ge=1, le=65535, example=1600, description="Fit the image to this width, keeping its aspect ratio")
+    height: Optional[int] = Field(None, ge=1, le=65535, example=1200, description="Fit the image to this height, keeping its aspect ratio")
+    max_dimension: Optional[int] = Field(None, ge=1, le=65535, example=1600, description="Shrink the image so its longest side is at most this, never enlarges")
+
+    @model_validator(mode="after")
+    def check_size(self):
+        if self.width is None and self.height is None and self.max_dimension is None:
+            raise ValueError("resize takes width, height or max_dimension")
+        return self
+
+
+class StripMetadataTransform(BaseModel):
+    op: Literal["strip_metadata"]
+
+
+class ConvertModeTransform(BaseModel):
+    op: Literal["convert_mode"]
+    mode: Literal["1", "L", "LA", "P", "RGB", "RGBA", "CMYK"] = Field(..., example="L", description="Pillow image mode to convert to")
+
+
+class FlattenTransform(BaseModel):
+    op: Literal["flatten"]
+    background: str = Field("#ffffff", example="#000000", description="Color shown through transparent areas")
+
+
+ImageTransform = Annotated[
+    Union[CropTransform, RotateTransform, AutoOrientTransform, ResizeTransform, StripMetadataTransform, ConvertModeTransform, FlattenTransform],
+    Field(discriminator="op")
+]
+
+
+class ConversionOptions(BaseModel):
+    columns: Optional[list[str]] = Field(None, min_length=1, example=["id", "name"], description="Only keep these columns, in this order (tabular conversions)")
+    filters: Optional[list[RowFilter]] = Field(None, min_length=1, description="Only keep rows matching every filter (tabular conversions)")
+    limit: Optional[int] = Field(None, ge=1, example=1000, description="Only keep the first rows, after filtering (tabular conversions)")
+    width: Optional[int] = Field(None, ge=1, le=65535, example=1600, description="Fit the image to this width, keeping its aspect ratio (image conversions)")
+    height: Optional[int] = Field(None, ge=1, le=65535, example=1200, description="Fit the image to this height, keeping its aspect ratio (image conversions)")
+    max_dimension: Optional[int] = Field(None, ge=1, le=65535, example=1600, description="Shrink the image so its longest side is at most this, never enlarges (image conversions)")
+    transforms: Optional[list[ImageTransform]] = Field(None, min_length=1, description="Steps applied in order to the decoded image, after which width, height and max_dimension apply (image conversions)")
 
 
 class ConversionRequest(BaseModel):
     id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="ID of file to convert")
     output_format: str = Field(..., example="png", description="Target format for conversion")
+    options: Optional[ConversionOptions] = Field(None, description="Conversion options, rejected if the conversion does not support them")
+
+
+class BatchConversionItem(BaseModel):
+    id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="ID of file to convert")
+    output_formats: list[str] = Field(..., min_length=1, example=["png", "webp"], description="Target formats for this file")
+    options: Optional[ConversionOptions] = Field(None, description="Conversion options applied to every format of this file")
+
+
+class BatchConversionRequest(BaseModel):
+    items: list[BatchConversionItem] = Field(..., min_length=1, description="Files to convert and the formats to convert each one to")
+
+
+class ArchiveRequest(BaseModel):
+    ids: list[str] = Field(..., min_length=1, example=["123e4567-e89b-12d3-a456-426614174000"], description="IDs of converted or uploaded files to bundle")
+
+
+class UploadCreateRequest(BaseModel):
+    filename: str = Field(..., example="holiday.mp4", description="Name of the file being uploaded")
+    size_bytes: int = Field(..., ge=0, example=10737418240, description="Total size of the file")
+
+
+class UploadStatus(BaseModel):
+    id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="Upload ID")
+    original_filename: str = Field(..., example="holiday.mp4")
+    size_bytes: int = Field(..., example=10737418240, description="Total size of the file")
+    offset: int = Field(..., example=5242880, description="Bytes received without gaps from the start, resume sequential uploads here")
+    received: list[list[int]] = Field(..., example=[[0, 5242880], [10485760, 15728640]], description="Received [start, end) byte ranges")
 
 
 class FileMetadata(BaseModel):
@@ -16,8 +119,26 @@ class FileMetadata(BaseModel):
     sha256_checksum: str = Field(..., example="abc123def456...")
 
 
+class ProbeColumn(BaseModel):
+    name: str = Field(..., example="country")
+    type: str = Field(..., example="string", description="Arrow type of the column")
+
+
+class MediaProbe(BaseModel):
+    kind: Literal["image", "video", "audio", "table"] = Field(..., example="video")
+    width: Optional[int] = Field(None, example=1920, description="Width in pixels of an image or video")
+    height: Optional[int] = Field(None, example=1080, description="Height in pixels of an image or video")
+    duration: Optional[float] = Field(None, example=63.48, description="Duration in seconds of audio or video")
+    codec: Optional[str] = Field(None, example="h264", description="Codec of the main stream, or the format of an image or table")
+    pages: Optional[int] = Field(None, example=1, description="Frames or pages of an image")
+    rows: Optional[int] = Field(None, example=120000, description="Row count of a Parquet table")
+    columns: Optional[list[ProbeColumn]] = Field(None, description="Columns of a table")
+    streams: Optional[list[dict]] = Field(None, description="Streams of audio or video, as reported by ffprobe")
+
+
 class FileMetadataWithFormats(FileMetadata):
     compatible_formats: list[str] = Field(..., example=["png", "gif", "webp"], description="List of compatible output formats")
+    probe: Optional[MediaProbe] = Field(None, description="Media probe, when the same contents were probed before")
 
 
 class ConversionItem(BaseModel):
@@ -32,6 +153,7 @@ class ConversionItem(BaseModel):
 
 class ConversionListResponse(BaseModel):
     conversions: list[ConversionItem] = Field(..., description="List of completed conversions")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
 
 
 class ErrorResponse(BaseModel):
@@ -59,6 +181,7 @@ class ReadinessResponse(BaseModel):
 
 class FileListResponse(BaseModel):
     files: list[FileMetadata] = Field(..., description="List of uploaded files")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
 
 
 class FileUploadResponse(BaseModel):
@@ -68,3 +191,31 @@ class FileUploadResponse(BaseModel):
 
 class FileDeleteResponse(BaseModel):
     message: str = Field(..., example="File deleted successfully", description="Deletion status message")
+
+
+class JobMetadata(BaseModel):
+    id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="Job ID")
+    converter_id: str = Field(..., example="PillowConverter", description="Converter that runs this job")
+    status: str = Field(..., example="queued", description="One of queued, running, completed, failed or cancelled")
+    progress: int = Field(..., example=0, description="Completion percentage")
+    params: dict = Field(..., example={"output_format": "png"}, description="Parameters the job was submitted with")
+    original_file_id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="ID of the file being converted")
+    converted_file_id: Optional[str] = Field(None, example="123e4567-e89b-12d3-a456-426614174000", description="ID of the converted file once completed")
+    created_at: Optional[str] = Field(None, example="2024-01-01 12:00:00")
+    started_at: Optional[str] = Field(None, example="2024-01-01 12:00:01")
+    finished_at: Optional[str] = Field(None, example="2024-01-01 12:00:05")
+    error: Optional[str] = Field(None, example="Image conversion failed: cannot identify image file", description="Error message if the job failed")
+    result: Optional[FileMetadata] = Field(None, description="Converted file metadata once completed")
+    batch_id: Optional[str] = Field(None, example="123e4567-e89b-12d3-a456-426614174000", description="Batch the job was submitted in, if any")
+
+
+class JobListResponse(BaseModel):
+    jobs: list[JobMetadata] = Field(..., description="List of conversion jobs")
+    next_cursor: Optional[str] = Field(None, description="Cursor of the next page, null on the last page")
+
+
+class BatchMetadata(BaseModel):
+    id: str = Field(..., example="123e4567-e89b-12d3-a456-426614174000", description="Batch ID")
+    status: str = Field(..., example="running", description="queued, running, completed, failed once finished with any job failed, or cancelled once finished with the other jobs cancelled")
+    counts: dict[str, int] = Field(..., example={"queued": 3, "running": 2, "completed": 5}, description="Number of jobs per status")
+    jobs: list[JobMetadata] = Field(..., description="Jobs of the batch, in submission order")
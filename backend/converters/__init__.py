@@ -1,7 +1,16 @@
-from .ffmpeg_convert import FFmpegConverter
-from .pillow_convert import PillowConverter
-from .pandas_convert import PandasConverter
-from .drawio_convert import DrawioConverter
 from .converter_interface import ConverterInterface
+from .manifests import ConverterManifest, MANIFESTS
 
-__all__ = ["FFmpegConverter", "PillowConverter", "PandasConverter", "ImgArrayConverter", "ConverterInterface"]
\ No newline at end of file
+# Converter modules import heavy backends (pandas, pyarrow, Pillow...), each is only
+# imported when its class is first used, see manifests.py
+_MANIFESTS_BY_NAME = {manifest.__name__: manifest for manifest in MANIFESTS}
+
+
+def __getattr__(name):
+    manifest = _MANIFESTS_BY_NAME.get(name)
+    if manifest is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    return manifest.load()
+
+
+__all__ = ["FFmpegConverter", "PillowConverter", "PandasConverter", "DrawioConverter", "ConverterInterface", "ConverterManifest", "MANIFESTS"]
@@ -5,8 +5,25 @@ from typing import Optional
 class ConverterInterface:
     supported_input_formats: set = set()  # To be defined by subclasses with supported input formats
     supported_output_formats: set = set()  # To be defined by subclasses with supported output formats
+    execution_lane: str = "thread"  # "process" for CPU-bound converters that should run in the process pool
+    version: str = "1"  # Bump whenever a change alters converter output, invalidates cached conversions
+    priority: int = 0  # Higher wins when several converters can handle the same conversion
+    cost: float = 1.0  # Relative cost of one conversion step, weights multi-step conversion plans
+    chainable_input_formats: set | None = None  # Inputs accepted from an earlier step of a plan, None allows all
+    chainable_output_formats: dict[str, set] | None = None  # Outputs an earlier step's intermediate may become, by its format, unlisted formats are unrestricted
+    output_costs: dict[str, float] = {}  # Cost added to a step writing one of these formats, on top of cost
+    supported_options: set = set()  # Conversion request options the converter understands
+    manifest = None  # ConverterManifest declaring the attributes above, see converters/manifests.py
+    probe: dict | None = None  # Stored media probe of the input file when known, see workers/probes.py
 
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init_subclass__(cls, **kwargs):
+        super().__init_subclass__(**kwargs)
+        # Declarations live in the manifest so the registry can read them without importing the converter
+        if cls.__dict__.get('manifest') is not None:
+            for name, value in cls.manifest.declarations.items():
+                setattr(cls, name, value)
+
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize converter interface.
         
@@ -15,8 +32,10 @@ class ConverterInterface:
             output_dir: Directory where the output file will be saved
             input_type: Format of the input file (e.g., "mp4", "mp3")
             output_type: Format of the output file (e.g., "mp4", "mp3")
+            options: Conversion options, only keys in supported_options are passed in
         """
         self.input_file = input_file
+        self.options = options or {}
         self.output_dir = output_dir
         self.input_type = media_type_aliases.get(input_type.lower(), input_type.lower())
         self.output_type = media_type_aliases.get(output_type.lower(), output_type.lower())
@@ -45,6 +64,8 @@ class ConverterInterface:
         Returns:
             Set of compatible formats.
         """
+        if cls.manifest is not None:
+            return cls.manifest.get_formats_compatible_with(format_type)
         return cls.supported_output_formats - {format_type.lower()}
     
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> list[str]:
@@ -1,21 +1,16 @@
 import os
-import subprocess
 import sys
 from pathlib import Path
 from typing import Optional
 
+from core import get_settings, run_command, CommandCancelledError
 from .converter_interface import ConverterInterface
+from .manifests import DRAWIO
+
+settings = get_settings()
 
 class DrawioConverter(ConverterInterface):
-    supported_input_formats = {
-        'drawio'
-    }
-    supported_output_formats = {
-        'png',
-        'pdf',
-        'svg',
-        'jpeg',
-    }
+    manifest = DRAWIO
     
     # Draw.io CLI path by platform
     DRAWIO_PATHS = {
@@ -24,7 +19,7 @@ class DrawioConverter(ConverterInterface):
         'win32': 'C:\\Program Files\\draw.io\\draw.io.exe',
     }
     
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize Drawio converter.
         
@@ -33,8 +28,9 @@ class DrawioConverter(ConverterInterface):
             output_dir: Directory where the converted file will be saved
             input_type: Input file format (must be 'drawio')
             output_type: Output file format (e.g., 'png', 'pdf', 'svg', 'jpeg')
+            options: Conversion options, see supported_options
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
     
     def __can_convert(self) -> bool:
         """
@@ -60,21 +56,6 @@ class DrawioConverter(ConverterInterface):
         
         return True
 
-    @classmethod
-    def get_formats_compatible_with(cls, format_type: str) -> set:
-        """
-        Get the set of compatible formats for conversion.
-        
-        Args:
-            format_type: The input format to check compatibility for.
-        Returns:
-            Set of compatible formats.
-        """
-        base_formats = super().get_formats_compatible_with(format_type)
-        # Can convert FROM drawio but not TO drawio (export only)
-        base_formats.discard('drawio')
-        return base_formats
-    
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> list[str]:
         """
         Convert the draw.io file to the output format using Draw.io CLI directly.
@@ -134,14 +115,10 @@ class DrawioConverter(ConverterInterface):
             if self.output_type.lower() == 'png':
                 cmd.append('--transparent')
             
-            # Run the conversion
-            result = subprocess.run(
-                cmd,
-                capture_output=True,
-                text=True,
-                check=True,
-                timeout=30  # 30 second timeout to prevent hanging
-            )
+            # Run the conversion with a timeout to prevent hanging
+            result = run_command(cmd, timeout=settings.drawio_timeout_seconds)
+            if result.returncode != 0:
+                raise RuntimeError(result.stderr or result.stdout or f"exit code {result.returncode}")
             
             # Verify output file was created
             if not os.path.exists(output_file):
@@ -154,9 +131,8 @@ class DrawioConverter(ConverterInterface):
             
             return [output_file]
             
-        except subprocess.CalledProcessError as e:
-            error_msg = f"Drawio conversion failed: {e.stderr or e.stdout or str(e)}"
-            raise RuntimeError(error_msg)
+        except CommandCancelledError:
+            raise
         except Exception as e:
             error_msg = f"Drawio conversion failed: {str(e)}"
             raise RuntimeError(error_msg)
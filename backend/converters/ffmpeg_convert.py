@@ -1,37 +1,115 @@
-import subprocess
+import json
 import os
 from pathlib import Path
 from typing import Optional
+from core import get_settings, run_command, CommandTimeoutError
 from .converter_interface import ConverterInterface
+from .manifests import FFMPEG
+
+settings = get_settings()
+
+# ffprobe only reads the container headers, it should never take long
+PROBE_TIMEOUT_SECONDS = 30
+
+_MP4_CODECS = {
+    'video': {'h264', 'hevc', 'av1', 'vp9', 'mpeg4'},
+    'audio': {'aac', 'mp3', 'alac', 'ac3', 'eac3', 'opus', 'flac'},
+    'subtitle': {'mov_text'},
+}
+_MATROSKA_CODECS = {
+    'video': {'h264', 'hevc', 'av1', 'vp8', 'vp9', 'mpeg4', 'mpeg2video', 'mpeg1video', 'theora'},
+    'audio': {'aac', 'mp3', 'mp2', 'opus', 'vorbis', 'flac', 'alac', 'ac3', 'eac3', 'dts', 'pcm_s16le', 'pcm_s24le'},
+    'subtitle': {'subrip', 'ass', 'ssa', 'webvtt', 'hdmv_pgs_subtitle', 'dvd_subtitle'},
+}
+# Codecs, as ffprobe names them, that each container can hold as is. Streams
+# in one of these are copied rather than decoded and re-encoded.
+CONTAINER_CODECS: dict[str, dict[str, set]] = {
+    'mp4': _MP4_CODECS,
+    'm4v': _MP4_CODECS,
+    'mov': {**_MP4_CODECS, 'video': _MP4_CODECS['video'] | {'prores', 'mjpeg'}, 'audio': _MP4_CODECS['audio'] | {'pcm_s16le', 'pcm_s24le'}},
+    'mkv': _MATROSKA_CODECS,
+    'webm': {'video': {'vp8', 'vp9', 'av1'}, 'audio': {'opus', 'vorbis'}, 'subtitle': {'webvtt'}},
+    'flv': {'video': {'h264', 'flv1'}, 'audio': {'aac', 'mp3'}},
+    'avi': {'video': {'mpeg4', 'msmpeg4v3', 'mjpeg'}, 'audio': {'mp3', 'ac3', 'pcm_s16le'}},
+    'mpg': {'video': {'mpeg1video', 'mpeg2video'}, 'audio': {'mp2', 'mp3', 'ac3'}},
+    'mpeg': {'video': {'mpeg1video', 'mpeg2video'}, 'audio': {'mp2', 'mp3', 'ac3'}},
+    'wmv': {'video': {'wmv1', 'wmv2', 'wmv3', 'vc1'}, 'audio': {'wmav1', 'wmav2'}},
+    'mp3': {'audio': {'mp3'}},
+    'aac': {'audio': {'aac'}},
+    'm4a': {'audio': {'aac', 'alac'}},
+    'flac': {'audio': {'flac'}},
+    'ogg': {'audio': {'vorbis', 'opus', 'flac'}},
+    'opus': {'audio': {'opus'}},
+    'wav': {'audio': {'pcm_s16le', 'pcm_s24le', 'pcm_s32le', 'pcm_f32le', 'pcm_u8'}},
+    'wma': {'audio': {'wmav1', 'wmav2'}},
+}
+# Stream types an output keeps, ffmpeg picks one stream of each by default
+VIDEO_STREAM_TYPES = ('video', 'audio', 'subtitle')
+AUDIO_STREAM_TYPES = ('audio',)
+
+
+def probe_media(input_file: str) -> dict:
+    """
+    Container and streams of a media file, read with ffprobe.
+
+    Returns:
+        ffprobe's JSON: "format" with its "format_name" and "duration", and
+        "streams" with one {"index", "codec_type", "codec_name", "width",
+        "height", "duration"} dict per stream. Empty if the file could not be probed
+    """
+    cmd = [
+        'ffprobe', '-v', 'error',
+        '-show_entries', 'format=format_name,duration:stream=index,codec_type,codec_name,width,height,duration',
+        '-of', 'json',
+        input_file
+    ]
+    try:
+        result = run_command(cmd, timeout=PROBE_TIMEOUT_SECONDS)
+        if result.returncode != 0:
+            return {}
+        return json.loads(result.stdout)
+    except (FileNotFoundError, CommandTimeoutError, ValueError):
+        # No ffprobe, or nothing it could read
+        return {}
+
+
+def probe_streams(input_file: str) -> list[dict]:
+    """
+    Codec of every stream in a media file, read with ffprobe.
+
+    Returns:
+        One dict per stream, see probe_media(), empty if the file could not be probed
+    """
+    return probe_media(input_file).get('streams', [])
+
+
+def plan_stream_copy(streams: list[dict], output_type: str) -> set[str]:
+    """
+    Stream types that can be copied into the output container without re-encoding.
+
+    A type is only copied when every stream of it fits the container, so
+    whichever stream ffmpeg selects can be copied.
+
+    Args:
+        streams: Streams of the input, from probe_streams()
+        output_type: Output container format
+
+    Returns:
+        Set of stream types ("video", "audio", "subtitle") to copy
+    """
+    container_codecs = CONTAINER_CODECS.get(output_type, {})
+    kept_types = AUDIO_STREAM_TYPES if output_type in FFMPEG.audio_formats else VIDEO_STREAM_TYPES
+    copyable = set()
+    for stream_type in kept_types:
+        codecs = {stream.get('codec_name') for stream in streams if stream.get('codec_type') == stream_type}
+        if codecs and codecs <= container_codecs.get(stream_type, set()):
+            copyable.add(stream_type)
+    return copyable
 
 class FFmpegConverter(ConverterInterface):
-    video_formats: set = {
-        'mp4', 
-        'avi', 
-        'mov', 
-        'mkv', 
-        'webm', 
-        'flv', 
-        'wmv', 
-        'mpg', 
-        'mpeg', 
-        'm4v', 
-        'gif'
-      }
-    audio_formats: set = {
-        'mp3',
-        'wav',
-        'aac',
-        'flac',
-        'ogg',
-        'wma',
-        'm4a',
-        'opus'
-      }
-    supported_input_formats: set = video_formats | audio_formats
-    supported_output_formats: set = set(supported_input_formats)
-
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    manifest = FFMPEG
+
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize FFmpeg converter.
         
@@ -40,8 +118,9 @@ class FFmpegConverter(ConverterInterface):
             output_dir: Directory where the converted file will be saved
             input_type: Input file format (e.g., 'mp4', 'avi', 'mp3', 'wav')
             output_type: Output file format (e.g., 'mp4', 'avi', 'mp3', 'wav')
+            options: Conversion options, see supported_options
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
     
     def __can_convert(self) -> bool:
         """
@@ -69,23 +148,40 @@ class FFmpegConverter(ConverterInterface):
         # - Audio to Audio (convert)
         return True
     
-    @classmethod
-    def get_formats_compatible_with(cls, format_type: str) -> set:
+    def __command(self, output_file: str, overwrite: bool, quality: Optional[str], copy_types: set[str]) -> list[str]:
         """
-        Get the set of compatible formats for conversion.
-        
+        Build the FFmpeg command line.
+
         Args:
-            format_type: The input format to check compatibility for.
-        
-        Returns:
-            Set of compatible formats.
+            output_file: Path to write the output to
+            overwrite: Whether to overwrite an existing output file
+            quality: Optional quality setting for video ('high', 'medium', 'low')
+            copy_types: Stream types to copy as is, from plan_stream_copy()
         """
-        if format_type.lower() in cls.audio_formats:
-            # For audio formats, compatible formats are other audio formats
-            return cls.audio_formats - {format_type.lower()}
+        cmd = ['ffmpeg', '-nostdin']
+        
+        if overwrite:
+            cmd.append('-y')
         else:
-            return cls.supported_output_formats - {format_type.lower()}
-    
+            cmd.append('-n')
+        
+        cmd.extend(['-i', self.input_file])
+
+        for stream_type in sorted(copy_types):
+            cmd.extend([f'-c:{stream_type[0]}', 'copy'])
+        
+        # Add quality settings for video conversions, they only apply when the video is re-encoded
+        if quality and self.output_type in ['mp4', 'avi', 'mov', 'mkv', 'webm'] and 'video' not in copy_types:
+            if quality == 'high':
+                cmd.extend(['-crf', '18', '-preset', 'slow'])
+            elif quality == 'medium':
+                cmd.extend(['-crf', '23', '-preset', 'medium'])
+            elif quality == 'low':
+                cmd.extend(['-crf', '28', '-preset', 'fast'])
+        
+        cmd.append(output_file)
+        return cmd
+
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> str:
         """
         Convert the input file to the output format using FFmpeg.
@@ -100,7 +196,7 @@ class FFmpegConverter(ConverterInterface):
         Raises:
             FileNotFoundError: If input file doesn't exist
             ValueError: If the conversion is not supported
-            RuntimeError: If FFmpeg conversion fails
+            RuntimeError: If FFmpeg conversion fails, times out or is cancelled
         """
         # Validate conversion is possible
         if not self.__can_convert():
@@ -117,43 +213,26 @@ class FFmpegConverter(ConverterInterface):
         input_filename = Path(self.input_file).stem
         output_file = os.path.join(self.output_dir, f"{input_filename}.{self.output_type}")
         
-        # Build FFmpeg command
-        cmd = ['ffmpeg']
-        
-        if overwrite:
-            cmd.append('-y')
-        else:
-            cmd.append('-n')
-        
-        cmd.extend(['-i', self.input_file])
-        
-        # Add quality settings for video conversions
-        if quality and self.output_type in ['mp4', 'avi', 'mov', 'mkv', 'webm']:
-            if quality == 'high':
-                cmd.extend(['-crf', '18', '-preset', 'slow'])
-            elif quality == 'medium':
-                cmd.extend(['-crf', '23', '-preset', 'medium'])
-            elif quality == 'low':
-                cmd.extend(['-crf', '28', '-preset', 'fast'])
-        
-        cmd.append(output_file)
-        
-        # Execute FFmpeg command
+        # Copy the streams that already fit the output container, decoding and re-encoding only
+        # the rest, so a remux like mov -> mp4 takes seconds of I/O instead of minutes of CPU.
+        # Uploads were probed when they arrived, only intermediates and older files are probed here.
+        copy_types = set()
+        if settings.ffmpeg_stream_copy:
+            streams = self.probe['streams'] if self.probe and 'streams' in self.probe else probe_streams(self.input_file)
+            copy_types = plan_stream_copy(streams, self.output_type)
         try:
-            result = subprocess.run(
-                cmd,
-                stdout=subprocess.PIPE,
-                stderr=subprocess.PIPE,
-                text=True,
-                check=True
-            )
-            return [output_file]
-            
-        except subprocess.CalledProcessError as e:
-            error_msg = f"FFmpeg conversion failed: {e.stderr}"
-            raise RuntimeError(error_msg)
+            result = run_command(self.__command(output_file, overwrite, quality, copy_types), timeout=settings.ffmpeg_timeout_seconds)
+            if result.returncode != 0 and copy_types:
+                # Some streams are valid in the container yet still rejected as is (odd timestamps,
+                # unsupported codec tags), fall back to re-encoding everything
+                Path(output_file).unlink(missing_ok=True)
+                result = run_command(self.__command(output_file, overwrite, quality, set()), timeout=settings.ffmpeg_timeout_seconds)
         except FileNotFoundError:
             raise RuntimeError(
                 "FFmpeg not found. Please install FFmpeg: "
                 "https://ffmpeg.org/download.html"
             )
+        if result.returncode != 0:
+            error_msg = f"FFmpeg conversion failed: {result.stderr}"
+            raise RuntimeError(error_msg)
+        return [output_file]
@@ -0,0 +1,167 @@
+"""
+Lightweight declarations of every converter.
+
+The registry is built from these alone, so listing formats and planning
+conversions never imports a converter backend (pandas, pyarrow, Pillow,
+cairosvg...). A converter's module is imported the first time one of its
+conversions runs, in the process that runs it.
+"""
+import importlib
+from typing import Optional
+from core import get_settings
+
+settings = get_settings()
+
+
+class ConverterManifest:
+    """
+    Formats, options and planning attributes of one converter.
+
+    Stands in for the converter class in the registry and in conversion
+    plans: calling it creates a converter, and reading an attribute it does
+    not declare reads it from the class. Either imports the converter's
+    module, once. Converter classes take their declarations from their
+    manifest, so the two never disagree.
+    """
+    def __init__(
+        self,
+        name: str,
+        module: str,
+        supported_input_formats: set,
+        supported_output_formats: set,
+        execution_lane: str = "thread",
+        version: str = "1",
+        priority: int = 0,
+        cost: float = 1.0,
+        chainable_input_formats: Optional[set] = None,
+        chainable_output_formats: Optional[dict[str, set]] = None,
+        output_costs: Optional[dict[str, float]] = None,
+        supported_options: Optional[set] = None,
+        compatible_formats: Optional[dict[str, set]] = None,
+        **attributes
+    ):
+        """
+        Declare a converter.
+
+        Args:
+            name: Name of the converter class
+            module: Module of the converters package defining the class
+            compatible_formats: Outputs of the inputs that cannot be converted to every supported output
+            attributes: Further class attributes, readable without importing the converter
+            Other arguments are the class attributes documented on ConverterInterface
+        """
+        self.__name__ = name
+        self.module = module
+        self.compatible_formats = compatible_formats or {}
+        self.declarations = {
+            'supported_input_formats': supported_input_formats,
+            'supported_output_formats': supported_output_formats,
+            'execution_lane': execution_lane,
+            'version': version,
+            'priority': priority,
+            'cost': cost,
+            'chainable_input_formats': chainable_input_formats,
+            'chainable_output_formats': chainable_output_formats,
+            'output_costs': output_costs or {},
+            'supported_options': supported_options or set(),
+            **attributes
+        }
+        self.__dict__.update(self.declarations)
+        self._converter_class = None
+
+    def load(self) -> type:
+        """Import the converter's module on first use and return the converter class."""
+        if self._converter_class is None:
+            module = importlib.import_module(f'.{self.module}', __package__)
+            self._converter_class = getattr(module, self.__name__)
+        return self._converter_class
+
+    def get_formats_compatible_with(self, format_type: str) -> set:
+        """
+        Get the set of compatible formats for conversion.
+
+        Args:
+            format_type: The input format to check compatibility for.
+        Returns:
+            Set of compatible formats.
+        """
+        format_type = format_type.lower()
+        return set(self.compatible_formats.get(format_type, self.supported_output_formats)) - {format_type}
+
+    def __call__(self, *args, **kwargs):
+        return self.load()(*args, **kwargs)
+
+    def __getattr__(self, name: str):
+        # Only reached for attributes the manifest does not declare
+        if name.startswith('_'):
+            raise AttributeError(name)
+        return getattr(self.load(), name)
+
+    def __repr__(self) -> str:
+        return f"<ConverterManifest {self.__name__}>"
+
+
+VIDEO_FORMATS = {'mp4', 'avi', 'mov', 'mkv', 'webm', 'flv', 'wmv', 'mpg', 'mpeg', 'm4v', 'gif'}
+AUDIO_FORMATS = {'mp3', 'wav', 'aac', 'flac', 'ogg', 'wma', 'm4a', 'opus'}
+# Image formats Pillow writes every frame of an animated input to
+ANIMATED_IMAGE_FORMATS = {'gif', 'webp'}
+
+FFMPEG = ConverterManifest(
+    'FFmpegConverter',
+    'ffmpeg_convert',
+    supported_input_formats=VIDEO_FORMATS | AUDIO_FORMATS,
+    supported_output_formats=VIDEO_FORMATS | AUDIO_FORMATS,
+    version="2",  # Streams that fit the output container are copied instead of re-encoded
+    cost=4.0,  # Spawns ffmpeg and usually re-encodes every frame
+    chainable_input_formats=set(),  # Another converter's gif is a still image, never feed it to ffmpeg
+    output_costs={'gif': 8.0},  # Encodes every frame of the whole clip against a generated palette
+    # Audio has no picture to put in a video
+    compatible_formats={fmt: AUDIO_FORMATS for fmt in AUDIO_FORMATS},
+    video_formats=VIDEO_FORMATS,
+    audio_formats=AUDIO_FORMATS,
+)
+
+PILLOW = ConverterManifest(
+    'PillowConverter',
+    'pillow_convert',
+    supported_input_formats={
+        'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico', 'ppm', 'pgm', 'pbm', 'pcx', 'heif', 'heic', 'svg'
+    },
+    # Can convert FROM SVG but not TO SVG (rasterization only)
+    supported_output_formats={
+        'jpeg', 'png', 'gif', 'bmp', 'tiff', 'tif', 'webp', 'ico', 'ppm', 'pgm', 'pbm', 'pcx', 'heif', 'heic'
+    },
+    execution_lane="process",  # Decoding/encoding is CPU-bound, run in the process pool
+    version="3",  # Keeps every frame of animations, and EXIF and ICC profiles unless stripped
+    # An animation from an earlier step is a whole clip, only worth making into another animation
+    chainable_output_formats={fmt: ANIMATED_IMAGE_FORMATS for fmt in ANIMATED_IMAGE_FORMATS},
+    animated_output_formats=ANIMATED_IMAGE_FORMATS,
+    # "width"/"height": fit the image inside this box, keeping its aspect ratio
+    # "max_dimension": shrink so the longest side is at most this, never enlarges
+    # "transforms": crop, rotate, resize... steps applied in order to the one decoded image
+    supported_options={'width', 'height', 'max_dimension', 'transforms'},
+)
+
+PANDAS = ConverterManifest(
+    'PandasConverter',
+    'pandas_convert',
+    supported_input_formats={'csv', 'xlsx', 'json', 'parquet', 'yaml', 'ndjson'},
+    supported_output_formats={'csv', 'xlsx', 'json', 'parquet', 'yaml', 'ndjson'},
+    execution_lane="process",  # Large reads/writes hold the GIL, run in the process pool
+    version=f"2-{settings.pandas_engine}",  # The engines format some values differently
+    # "columns": list of column names to keep, in order
+    # "filters": list of {"column", "op", "value"} rows must all match, see pandas_convert.FILTER_OPERATORS
+    # "limit": number of rows to keep from the start, after filtering
+    supported_options={'columns', 'filters', 'limit'},
+)
+
+DRAWIO = ConverterManifest(
+    'DrawioConverter',
+    'drawio_convert',
+    supported_input_formats={'drawio'},
+    # Can convert FROM drawio but not TO drawio (export only)
+    supported_output_formats={'png', 'pdf', 'svg', 'jpeg'},
+    cost=8.0,  # Starts a headless draw.io (Electron) instance per conversion
+)
+
+MANIFESTS = (FFMPEG, PILLOW, PANDAS, DRAWIO)
@@ -1,20 +1,97 @@
+import operator
 import os
+import numpy as np
 import pandas as pd
-import yaml, json
-from typing import Optional
+import pyarrow as pa
+import pyarrow.compute as pa_compute
+import pyarrow.csv as pa_csv
+import pyarrow.dataset as pa_dataset
+import pyarrow.parquet as pq
+from itertools import islice
+from typing import Iterator, Optional
+from core import get_settings
 from .converter_interface import ConverterInterface
+from .manifests import PANDAS
+from .record_streams import is_sequence, iter_records, load_document, write_records, write_document
+
+settings = get_settings()
+
+# Row filter comparisons, these work on pyarrow expressions, pandas Series and plain values alike
+FILTER_OPERATORS = {
+    '==': operator.eq,
+    '!=': operator.ne,
+    '<': operator.lt,
+    '<=': operator.le,
+    '>': operator.gt,
+    '>=': operator.ge,
+}
+
+
+def _arrow_filter(filters: list[dict]) -> pa_compute.Expression:
+    """All filters as one Arrow expression, rows with a missing value never match."""
+    expression = None
+    for row_filter in filters:
+        field = pa_compute.field(row_filter['column'])
+        if row_filter['op'] in ('in', 'not in'):
+            term = field.isin(row_filter['value'])
+            if row_filter['op'] == 'not in':
+                term = ~term
+        else:
+            term = FILTER_OPERATORS[row_filter['op']](field, row_filter['value'])
+        term = term & field.is_valid()
+        expression = term if expression is None else expression & term
+    return expression
+
+
+def _pandas_filter(df: pd.DataFrame, filters: list[dict]) -> pd.Series:
+    """Boolean mask of the rows matching every filter, rows with a missing value never match."""
+    mask = pd.Series(True, index=df.index)
+    for row_filter in filters:
+        values = df[row_filter['column']]
+        if row_filter['op'] in ('in', 'not in'):
+            term = values.isin(row_filter['value'])
+            if row_filter['op'] == 'not in':
+                term = ~term
+        else:
+            term = FILTER_OPERATORS[row_filter['op']](values, row_filter['value'])
+        mask &= term & values.notna()
+    return mask
+
+
+def _record_matches(record: dict, filters: list[dict]) -> bool:
+    """Whether a JSON or YAML record matches every filter, a missing key never matches."""
+    for row_filter in filters:
+        value = record.get(row_filter['column'])
+        if value is None:
+            return False
+        if row_filter['op'] == 'in':
+            matched = value in row_filter['value']
+        elif row_filter['op'] == 'not in':
+            matched = value not in row_filter['value']
+        else:
+            matched = FILTER_OPERATORS[row_filter['op']](value, row_filter['value'])
+        if not matched:
+            return False
+    return True
+
+
+class _CsvTypeDrift(Exception):
+    """A later batch of a CSV does not parse as the dtypes of its first batch."""
+
 
 class PandasConverter(ConverterInterface):
-    supported_input_formats: set = {
-        'csv', 
-        'xlsx', 
-        'json', 
-        'parquet', 
-        'yaml'
-    }
-    supported_output_formats: set = set(supported_input_formats)
+    manifest = PANDAS
+    # Conversions the Arrow engine handles without building a pandas DataFrame
+    arrow_input_formats: set = {'csv', 'parquet'}
+    arrow_output_formats: set = {'csv', 'parquet'}
+    # Conversions that can move data through in batches instead of loading the whole input,
+    # JSON and YAML inputs only when their top level is an array of records
+    streaming_input_formats: set = {'csv', 'parquet', 'json', 'yaml', 'ndjson'}
+    streaming_output_formats: set = {'csv', 'parquet', 'json', 'yaml', 'ndjson'}
+    # Document formats converted between each other as is, keeping nested structure
+    document_formats: set = {'json', 'yaml', 'ndjson'}
 
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize Pandas converter.
         
@@ -23,8 +100,12 @@ class PandasConverter(ConverterInterface):
             output_dir: Directory where the output file will be saved
             input_type: Format of the input file (e.g., "csv", "xlsx")
             output_type: Format of the output file (e.g., "csv", "xlsx")
+            options: Conversion options, see supported_options
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
+        super().__init__(input_file, output_dir, input_type, output_type, options)
+        self.columns: Optional[list[str]] = self.options.get('columns')
+        self.filters: list[dict] = self.options.get('filters') or []
+        self.limit: Optional[int] = self.options.get('limit')
     
     def __can_convert(self) -> bool:
         """
@@ -64,50 +145,62 @@ class PandasConverter(ConverterInterface):
         if os.path.exists(output_file) and not overwrite:
             raise FileExistsError(f"Output file {output_file} already exists and overwrite is set to False.")
         
-        # Handle YAML <-> JSON conversions directly (preserve nested structure)
-        if self.input_type in ['yaml', 'json'] and self.output_type in ['yaml', 'json']:
-            if self.input_type == 'yaml':
-                with open(self.input_file, 'r') as f:
-                    data = yaml.safe_load(f)
-            else:  # json
-                with open(self.input_file, 'r') as f:
-                    data = json.load(f)
-            
-            if self.output_type == 'yaml':
-                with open(output_file, 'w') as f:
-                    yaml.dump(data, f, default_flow_style=False, sort_keys=False)
-            else:  # json
-                with open(output_file, 'w') as f:
-                    json.dump(data, f, indent=2)
-            
+        # Handle YAML <-> JSON <-> NDJSON conversions directly (preserve nested structure)
+        if self.input_type in self.document_formats and self.output_type in self.document_formats:
+            sequence = is_sequence(self.input_file, self.input_type)
+            if self.options and not sequence:
+                raise ValueError("Column selection and filters need an array of records")
+            with open(output_file, 'w') as f:
+                if sequence:
+                    # Arrays are moved through one item at a time
+                    write_records(self.__select_records(iter_records(self.input_file, self.input_type)), f, self.output_type)
+                else:
+                    write_document(load_document(self.input_file, self.input_type), f, self.output_type)
+            return [output_file]
+
+        if (
+            settings.pandas_engine == 'arrow'
+            and self.input_type in self.arrow_input_formats
+            and self.output_type in self.arrow_output_formats
+        ):
+            self.__convert_arrow(output_file)
+            return [output_file]
+
+        # Large inputs are moved through in batches so memory stays bounded, with a limit
+        # reading stops as soon as enough rows were found
+        if (
+            self.input_type in self.streaming_input_formats
+            and self.output_type in self.streaming_output_formats
+            and (os.path.getsize(self.input_file) >= settings.pandas_streaming_threshold_bytes or self.limit is not None)
+            and (self.input_type not in self.document_formats or is_sequence(self.input_file, self.input_type))
+        ):
+            self.__convert_streaming(output_file)
             return [output_file]
         
         # For tabular conversions, use pandas
         df = None
         if self.input_type == 'csv':
-            df = pd.read_csv(self.input_file)
+            df = pd.read_csv(self.input_file, usecols=self.__read_columns(), nrows=self.__read_rows())
         elif self.input_type == 'xlsx':
-            df = pd.read_excel(self.input_file)
-        elif self.input_type == 'json':
-            with open(self.input_file, 'r') as f:
-                data = json.load(f)
-            # Try to convert to DataFrame - if it's a list of dicts, it works directly
-            if isinstance(data, list):
-                df = pd.DataFrame(data)
-            else:
-                # For nested structures, flatten them
-                df = pd.json_normalize(data)
+            df = pd.read_excel(self.input_file, nrows=self.__read_rows())
         elif self.input_type == 'parquet':
-            df = pd.read_parquet(self.input_file)
-        elif self.input_type == 'yaml':
-            with open(self.input_file, 'r') as f:
-                data = yaml.safe_load(f)
+            # Filters skip whole row groups by their statistics before any rows are decoded
+            df = pd.read_parquet(
+                self.input_file,
+                columns=self.__read_columns(),
+                filters=_arrow_filter(self.filters) if self.filters else None
+            )
+        elif self.input_type in self.document_formats:
+            data = load_document(self.input_file, self.input_type)
             # Try to convert to DataFrame - if it's a list of dicts, it works directly
             if isinstance(data, list):
                 df = pd.DataFrame(data)
             else:
                 # For nested structures, flatten them
                 df = pd.json_normalize(data)
+        df = self.__select(df)
+        if self.limit is not None:
+            df = df.head(self.limit)
         
         # Write DataFrame to output format
         if self.output_type == 'csv':
@@ -118,8 +211,339 @@ class PandasConverter(ConverterInterface):
             df.to_json(output_file, orient='records', indent=2)
         elif self.output_type == 'parquet':
             df.to_parquet(output_file, index=False)
+        elif self.output_type == 'ndjson':
+            df.to_json(output_file, orient='records', lines=True)
         elif self.output_type == 'yaml':
             with open(output_file, 'w') as f:
-                yaml.dump(df.to_dict(orient='records'), f, default_flow_style=False)
+                write_records(self.__iter_rows(df), f, 'yaml', sort_keys=True)
         
-        return [output_file]
\ No newline at end of file
+        return [output_file]
+
+    def __read_columns(self) -> Optional[list[str]]:
+        """Columns to read from the input, the selected ones plus those only filters use. None reads all."""
+        if self.columns is None:
+            return None
+        return list(dict.fromkeys(self.columns + [row_filter['column'] for row_filter in self.filters]))
+
+    def __read_rows(self) -> Optional[int]:
+        """Rows to read from the start of the input, None reads all. Filters may need more rows than the limit."""
+        return None if self.filters else self.limit
+
+    def __take(self, batches: Iterator) -> Iterator:
+        """Stop after limit rows, batches are DataFrames or Arrow record batches."""
+        if self.limit is None:
+            yield from batches
+            return
+        remaining = self.limit
+        for batch in batches:
+            batch = batch[:remaining]
+            remaining -= len(batch)
+            yield batch
+            if remaining == 0:
+                return
+
+    def __select(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Apply the filters and column selection to a DataFrame."""
+        used = dict.fromkeys((self.columns or []) + [row_filter['column'] for row_filter in self.filters])
+        missing = [column for column in used if column not in df.columns]
+        if missing:
+            raise ValueError(f"Columns not found: {', '.join(missing)}")
+        if self.filters:
+            df = df[_pandas_filter(df, self.filters)]
+        if self.columns is not None:
+            df = df[self.columns]
+        return df
+
+    def __select_arrow(self, data: pa.Table | pa.RecordBatch) -> pa.Table | pa.RecordBatch:
+        """Apply the filters and column selection to Arrow data."""
+        if self.filters:
+            data = data.filter(_arrow_filter(self.filters))
+        if self.columns is not None:
+            data = data.select(self.columns)
+        return data
+
+    def __select_records(self, records: Iterator) -> Iterator:
+        """
+        Apply the filters and column selection to JSON or YAML records.
+
+        Records may leave out keys, so a selected or filtered column only has
+        to appear in one of the records read. Columns that appeared in none
+        fail the conversion as they do for tables.
+        """
+        if not self.options:
+            yield from records
+            return
+        used = dict.fromkeys((self.columns or []) + [row_filter['column'] for row_filter in self.filters])
+        unseen = set(used)  # Columns not in any record read so far
+        read_any = False
+        kept = 0
+        for record in records:
+            if kept == self.limit:
+                break
+            if not isinstance(record, dict):
+                raise ValueError("Column selection and filters need an array of records")
+            read_any = True
+            if unseen:
+                unseen.difference_update(record.keys())
+            if self.filters and not _record_matches(record, self.filters):
+                continue
+            if self.columns is not None:
+                record = {column: record[column] for column in self.columns if column in record}
+            kept += 1
+            yield record
+        if read_any and unseen:
+            raise ValueError(f"Columns not found: {', '.join(column for column in used if column in unseen)}")
+
+    def __parquet_batches(self) -> tuple[pa.Schema, Iterator[pa.RecordBatch]]:
+        """
+        Stream the selected rows and columns of a Parquet input.
+
+        Unselected columns are never read, with filters, row groups whose
+        statistics rule out every row are skipped without being decoded.
+        """
+        batch_size = min(settings.pandas_chunk_rows, self.__read_rows() or settings.pandas_chunk_rows)
+        if self.filters:
+            scanner = pa_dataset.dataset(self.input_file, format='parquet').scanner(
+                columns=self.columns,
+                filter=_arrow_filter(self.filters),
+                batch_size=batch_size
+            )
+            return scanner.projected_schema, self.__take(scanner.to_batches())
+        source = pq.ParquetFile(self.input_file)
+        if self.columns is None:
+            return source.schema_arrow, self.__take(source.iter_batches(batch_size=batch_size))
+        schema = pa.schema([source.schema_arrow.field(column) for column in self.columns])
+        batches = source.iter_batches(batch_size=batch_size, columns=self.columns)
+        return schema, self.__take(batch.select(self.columns) for batch in batches)
+
+    @staticmethod
+    def __iter_rows(df: pd.DataFrame) -> Iterator[dict]:
+        """Yield rows as dicts, converting a slice at a time instead of the whole frame at once."""
+        for start in range(0, len(df), settings.pandas_chunk_rows):
+            yield from df.iloc[start:start + settings.pandas_chunk_rows].to_dict(orient='records')
+
+    @staticmethod
+    def __common_dtype(a, b):
+        """Narrowest dtype that holds values of both dtypes, as read_csv would infer over the whole file."""
+        if a == b:
+            return a
+        if pd.api.types.is_bool_dtype(a) or pd.api.types.is_bool_dtype(b):
+            return str
+        if pd.api.types.is_numeric_dtype(a) and pd.api.types.is_numeric_dtype(b):
+            return np.result_type(a, b)
+        return str
+
+    def __scan_dtypes(self, chunks: Iterator[pd.DataFrame]) -> dict:
+        """
+        Scan the input once to find dtypes that fit every chunk.
+
+        Types inferred chunk by chunk can disagree (an int column with a
+        missing value in one chunk is float there), which would give
+        mismatched Parquet row groups or differently formatted numbers.
+        Columns are returned in order of first appearance.
+        """
+        dtypes = {}
+        has_nulls = set()
+        for chunk in chunks:
+            for column in chunk.columns:
+                values = chunk[column]
+                dtypes.setdefault(column, None)
+                nulls = values.isna()
+                if nulls.any():
+                    has_nulls.add(column)
+                if nulls.all():
+                    # An empty chunk says nothing about the column's type
+                    continue
+                dtype = values.dtype
+                if dtype == object and values.dropna().map(type).eq(bool).all():
+                    dtype = np.dtype(bool)
+                dtypes[column] = dtype if dtypes[column] is None else self.__common_dtype(dtypes[column], dtype)
+
+        for column, dtype in dtypes.items():
+            if dtype is None:
+                dtypes[column] = np.dtype(float)
+            elif column in has_nulls and pd.api.types.is_bool_dtype(dtype):
+                dtypes[column] = 'boolean'
+            elif column in has_nulls and pd.api.types.is_integer_dtype(dtype):
+                dtypes[column] = np.dtype(float)
+        return dtypes
+
+    def __iter_record_chunks(self) -> Iterator[list]:
+        """Yield the records of a JSON, YAML or NDJSON array in lists of at most pandas_chunk_rows."""
+        chunk = []
+        for record in islice(iter_records(self.input_file, self.input_type), self.__read_rows()):
+            chunk.append(record)
+            if len(chunk) == settings.pandas_chunk_rows:
+                yield chunk
+                chunk = []
+        if chunk:
+            yield chunk
+
+    def __iter_csv_batches(self, scan_whole_file: bool) -> Iterator[pd.DataFrame]:
+        """
+        Parse a CSV in batches of at most pandas_chunk_rows rows, all with the same dtypes.
+
+        The dtypes are inferred from the first batch and the file is parsed
+        straight to them, so it is read once. A later batch that does not
+        parse as those dtypes (a missing value in an int column, text in a
+        float one...) raises _CsvTypeDrift, the caller then starts over with
+        scan_whole_file, which scans every batch for dtypes first.
+        """
+        read_options = {'chunksize': settings.pandas_chunk_rows, 'usecols': self.__read_columns(), 'nrows': self.__read_rows()}
+        if scan_whole_file:
+            dtypes = self.__scan_dtypes(pd.read_csv(self.input_file, **read_options))
+        else:
+            first_rows = min(settings.pandas_chunk_rows, self.__read_rows() or settings.pandas_chunk_rows)
+            dtypes = self.__scan_dtypes([pd.read_csv(self.input_file, usecols=self.__read_columns(), nrows=first_rows)])
+        batches = iter(pd.read_csv(self.input_file, dtype=dtypes, **read_options))
+        while True:
+            try:
+                df = next(batches)
+            except StopIteration:
+                return
+            except (ValueError, TypeError, OverflowError) as e:
+                if scan_whole_file:
+                    raise
+                raise _CsvTypeDrift() from e
+            yield df
+
+    def __iter_batches(self, scan_whole_csv: bool = False) -> Iterator[pd.DataFrame]:
+        """Yield the selected rows and columns of the input as DataFrames of at most pandas_chunk_rows rows."""
+        if self.input_type == 'csv':
+            yield from self.__take(self.__select(df) for df in self.__iter_csv_batches(scan_whole_csv))
+        elif self.input_type == 'parquet':
+            # Rows and columns are selected by the reader
+            for batch in self.__parquet_batches()[1]:
+                yield batch.to_pandas()
+        else:  # json, yaml, ndjson
+            # Records may leave out keys, every batch gets the columns of the whole input
+            dtypes = self.__scan_dtypes(pd.DataFrame(chunk) for chunk in self.__iter_record_chunks())
+            yield from self.__take(self.__conform(pd.DataFrame(chunk, columns=list(dtypes)), dtypes) for chunk in self.__iter_record_chunks())
+
+    def __conform(self, df: pd.DataFrame, dtypes: dict) -> pd.DataFrame:
+        """Cast a batch of records to the dtypes found for the whole input, then select from it."""
+        for column, dtype in dtypes.items():
+            values = df[column]
+            # Mixed columns stay object, as they would be when read in one go
+            if values.dtype != dtype and (dtype is not str or values.isna().all()):
+                df[column] = values.astype(dtype)
+        return self.__select(df)
+
+    def __convert_streaming(self, output_file: str):
+        """
+        Convert batch by batch, holding one batch in memory at a time.
+
+        Produces the same file as the in-memory path: CSV gets one header,
+        Parquet gets one row group per batch, JSON is one records array,
+        YAML one sequence.
+        """
+        try:
+            self.__write_batches(output_file)
+        except _CsvTypeDrift:
+            # Rare, the column types changed after the first batch. The partial output is overwritten.
+            self.__write_batches(output_file, scan_whole_csv=True)
+
+    def __write_batches(self, output_file: str, scan_whole_csv: bool = False):
+        """Write the batches of the input to output_file, see __convert_streaming()."""
+        if self.input_type == 'parquet' and self.output_type == 'parquet':
+            schema, batches = self.__parquet_batches()
+            with pq.ParquetWriter(output_file, schema) as writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+            return
+
+        if self.output_type == 'parquet':
+            writer = None
+            try:
+                for df in self.__iter_batches(scan_whole_csv):
+                    table = pa.Table.from_pandas(df, schema=writer.schema if writer else None, preserve_index=False)
+                    if writer is None:
+                        writer = pq.ParquetWriter(output_file, table.schema)
+                    writer.write_table(table)
+                if writer is None:
+                    pd.DataFrame().to_parquet(output_file, index=False)
+            finally:
+                if writer is not None:
+                    writer.close()
+            return
+
+        with open(output_file, 'w', newline='') as f:
+            first = True
+            if self.output_type == 'json':
+                f.write('[')
+            for df in self.__iter_batches(scan_whole_csv):
+                if self.output_type == 'csv':
+                    df.to_csv(f, index=False, header=first)
+                    first = False
+                elif len(df) == 0:
+                    continue
+                elif self.output_type == 'ndjson':
+                    df.to_json(f, orient='records', lines=True)
+                elif self.output_type == 'yaml':
+                    write_records(self.__iter_rows(df), f, 'yaml', sort_keys=True)
+                    first = False
+                else:  # json
+                    # Splice each batch's records into one array, matching to_json(orient='records', indent=2)
+                    records = df.to_json(orient='records', indent=2)
+                    f.write(('' if first else ',') + records[1:-2])
+                    first = False
+            if self.output_type == 'json':
+                f.write('\n\n]' if first else '\n]')
+            elif self.output_type == 'yaml' and first:
+                write_records([], f, 'yaml')
+
+    def __convert_arrow(self, output_file: str):
+        """
+        Convert with pyarrow alone, data stays in Arrow memory from reader to writer.
+
+        CSV is parsed on all cores, low-cardinality string columns are
+        dictionary encoded. Inputs over the streaming threshold are moved
+        through one record batch at a time.
+        """
+        streaming = os.path.getsize(self.input_file) >= settings.pandas_streaming_threshold_bytes or self.limit is not None
+        # Empty fields are missing values, as with pandas. Unselected columns are skipped by the parser.
+        convert_options = pa_csv.ConvertOptions(
+            strings_can_be_null=True,
+            auto_dict_encode=not streaming,
+            include_columns=self.__read_columns()
+        )
+        write_options = pa_csv.WriteOptions(quoting_style="needed")
+
+        if not streaming:
+            if self.input_type == 'csv':
+                table = self.__select_arrow(pa_csv.read_csv(self.input_file, convert_options=convert_options))
+            else:  # parquet
+                table = pq.read_table(
+                    self.input_file,
+                    columns=self.columns,
+                    filters=_arrow_filter(self.filters) if self.filters else None
+                )
+            if self.output_type == 'parquet':
+                pq.write_table(table, output_file)
+            else:  # csv
+                pa_csv.write_csv(table, output_file, write_options=write_options)
+            return
+
+        if self.input_type == 'csv':
+            reader = pa_csv.open_csv(self.input_file, convert_options=convert_options)
+            schema = reader.schema
+            if self.columns is not None:
+                schema = pa.schema([schema.field(column) for column in self.columns])
+            batches = self.__take(self.__select_arrow(batch) for batch in reader)
+        else:  # parquet
+            schema, batches = self.__parquet_batches()
+        if self.output_type == 'parquet':
+            writer = pq.ParquetWriter(output_file, schema)
+        else:  # csv
+            writer = pa_csv.CSVWriter(output_file, schema, write_options=write_options)
+        try:
+            with writer:
+                for batch in batches:
+                    writer.write_batch(batch)
+        except pa.ArrowInvalid:
+            if self.input_type != 'csv':
+                raise
+            # Streaming CSV types are inferred from the first block, a later block that
+            # does not fit them needs the pandas path, which scans the whole file for types first
+            os.remove(output_file)
+            self.__convert_streaming(output_file)
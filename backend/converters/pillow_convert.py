@@ -1,19 +1,34 @@
 import os
 import sys
+from contextlib import contextmanager
+from functools import cache
 from pathlib import Path
 from typing import Optional
 from io import BytesIO
-from PIL import Image
-from pillow_heif import HeifImagePlugin
-
-# Add Homebrew library paths for Cairo on macOS
-# This is a temporary workaround until we can get Docker properly set up
-if sys.platform == 'darwin':  # macOS
-    os.environ['DYLD_LIBRARY_PATH'] = '/opt/homebrew/lib:/usr/local/lib:' + os.environ.get('DYLD_LIBRARY_PATH', '')
-    # Also try to help ctypes find the library
+from PIL import ExifTags, Image, ImageColor, ImageOps, ImageSequence
+from pillow_heif import register_heif_opener
+from .converter_interface import ConverterInterface
+from .manifests import PILLOW
+
+# Once per process, when the first image conversion imports this module
+register_heif_opener()
+
+
+@contextmanager
+def _homebrew_library_lookup():
+    """
+    Let ctypes find Homebrew's Cairo on macOS while cairosvg loads it.
+
+    ctypes.util.find_library is only patched for the duration of the import,
+    so nothing else in the process resolves libraries differently.
+    """
+    if sys.platform != 'darwin':
+        yield
+        return
     import ctypes.util
     original_find_library = ctypes.util.find_library
-    def custom_find_library(name):
+
+    def find_library(name):
         # Try homebrew paths first
         for prefix in ['/opt/homebrew', '/usr/local']:
             for lib_dir in ['lib', 'lib64']:
@@ -22,31 +37,120 @@ if sys.platform == 'darwin':  # macOS
                     if os.path.exists(path):
                         return path
         return original_find_library(name)
-    ctypes.util.find_library = custom_find_library
 
-import cairosvg
-from .converter_interface import ConverterInterface
+    ctypes.util.find_library = find_library
+    try:
+        yield
+    finally:
+        ctypes.util.find_library = original_find_library
+
+
+@cache
+def _cairosvg():
+    """Import cairosvg, and with it the Cairo library, the first time an SVG is converted."""
+    with _homebrew_library_lookup():
+        import cairosvg
+        import cairosvg.helpers
+        import cairosvg.parser
+    return cairosvg
+
+# Resize options that are also accepted at the top level of the options
+RESIZE_OPTIONS = ('width', 'height', 'max_dimension')
+# Transforms that work pixel by pixel, they give the same result before or after a resize
+PIXELWISE_TRANSFORMS = {'strip_metadata', 'convert_mode', 'flatten'}
+# EXIF orientations that swap width and height
+TRANSPOSING_ORIENTATIONS = {5, 6, 7, 8}
+# Image.info keys holding metadata rather than anything needed to encode the image
+METADATA_KEYS = ('exif', 'icc_profile', 'xmp', 'XML:com.adobe.xmp', 'comment', 'dpi', 'photoshop')
+# Output formats Pillow writes EXIF and ICC profiles to
+METADATA_OUTPUT_FORMATS = {'jpeg', 'png', 'webp', 'tiff', 'tif', 'heif', 'heic'}
+
+
+def fit_size(size: tuple[float, float], resize: dict) -> Optional[tuple[int, int]]:
+    """
+    Output size for an image of the given size under resize options.
+
+    "width"/"height" fit the image inside that box, possibly enlarging it,
+    "max_dimension" shrinks it so its longest side is at most that.
+
+    Returns:
+        The (width, height) to resize to, None if no resize option is set
+    """
+    width, height = size
+    scale = None
+    if resize.get('width') or resize.get('height'):
+        scale = min(
+            resize['width'] / width if resize.get('width') else float('inf'),
+            resize['height'] / height if resize.get('height') else float('inf')
+        )
+    if resize.get('max_dimension'):
+        scale = min(1.0 if scale is None else scale, resize['max_dimension'] / max(width, height))
+    if scale is None:
+        return None
+    return max(1, round(width * scale)), max(1, round(height * scale))
+
+
+def flatten(img: Image.Image, background: tuple = (255, 255, 255)) -> Image.Image:
+    """Composite an image with transparency onto a solid background, other images are returned as is."""
+    if img.mode in ('P', 'PA'):
+        img = img.convert('RGBA')
+    if img.mode not in ('RGBA', 'LA'):
+        return img
+    canvas = Image.new('RGB', img.size, background)
+    canvas.paste(img.convert('RGBA'), mask=img.getchannel('A'))
+    canvas.info.update({key: img.info[key] for key in METADATA_KEYS if key in img.info})
+    return canvas
+
+
+def apply_transform(img: Image.Image, transform: dict, target_size: Optional[tuple[int, int]] = None) -> Image.Image:
+    """
+    Apply one step of a transform pipeline to a decoded image.
+
+    Args:
+        img: Image to transform
+        transform: Step from the "transforms" option, its "op" names the operation
+        target_size: Output size of a resize step, when worked out ahead of decoding
+
+    Returns:
+        The transformed image, possibly img itself
+    """
+    op = transform['op']
+    if op == 'crop':
+        box = (transform['left'], transform['top'], transform['left'] + transform['width'], transform['top'] + transform['height'])
+        if box[2] > img.width or box[3] > img.height:
+            raise ValueError(f"Crop region {box} is outside the {img.width}x{img.height} image")
+        return img.crop(box)
+    if op == 'rotate':
+        # Pillow rotates counter-clockwise, multiples of 90 with expand are done by transposing
+        return img.rotate(-transform['degrees'], resample=Image.Resampling.BICUBIC, expand=transform.get('expand', True))
+    if op == 'auto_orient':
+        return ImageOps.exif_transpose(img)
+    if op == 'resize':
+        target_size = target_size or fit_size(img.size, transform)
+        if target_size is None or target_size == img.size:
+            return img
+        # reducing_gap shrinks by an integer factor with reduce() before the final resample
+        return img.resize(target_size, Image.Resampling.LANCZOS, reducing_gap=2.0)
+    if op == 'strip_metadata':
+        for key in METADATA_KEYS:
+            img.info.pop(key, None)
+        img.getexif().clear()
+        return img
+    if op == 'convert_mode':
+        if img.mode == transform['mode']:
+            return img
+        if transform['mode'] == 'P':
+            return img.convert('P', palette=Image.Palette.ADAPTIVE)
+        return img.convert(transform['mode'])
+    if op == 'flatten':
+        return flatten(img, ImageColor.getrgb(transform.get('background', '#ffffff'))[:3])
+    raise ValueError(f"Unknown image transform: {op}")
+
 
 class PillowConverter(ConverterInterface):
-    supported_input_formats: set = {
-        'jpeg', 
-        'png',
-        'gif', 
-        'bmp', 
-        'tiff', 
-        'tif',
-        'webp', 
-        'ico', 
-        'ppm', 
-        'pgm', 
-        'pbm', 
-        'pcx',
-        'heif',
-        'heic',
-        'svg'
-    }
-    supported_output_formats: set = set(supported_input_formats)
-    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str):
+    manifest = PILLOW
+
+    def __init__(self, input_file: str, output_dir: str, input_type: str, output_type: str, options: Optional[dict] = None):
         """
         Initialize Pillow converter.
         
@@ -55,9 +159,53 @@ class PillowConverter(ConverterInterface):
             output_dir: Directory where the converted file will be saved
             input_type: Input file format (e.g., 'jpg', 'png', 'bmp')
             output_type: Output file format (e.g., 'jpg', 'png', 'bmp')
+            options: Conversion options, see supported_options
         """
-        super().__init__(input_file, output_dir, input_type, output_type)
-        HeifImagePlugin.register_heif_opener()
+        super().__init__(input_file, output_dir, input_type, output_type, options)
+
+    def __transforms(self) -> list[dict]:
+        """The transform pipeline, the top-level resize options being a final resize step."""
+        transforms = list(self.options.get('transforms', []))
+        resize = {key: self.options[key] for key in RESIZE_OPTIONS if self.options.get(key)}
+        if resize:
+            transforms.append({'op': 'resize', **resize})
+        return transforms
+
+    @staticmethod
+    def __leading_resize(transforms: list[dict], size: tuple[float, float], orientation: int) -> Optional[tuple[int, tuple[int, int], tuple[int, int]]]:
+        """
+        Find a resize that can be folded into decoding.
+
+        That is a resize only preceded by pixelwise steps and auto-orienting,
+        so its output size is known from the size of the file alone.
+
+        Args:
+            transforms: The transform pipeline
+            size: Size of the image as stored in the file
+            orientation: EXIF orientation of the image
+
+        Returns:
+            Index of the resize step, its output size, and that size in the
+            orientation of the stored image. None if there is no such resize.
+        """
+        transposed = False
+        for index, transform in enumerate(transforms):
+            op = transform['op']
+            if op == 'resize':
+                target_size = fit_size(size[::-1] if transposed else size, transform)
+                return index, target_size, target_size[::-1] if transposed else target_size
+            if op == 'auto_orient':
+                transposed = transposed != (orientation in TRANSPOSING_ORIENTATIONS)
+                orientation = 1
+            elif op not in PIXELWISE_TRANSFORMS:
+                return None
+        return None
+
+    def __svg_size(self) -> tuple[float, float]:
+        """Intrinsic size of the SVG from its width, height and viewBox, zeros if it cannot be told without rendering."""
+        cairosvg = _cairosvg()
+        width, height, _ = cairosvg.helpers.node_format(None, cairosvg.parser.Tree(url=self.input_file))
+        return width, height
     
     def __can_convert(self) -> bool:
         """
@@ -76,21 +224,6 @@ class PillowConverter(ConverterInterface):
         # All supported image format conversions are valid with Pillow
         return True
 
-    @classmethod
-    def get_formats_compatible_with(cls, format_type: str) -> set:
-        """
-        Get the set of compatible formats for conversion.
-        
-        Args:
-            format_type: The input format to check compatibility for.
-        Returns:
-            Set of compatible formats.
-        """
-        base_formats = super().get_formats_compatible_with(format_type)
-        # Can convert FROM SVG but not TO SVG (rasterization only)
-        base_formats.discard('svg')
-        return base_formats
-    
     def convert(self, overwrite: bool = True, quality: Optional[str] = None) -> list[str]:
         """
         Convert the input image file to the output format using Pillow.
@@ -127,28 +260,60 @@ class PillowConverter(ConverterInterface):
             return [output_file]
         
         try:
-            # Handle SVG input specially
+            # Every transform runs on the one decoded image, a multi-step job costs a single decode and encode
+            transforms = self.__transforms()
+            leading_resize = None
             input_fmt = self.input_type.lower()
             if input_fmt == 'svg':
-                # Convert SVG to PNG with transparency using cairosvg
-                png_data = cairosvg.svg2png(url=self.input_file)
+                # Convert SVG to PNG with transparency using cairosvg. When resizing first, rasterize
+                # straight at the target size instead of rendering large and shrinking.
+                if transforms:
+                    svg_width, svg_height = self.__svg_size()
+                    if svg_width and svg_height:
+                        leading_resize = self.__leading_resize(transforms, (svg_width, svg_height), 1)
+                if leading_resize is None:
+                    png_data = _cairosvg().svg2png(url=self.input_file)
+                else:
+                    render_size = leading_resize[2]
+                    png_data = _cairosvg().svg2png(url=self.input_file, output_width=render_size[0], output_height=render_size[1])
                 img = Image.open(BytesIO(png_data))
             else:
                 # Open the image
                 img = Image.open(self.input_file)
+                orientation = img.getexif().get(ExifTags.Base.Orientation, 1)
+                if transforms and orientation != 1 and not any(transform['op'] == 'auto_orient' for transform in transforms):
+                    # Crops and resize bounds are meant for the image as shown, and stripping would drop
+                    # the tag that shows it upright, so apply the orientation before anything else
+                    transforms.insert(0, {'op': 'auto_orient'})
+                if transforms:
+                    leading_resize = self.__leading_resize(transforms, img.size, orientation)
+                if leading_resize is not None:
+                    # JPEG decodes at 1/2, 1/4 or 1/8 scale straight from its DCT coefficients, no larger than needed
+                    img.draft(None, leading_resize[2])
+
+            output_fmt = self.output_type.lower()
+            animated = output_fmt in self.animated_output_formats and getattr(img, 'n_frames', 1) > 1
+            if animated:
+                # Every frame goes through the pipeline, the first one is saved with the rest appended
+                frames = []
+                durations = []
+                for frame in ImageSequence.Iterator(img):
+                    durations.append(frame.info.get('duration', 100))
+                    frame = frame.copy()
+                    for transform in transforms:
+                        frame = apply_transform(frame, transform)
+                    frames.append(frame)
+                loop = img.info.get('loop', 0)
+                img = frames[0]
+            else:
+                for index, transform in enumerate(transforms):
+                    target_size = leading_resize[1] if leading_resize is not None and index == leading_resize[0] else None
+                    img = apply_transform(img, transform, target_size)
             
             # Handle transparency for formats that don't support it
-            output_fmt = self.output_type.lower()
             if output_fmt in ['jpg', 'jpeg'] and img.mode in ['RGBA', 'LA', 'P']:
                 # Convert RGBA to RGB for JPEG (add white background)
-                if img.mode == 'P':
-                    img = img.convert('RGBA')
-                if img.mode in ['RGBA', 'LA']:
-                    background = Image.new('RGB', img.size, (255, 255, 255))
-                    if img.mode == 'LA':
-                        img = img.convert('RGBA')
-                    background.paste(img, mask=img.split()[-1])  # Use alpha channel as mask
-                    img = background
+                img = flatten(img)
             
             # Set quality parameters
             save_kwargs = {}
@@ -164,6 +329,17 @@ class PillowConverter(ConverterInterface):
             if output_fmt == 'png':
                 save_kwargs['optimize'] = True
             
+            # Pillow only writes metadata it is handed, whatever strip_metadata left is carried over
+            if output_fmt in METADATA_OUTPUT_FORMATS:
+                exif = img.getexif()
+                if exif:
+                    save_kwargs['exif'] = exif.tobytes()
+                if img.info.get('icc_profile'):
+                    save_kwargs['icc_profile'] = img.info['icc_profile']
+
+            if animated:
+                save_kwargs.update(save_all=True, append_images=frames[1:], duration=durations, loop=loop)
+
             # Save the image
             img.save(output_file, **save_kwargs)
             
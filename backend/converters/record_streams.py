@@ -0,0 +1,214 @@
+"""
+Incremental readers and writers for JSON, YAML and NDJSON documents.
+
+A top-level array (or YAML sequence, or NDJSON file) is read one item at a
+time and written one item at a time, so record dumps of any size convert
+with memory bounded by the largest single record.
+"""
+import json
+import textwrap
+import yaml
+from itertools import islice
+from typing import Any, Iterable, Iterator, TextIO
+
+# Characters read per refill of the JSON buffer
+JSON_READ_SIZE = 1024 * 1024
+# Records serialized per yaml.dump call, large enough to amortize the dumper setup
+YAML_DUMP_BATCH = 1000
+
+_json_decoder = json.JSONDecoder()
+_JSON_WHITESPACE = ' \t\n\r'
+# Characters that may continue a number cut off at the end of the buffer
+_JSON_NUMBER_CHARS = '0123456789+-.eE'
+
+
+def is_sequence(path: str, fmt: str) -> bool:
+    """
+    Whether the document's top level is an array, without reading past its first token.
+
+    Args:
+        path: Document to inspect
+        fmt: "json", "yaml" or "ndjson"
+    """
+    if fmt == 'ndjson':
+        return True
+    if fmt == 'json':
+        with open(path, 'r') as f:
+            while True:
+                chunk = f.read(JSON_READ_SIZE)
+                if not chunk:
+                    return False
+                stripped = chunk.lstrip(_JSON_WHITESPACE)
+                if stripped:
+                    return stripped[0] == '['
+    with open(path, 'r') as f:
+        loader = yaml.SafeLoader(f)
+        try:
+            for _ in range(2):  # StreamStart, DocumentStart
+                if loader.check_event(yaml.StreamEndEvent):
+                    return False
+                loader.get_event()
+            return loader.check_event(yaml.SequenceStartEvent)
+        finally:
+            loader.dispose()
+
+
+def iter_records(path: str, fmt: str) -> Iterator[Any]:
+    """
+    Yield the items of a top-level array one at a time.
+
+    Args:
+        path: Document to read, is_sequence() must be true for it
+        fmt: "json", "yaml" or "ndjson"
+    """
+    if fmt == 'json':
+        return _iter_json_array(path)
+    if fmt == 'yaml':
+        return _iter_yaml_sequence(path)
+    return _iter_ndjson(path)
+
+
+def load_document(path: str, fmt: str) -> Any:
+    """Read a whole document, an NDJSON file becomes a list of its lines."""
+    if fmt == 'ndjson':
+        return list(_iter_ndjson(path))
+    with open(path, 'r') as f:
+        if fmt == 'json':
+            return json.load(f)
+        return yaml.safe_load(f)
+
+
+def write_records(records: Iterable[Any], f: TextIO, fmt: str, sort_keys: bool = False):
+    """
+    Write records as a JSON array, a YAML sequence or NDJSON lines.
+
+    Output is identical to json.dump(list, indent=2) and
+    yaml.dump(list, default_flow_style=False) of the same records.
+
+    Args:
+        records: Items to write, consumed lazily
+        f: Text file to write to
+        fmt: "json", "yaml" or "ndjson"
+        sort_keys: Sort mapping keys, YAML only
+    """
+    if fmt == 'ndjson':
+        for record in records:
+            f.write(json.dumps(record) + '\n')
+    elif fmt == 'json':
+        first = True
+        for record in records:
+            f.write(('[\n' if first else ',\n') + textwrap.indent(json.dumps(record, indent=2), '  '))
+            first = False
+        f.write('[]' if first else '\n]')
+    else:  # yaml
+        records = iter(records)
+        empty = True
+        while batch := list(islice(records, YAML_DUMP_BATCH)):
+            # Each dump of a list starts its items with "- ", concatenated they form one sequence
+            yaml.dump(batch, f, default_flow_style=False, sort_keys=sort_keys)
+            empty = False
+        if empty:
+            yaml.dump([], f, default_flow_style=False)
+
+
+def write_document(data: Any, f: TextIO, fmt: str):
+    """Write a whole document, a non-list document becomes a single NDJSON line."""
+    if fmt == 'json':
+        json.dump(data, f, indent=2)
+    elif fmt == 'yaml':
+        yaml.dump(data, f, default_flow_style=False, sort_keys=False)
+    else:  # ndjson
+        write_records(data if isinstance(data, list) else [data], f, fmt)
+
+
+def _iter_json_array(path: str) -> Iterator[Any]:
+    """Decode the items of a top-level JSON array from a sliding buffer."""
+    with open(path, 'r') as f:
+        buffer = ''
+        pos = 0
+        eof = False
+
+        def refill() -> bool:
+            # Drop what was consumed and read more, at least doubling so an item
+            # spanning many reads is not decoded from scratch over and over
+            nonlocal buffer, pos, eof
+            if eof:
+                return False
+            chunk = f.read(max(JSON_READ_SIZE, len(buffer) - pos))
+            buffer = buffer[pos:] + chunk
+            pos = 0
+            eof = not chunk
+            return bool(chunk)
+
+        def next_token() -> str:
+            # Skip whitespace and return the next character, '' at the end of the file
+            nonlocal pos
+            while True:
+                while pos < len(buffer) and buffer[pos] in _JSON_WHITESPACE:
+                    pos += 1
+                if pos < len(buffer):
+                    return buffer[pos]
+                if not refill():
+                    return ''
+
+        if next_token() != '[':
+            raise ValueError("JSON document is not an array")
+        pos += 1
+        expect_item = False  # Set after a comma, when ']' is no longer allowed
+        need_comma = False
+        while True:
+            token = next_token()
+            if token == ']' and not expect_item:
+                pos += 1
+                break
+            if need_comma:
+                if token != ',':
+                    raise ValueError(f"Expected ',' or ']' in JSON array, found {token!r}")
+                pos += 1
+                expect_item, need_comma = True, False
+                continue
+            try:
+                item, end = _json_decoder.raw_decode(buffer, pos)
+            except json.JSONDecodeError:
+                if refill():
+                    continue
+                raise
+            # A number or literal at the end of the buffer may continue past it, as may a number
+            # followed by nothing but the start of a fraction or exponent ("1.", "1e", "1e+")
+            if len(buffer) - end <= 2 and not buffer[end:].strip(_JSON_NUMBER_CHARS) and refill():
+                continue
+            pos = end
+            expect_item, need_comma = False, True
+            yield item
+
+        if next_token():
+            raise ValueError("Extra data after the JSON array")
+
+
+def _iter_yaml_sequence(path: str) -> Iterator[Any]:
+    """Compose and construct the items of a top-level YAML sequence one node at a time."""
+    with open(path, 'r') as f:
+        loader = yaml.SafeLoader(f)
+        try:
+            loader.get_event()  # StreamStart
+            loader.get_event()  # DocumentStart
+            if not loader.check_event(yaml.SequenceStartEvent):
+                raise ValueError("YAML document is not a sequence")
+            loader.get_event()
+            while not loader.check_event(yaml.SequenceEndEvent):
+                node = loader.compose_node(None, None)
+                yield loader.construct_document(node)
+            loader.get_event()  # SequenceEnd
+            loader.get_event()  # DocumentEnd
+            # yaml.safe_load refuses a stream of several documents too, rather than drop all but the first
+            if not loader.check_event(yaml.StreamEndEvent):
+                raise ValueError("YAML file holds more than one document")
+        finally:
+            loader.dispose()
+
+
+def _iter_ndjson(path: str) -> Iterator[Any]:
+    with open(path, 'r') as f:
+        for line in f:
+            if line.strip():
+                yield json.loads(line)
@@ -1,10 +1,20 @@
 from .settings import get_settings
-from .media_types import media_type_aliases
+from .media_types import media_type_aliases, lossy_formats, compressed_formats
+from .subprocess_runner import (
+    run_command,
+    cancellation_scope,
+    CommandResult,
+    CommandTimeoutError,
+    CommandCancelledError
+)
+from .blob_store import place_blob, reference_blob, release_blob
+from .preview_store import remove_previews
 
 from .helper_functions import (
     detect_media_type,
     sanitize_extension,
+    compute_sha256,
     delete_file_and_metadata
 )
 
-__all__ = ["get_settings", "detect_media_type", "sanitize_extension", "delete_file_and_metadata", "media_type_aliases"]
\ No newline at end of file
+__all__ = ["get_settings", "detect_media_type", "sanitize_extension", "compute_sha256", "delete_file_and_metadata", "media_type_aliases", "lossy_formats", "compressed_formats", "place_blob", "reference_blob", "release_blob", "remove_previews", "run_command", "cancellation_scope", "CommandResult", "CommandTimeoutError", "CommandCancelledError"]
\ No newline at end of file
@@ -0,0 +1,81 @@
+import os
+import threading
+from pathlib import Path
+
+from db.blob_db import BlobDB
+from .preview_store import remove_previews
+from .settings import get_settings
+
+settings = get_settings()
+BLOB_DIR = settings.blob_dir
+
+# Serializes the file and refcount updates so a blob cannot be unlinked
+# between another upload finding it on disk and taking a reference to it
+_blob_lock = threading.Lock()
+# Blobs placed in the store whose reference is not recorded yet, by checksum.
+# They are kept on disk even when their reference count drops to 0.
+_placed: dict[str, int] = {}
+
+
+def blob_path(sha256_checksum: str) -> Path:
+    """Location of a blob, fanned out by checksum prefix to keep directories small."""
+    return BLOB_DIR / sha256_checksum[:2] / sha256_checksum
+
+
+def place_blob(temp_path: Path, sha256_checksum: str) -> Path:
+    """
+    Move a freshly written file into the blob store, without touching the database.
+
+    If a blob with the same checksum already exists the temporary file is
+    discarded, so duplicate uploads cost no extra disk space. The blob is
+    kept on disk until reference_blob() records the reference. A placed blob
+    that is never referenced stays in the store, the next upload of the
+    same contents picks it up.
+
+    Args:
+        temp_path: File to store, consumed by this call
+        sha256_checksum: Checksum of the file contents
+
+    Returns:
+        Path of the blob holding the contents
+    """
+    path = blob_path(sha256_checksum)
+    with _blob_lock:
+        if path.is_file():
+            temp_path.unlink()
+        else:
+            path.parent.mkdir(parents=True, exist_ok=True)
+            os.replace(temp_path, path)
+        _placed[sha256_checksum] = _placed.get(sha256_checksum, 0) + 1
+    return path
+
+
+def reference_blob(sha256_checksum: str, size_bytes: int, blob_db: BlobDB):
+    """
+    Record the reference to a blob placed by place_blob().
+
+    Args:
+        sha256_checksum: Checksum of the blob
+        size_bytes: Size of the blob
+        blob_db: Database tracking blob reference counts
+    """
+    with _blob_lock:
+        blob_db.add_reference(sha256_checksum, str(blob_path(sha256_checksum)), size_bytes)
+        if _placed[sha256_checksum] == 1:
+            del _placed[sha256_checksum]
+        else:
+            _placed[sha256_checksum] -= 1
+
+
+def release_blob(sha256_checksum: str, blob_db: BlobDB):
+    """
+    Drop a reference to a blob, deleting it and its previews from disk once nothing uses it.
+
+    Args:
+        sha256_checksum: Checksum of the blob
+        blob_db: Database tracking blob reference counts
+    """
+    with _blob_lock:
+        if blob_db.remove_reference(sha256_checksum) == 0 and sha256_checksum not in _placed:
+            blob_path(sha256_checksum).unlink(missing_ok=True)
+            remove_previews(sha256_checksum)
@@ -1,4 +1,5 @@
 import os
+import hashlib
 import mimetypes
 from fastapi import HTTPException
 import magic
@@ -6,6 +7,9 @@ import magic
 from pathlib import Path
 
 from db.file_db import FileDB
+from db.blob_db import BlobDB
+from .blob_store import release_blob
+from .preview_store import remove_previews
 
 
 def detect_media_type(file_path: Path) -> str:
@@ -23,13 +27,38 @@ def sanitize_extension(extension: str) -> str:
     cleaned = extension.strip().lstrip(".")
     return "".join(ch for ch in cleaned if ch.isalnum() or ch in {"_", "-", "."}).lower()
 
-def delete_file_and_metadata(file_id: str, file_db: FileDB, raise_if_not_found: bool = True):
-    """Helper function to delete a file and its metadata from a file database."""
+def compute_sha256(file_path: Path) -> str:
+    """
+    Hash a file in fixed-size chunks, memory use stays flat however large the file is.
+
+    Args:
+        file_path: File to hash
+
+    Returns:
+        Hex encoded sha256 of the file contents
+    """
+    with open(file_path, 'rb') as f:
+        return hashlib.file_digest(f, 'sha256').hexdigest()
+
+def delete_file_and_metadata(file_id: str, file_db: FileDB, raise_if_not_found: bool = True, blob_db: BlobDB | None = None):
+    """
+    Helper function to delete a file and its metadata from a file database.
+
+    Files stored in the blob store only have their reference released, the
+    blob itself is removed once no other metadata row points at it. Other
+    files are removed with their previews, a conversion sharing the same
+    contents simply has its preview generated again.
+    """
     metadata = file_db.get_file_metadata(file_id)
     if metadata is None:
         if raise_if_not_found:
             raise HTTPException(status_code=404, detail="File not found")
         else:
             return
-    os.unlink(metadata['storage_path'])
+    blob = blob_db.get_blob(metadata['sha256_checksum']) if blob_db else None
+    if blob is not None and blob['storage_path'] == metadata['storage_path']:
+        release_blob(metadata['sha256_checksum'], blob_db)
+    else:
+        os.unlink(metadata['storage_path'])
+        remove_previews(metadata.get('sha256_checksum') or metadata['id'])
     file_db.delete_file_metadata(file_id)
\ No newline at end of file
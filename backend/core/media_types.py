@@ -3,6 +3,49 @@
 media_type_aliases = {
     'jpg': 'jpeg',
     'yml': 'yaml',
+    'jsonl': 'ndjson',
     'alac': 'm4a',
     
-}
\ No newline at end of file
+}
+
+# Formats that lose information when encoded, avoided as intermediates of multi-step conversions
+lossy_formats = {
+    'jpeg',
+    'gif',
+    'webp',
+    'mp3',
+    'aac',
+    'ogg',
+    'wma',
+    'opus',
+}
+
+# Formats whose contents are already compressed, deflating them again only costs CPU
+compressed_formats = {
+    'jpeg',
+    'png',
+    'gif',
+    'webp',
+    'heif',
+    'heic',
+    'mp4',
+    'avi',
+    'mov',
+    'mkv',
+    'webm',
+    'flv',
+    'wmv',
+    'mpg',
+    'mpeg',
+    'm4v',
+    'mp3',
+    'aac',
+    'flac',
+    'ogg',
+    'wma',
+    'm4a',
+    'opus',
+    'xlsx',
+    'parquet',
+    'pdf',
+}
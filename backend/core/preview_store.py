@@ -0,0 +1,15 @@
+from .settings import get_settings
+
+settings = get_settings()
+PREVIEW_DIR = settings.preview_dir
+
+
+def remove_previews(key: str):
+    """
+    Delete every cached preview, and recorded preview failure, of a file.
+
+    Args:
+        key: Checksum of the file, or its ID if it has none, as used by workers.previews
+    """
+    for path in PREVIEW_DIR.glob(f"{key}-*"):
+        path.unlink(missing_ok=True)
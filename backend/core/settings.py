@@ -1,5 +1,6 @@
 from functools import lru_cache
 from pathlib import Path
+from typing import Literal
 from pydantic import Field
 from pydantic_settings import BaseSettings, SettingsConfigDict
 
@@ -35,18 +36,98 @@ class Settings(BaseSettings):
     upload_dir: Path | None = None
     output_dir: Path | None = None
     tmp_dir: Path | None = None
+    cache_dir: Path | None = None
+    blob_dir: Path | None = None
+    preview_dir: Path | None = None
 
     # ===== SQLite =====
     file_table_name: str = "FILES_METADATA"
     conversion_table_name: str = "CONVERSIONS_METADATA"
     conversion_relations_table_name: str = "CONVERSION_RELATIONS"
+    job_table_name: str = "JOBS"
+    conversion_cache_table_name: str = "CONVERSION_CACHE"
+    blob_table_name: str = "BLOBS"
+    upload_table_name: str = "UPLOADS"
+
+    # Maximum pooled connections to the SQLite database
+    db_pool_size: int = 8
+
+    # Seconds to wait for a pooled connection before giving up, requests then get a 503
+    db_pool_timeout_seconds: float = 10.0
 
     # ===== Redis =====
 
     redis_url: str = "redis://redis:6379/0"
 
+    # ===== Workers =====
+
+    # Number of conversion jobs that may run at the same time (defaults to the process pool size).
+    # Process-lane conversions never run more often at once than this, whatever the pool size.
+    worker_count: int | None = None
+
+    # Size of the process pool CPU-bound converters run in (defaults to CPU count)
+    process_pool_size: int | None = None
+
+    # Maximum concurrent conversions per process-pool converter, by class name
+    converter_concurrency: dict[str, int] = {
+        "PillowConverter": 4,
+        "PandasConverter": 2,
+    }
+
+    # Maximum jobs a single batch conversion request may create
+    batch_max_jobs: int = 5000
+
+    # Maximum external processes (ffmpeg, draw.io) running at the same time
+    max_subprocesses: int = 4
+
+    # Bytes of stdout/stderr kept from each external process
+    subprocess_output_limit_bytes: int = 64 * 1024
+
+    # Wall-clock limits for external converters, in seconds
+    ffmpeg_timeout_seconds: int = 3600
+    drawio_timeout_seconds: int = 30
+
+    # Copy audio/video streams whose codec the output container supports instead of re-encoding them
+    ffmpeg_stream_copy: bool = True
+
+    # Longest chain of converters a conversion may be planned through
+    max_conversion_steps: int = 3
+
+    # ===== Tabular conversions =====
+
+    # "arrow" reads and writes CSV/Parquet with pyarrow's multithreaded engine, "pandas" uses the pandas readers and writers
+    pandas_engine: Literal["arrow", "pandas"] = "arrow"
+
+    # Inputs at least this large are converted in bounded-memory batches instead of all at once
+    pandas_streaming_threshold_bytes: int = 512 * 1024 ** 2
+
+    # Rows per batch when streaming a tabular conversion
+    pandas_chunk_rows: int = 100_000
+
+    # ===== Conversion cache =====
+
+    # Total size of cached conversion outputs before the least recently used are evicted
+    conversion_cache_max_bytes: int = 10 * 1024 ** 3
+
+    # ===== Resumable uploads =====
+
+    # Largest file a resumable upload may declare
+    resumable_upload_max_bytes: int = 100 * 1024 ** 3
+
+    # ===== Previews =====
+
+    # Longest side of image and video thumbnails, in pixels
+    preview_max_dimension: int = 256
+
+    # Rows in the snippet previewing a tabular file
+    preview_rows: int = 20
+
+    # Previews generated at the same time, in the background
+    preview_worker_count: int = 2
+
     # ===== Cleanup =====
 
+    # Resumable uploads not written to for this long are deleted, with the bytes they received
     cleanup_ttl_hours: int = 72
 
     # ===== Server =====
@@ -60,6 +141,9 @@ class Settings(BaseSettings):
         self.upload_dir = self.data_dir / "uploads"
         self.output_dir = self.data_dir / "outputs"
         self.tmp_dir = self.data_dir / "tmp"
+        self.cache_dir = self.data_dir / "cache"
+        self.blob_dir = self.data_dir / "blobs"
+        self.preview_dir = self.data_dir / "previews"
 
         # Ensure directories exist
         for path in [
@@ -68,6 +152,9 @@ class Settings(BaseSettings):
             self.upload_dir,
             self.output_dir,
             self.tmp_dir,
+            self.cache_dir,
+            self.blob_dir,
+            self.preview_dir,
         ]:
             path.mkdir(parents=True, exist_ok=True)
 
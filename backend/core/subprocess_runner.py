@@ -0,0 +1,162 @@
+import asyncio
+import os
+import signal
+import threading
+from contextlib import contextmanager
+from contextvars import ContextVar
+from dataclasses import dataclass
+from typing import Optional, Sequence
+
+from .settings import get_settings
+
+settings = get_settings()
+
+# Caps the number of external processes (ffmpeg, draw.io, ...) alive at once
+_process_slots = threading.BoundedSemaphore(settings.max_subprocesses)
+
+# Cancellation event of the job currently running on this thread, if any
+_cancel_event: ContextVar[Optional[threading.Event]] = ContextVar("cancel_event", default=None)
+
+# How often a running command checks whether it has been cancelled
+CANCEL_POLL_SECONDS = 0.2
+
+
+@dataclass
+class CommandResult:
+    returncode: int
+    stdout: str  # Last output_limit bytes of stdout
+    stderr: str  # Last output_limit bytes of stderr
+
+
+class CommandTimeoutError(RuntimeError):
+    """Raised when a command runs past its wall-clock timeout and is killed."""
+
+
+class CommandCancelledError(RuntimeError):
+    """Raised when a command is killed because its job was cancelled."""
+
+
+@contextmanager
+def cancellation_scope(cancel_event: threading.Event):
+    """
+    Make every command started inside this block killable through cancel_event.
+
+    Args:
+        cancel_event: Event that, once set, kills any running command
+    """
+    token = _cancel_event.set(cancel_event)
+    try:
+        yield
+    finally:
+        _cancel_event.reset(token)
+
+
+def _kill_process_group(process: asyncio.subprocess.Process):
+    """Kill a process along with anything it spawned."""
+    try:
+        if os.name == "posix":
+            os.killpg(process.pid, signal.SIGKILL)
+        else:
+            process.kill()
+    except ProcessLookupError:
+        pass
+
+
+async def _drain(stream: asyncio.StreamReader, buffer: bytearray, limit: int):
+    """Read a stream to EOF, keeping only its last `limit` bytes."""
+    while True:
+        chunk = await stream.read(64 * 1024)
+        if not chunk:
+            return
+        buffer.extend(chunk)
+        if len(buffer) > limit:
+            del buffer[:-limit]
+
+
+async def _wait_for_cancel(cancel_event: Optional[threading.Event]):
+    """Resolve once cancel_event is set, or never if there is none."""
+    if cancel_event is None:
+        await asyncio.Event().wait()
+        return
+    while not cancel_event.is_set():
+        await asyncio.sleep(CANCEL_POLL_SECONDS)
+
+
+async def _run_command(
+    cmd: Sequence[str],
+    timeout: Optional[float],
+    cancel_event: Optional[threading.Event],
+    output_limit: int
+) -> CommandResult:
+    process = await asyncio.create_subprocess_exec(
+        *cmd,
+        stdin=asyncio.subprocess.DEVNULL,
+        stdout=asyncio.subprocess.PIPE,
+        stderr=asyncio.subprocess.PIPE,
+        start_new_session=True,
+    )
+    stdout, stderr = bytearray(), bytearray()
+    completion = asyncio.gather(
+        _drain(process.stdout, stdout, output_limit),
+        _drain(process.stderr, stderr, output_limit),
+        process.wait(),
+    )
+    cancellation = asyncio.ensure_future(_wait_for_cancel(cancel_event))
+    try:
+        done, _ = await asyncio.wait({completion, cancellation}, timeout=timeout, return_when=asyncio.FIRST_COMPLETED)
+    finally:
+        cancellation.cancel()
+    if completion not in done:
+        _kill_process_group(process)
+        await completion
+        if cancellation in done:
+            raise CommandCancelledError(f"Command cancelled: {cmd[0]}")
+        raise CommandTimeoutError(
+            f"Command timed out after {timeout} seconds: {cmd[0]}\n"
+            f"Stderr: {stderr.decode(errors='replace')}"
+        )
+    return CommandResult(
+        returncode=process.returncode,
+        stdout=stdout.decode(errors="replace"),
+        stderr=stderr.decode(errors="replace"),
+    )
+
+
+def run_command(
+    cmd: Sequence[str],
+    timeout: Optional[float] = None,
+    cancel_event: Optional[threading.Event] = None,
+    output_limit: Optional[int] = None
+) -> CommandResult:
+    """
+    Run an external command without buffering its output unboundedly.
+
+    The command runs in its own process group so that a timeout or a
+    cancellation kills it along with any children. At most
+    `max_subprocesses` commands run at once across the process; further
+    calls block until a slot frees up.
+
+    Args:
+        cmd: Command and arguments to execute
+        timeout: Wall-clock limit in seconds, None for no limit
+        cancel_event: Event that kills the command once set, defaults to the
+            one installed by cancellation_scope()
+        output_limit: Bytes of stdout/stderr to keep, defaults to the
+            subprocess_output_limit_bytes setting
+
+    Returns:
+        CommandResult with the exit code and the tail of stdout/stderr
+
+    Raises:
+        FileNotFoundError: If the executable does not exist
+        CommandTimeoutError: If the command exceeded its timeout
+        CommandCancelledError: If the command was cancelled
+    """
+    if cancel_event is None:
+        cancel_event = _cancel_event.get()
+    if output_limit is None:
+        output_limit = settings.subprocess_output_limit_bytes
+    with _process_slots:
+        if cancel_event is not None and cancel_event.is_set():
+            raise CommandCancelledError(f"Command cancelled: {cmd[0]}")
+        return asyncio.run(_run_command(cmd, timeout, cancel_event, output_limit))
@@ -1,5 +1,10 @@
+from .connection import get_connection_pool, PooledConnection, PoolTimeoutError
 from .file_db import FileDB
 from .conversion_db import ConversionDB
 from .conversion_relations_db import ConversionRelationsDB
+from .job_db import JobDB
+from .conversion_cache_db import ConversionCacheDB
+from .blob_db import BlobDB
+from .upload_db import UploadDB
 
-__all__ = ["FileDB", "ConversionDB", "ConversionRelationsDB"]
\ No newline at end of file
+__all__ = ["get_connection_pool", "PooledConnection", "PoolTimeoutError", "FileDB", "ConversionDB", "ConversionRelationsDB", "JobDB", "ConversionCacheDB", "BlobDB", "UploadDB"]
\ No newline at end of file
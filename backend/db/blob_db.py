@@ -0,0 +1,119 @@
+import json
+from core import get_settings
+from .connection import SQLiteDB
+
+class BlobDB(SQLiteDB):
+    settings = get_settings()
+    TABLE_NAME = settings.blob_table_name
+
+    # Probe fields stored in their own columns, so they can be queried and indexed
+    PROBE_COLUMNS = {
+        'width': 'INTEGER',
+        'height': 'INTEGER',
+        'duration': 'REAL',
+        'codec': 'TEXT',
+        'pages': 'INTEGER'
+    }
+
+    def create_tables(self):
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                sha256_checksum TEXT PRIMARY KEY UNIQUE,
+                storage_path TEXT,
+                size_bytes INTEGER,
+                ref_count INTEGER DEFAULT 0,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                width INTEGER,
+                height INTEGER,
+                duration REAL,
+                codec TEXT,
+                pages INTEGER,
+                probe_json TEXT
+                )
+            """)
+            # Databases created before uploads were probed lack the probe columns
+            columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.TABLE_NAME})")}
+            for column, column_type in {**self.PROBE_COLUMNS, 'probe_json': 'TEXT'}.items():
+                if column not in columns:
+                    self.conn.execute(f"ALTER TABLE {self.TABLE_NAME} ADD COLUMN {column} {column_type}")
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_codec
+                ON {self.TABLE_NAME} (codec)
+            """)
+
+    def get_blob(self, sha256_checksum: str) -> dict | None:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE sha256_checksum = ?", (sha256_checksum,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def add_reference(self, sha256_checksum: str, storage_path: str, size_bytes: int) -> int:
+        """
+        Record one more reference to a blob, creating it if needed.
+
+        Returns:
+            The blob's reference count after the increment
+        """
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                INSERT INTO {self.TABLE_NAME} (sha256_checksum, storage_path, size_bytes, ref_count)
+                VALUES (?, ?, ?, 1)
+                ON CONFLICT(sha256_checksum) DO UPDATE SET ref_count = ref_count + 1
+            """, (sha256_checksum, storage_path, size_bytes))
+            cursor = self.conn.execute(
+                f"SELECT ref_count FROM {self.TABLE_NAME} WHERE sha256_checksum = ?",
+                (sha256_checksum,)
+            )
+            return cursor.fetchone()[0]
+
+    def remove_reference(self, sha256_checksum: str) -> int:
+        """
+        Drop one reference to a blob, deleting its row once none are left.
+
+        Returns:
+            The blob's reference count after the decrement, 0 if the row was deleted
+        """
+        with self.conn.transaction():
+            self.conn.execute(
+                f"UPDATE {self.TABLE_NAME} SET ref_count = ref_count - 1 WHERE sha256_checksum = ?",
+                (sha256_checksum,)
+            )
+            cursor = self.conn.execute(
+                f"SELECT ref_count FROM {self.TABLE_NAME} WHERE sha256_checksum = ?",
+                (sha256_checksum,)
+            )
+            row = cursor.fetchone()
+            if row is None or row[0] <= 0:
+                self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE sha256_checksum = ?", (sha256_checksum,))
+                return 0
+            return row[0]
+
+    def get_probe(self, sha256_checksum: str) -> dict | None:
+        """
+        Media probe stored for a blob.
+
+        Returns:
+            The probe, see workers.probes.probe_file(), None if the blob was never probed
+        """
+        cursor = self.conn.execute(
+            f"SELECT probe_json FROM {self.TABLE_NAME} WHERE sha256_checksum = ?",
+            (sha256_checksum,)
+        )
+        row = cursor.fetchone()
+        if row is None or row[0] is None:
+            return None
+        return json.loads(row[0])
+
+    def set_probe(self, sha256_checksum: str, probe: dict):
+        """Store a blob's media probe, its PROBE_COLUMNS fields in their own columns and all of it as JSON."""
+        assignments = ", ".join(f"{column} = ?" for column in self.PROBE_COLUMNS)
+        values = [probe.get(column) for column in self.PROBE_COLUMNS]
+        with self.conn.transaction():
+            self.conn.execute(
+                f"UPDATE {self.TABLE_NAME} SET {assignments}, probe_json = ? WHERE sha256_checksum = ?",
+                (*values, json.dumps(probe), sha256_checksum)
+            )
@@ -0,0 +1,172 @@
+import queue
+import sqlite3
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from core import get_settings
+
+settings = get_settings()
+
+# Applied to every pooled connection. WAL lets readers proceed while a write
+# is in progress, and busy_timeout makes writers wait for the lock instead of
+# failing immediately.
+PRAGMAS = (
+    "PRAGMA journal_mode = WAL",
+    "PRAGMA synchronous = NORMAL",
+    "PRAGMA busy_timeout = 5000",
+    "PRAGMA temp_store = MEMORY",
+    "PRAGMA cache_size = -16000",
+)
+
+
+class PoolTimeoutError(RuntimeError):
+    """Raised when no pooled connection is released within the pool timeout."""
+
+
+class PooledConnection(sqlite3.Connection):
+    """
+    SQLite connection with explicit, reentrant transactions.
+
+    Connections run in autocommit mode and only group statements inside
+    transaction() blocks. Nested blocks join the outermost one, so several
+    DB classes sharing a connection can write atomically together.
+    """
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.transaction_depth = 0
+
+    @contextmanager
+    def transaction(self):
+        if self.transaction_depth:
+            self.transaction_depth += 1
+            try:
+                yield self
+            finally:
+                self.transaction_depth -= 1
+            return
+
+        # IMMEDIATE takes the write lock up front rather than upgrading mid-transaction
+        self.execute("BEGIN IMMEDIATE")
+        self.transaction_depth = 1
+        try:
+            yield self
+            self.execute("COMMIT")
+        except BaseException:
+            self.execute("ROLLBACK")
+            raise
+        finally:
+            self.transaction_depth = 0
+
+
+class ConnectionPool:
+    """Process-wide pool of SQLite connections to the application database."""
+    def __init__(self, db_path, max_size: int):
+        self.db_path = db_path
+        self.max_size = max_size
+        self.idle: queue.LifoQueue[PooledConnection] = queue.LifoQueue()
+        self.created = 0
+        self.lock = threading.Lock()
+
+    def _connect(self) -> PooledConnection:
+        conn = sqlite3.connect(
+            self.db_path,
+            check_same_thread=False,
+            isolation_level=None,
+            factory=PooledConnection
+        )
+        for pragma in PRAGMAS:
+            conn.execute(pragma)
+        return conn
+
+    def acquire(self, timeout: float | None = None) -> PooledConnection:
+        """
+        Take a connection from the pool, opening one if the pool is not yet full.
+
+        Args:
+            timeout: Seconds to wait for a connection to be released, defaults to db_pool_timeout_seconds
+
+        Raises:
+            PoolTimeoutError: If every connection stayed in use for the whole timeout
+        """
+        try:
+            return self.idle.get_nowait()
+        except queue.Empty:
+            pass
+        with self.lock:
+            can_create = self.created < self.max_size
+            if can_create:
+                self.created += 1
+        if can_create:
+            try:
+                return self._connect()
+            except Exception:
+                with self.lock:
+                    self.created -= 1
+                raise
+        try:
+            return self.idle.get(timeout=settings.db_pool_timeout_seconds if timeout is None else timeout)
+        except queue.Empty:
+            raise PoolTimeoutError(f"All {self.max_size} database connections are in use") from None
+
+    def release(self, conn: PooledConnection):
+        """Return a connection to the pool, discarding any uncommitted work."""
+        if conn.in_transaction:
+            conn.execute("ROLLBACK")
+        conn.transaction_depth = 0
+        self.idle.put(conn)
+
+    @contextmanager
+    def connection(self):
+        conn = self.acquire()
+        try:
+            yield conn
+        finally:
+            self.release(conn)
+
+
+class SQLiteDB:
+    """
+    Base class for table wrappers.
+
+    Borrows a connection from the pool unless one is passed in, which lets
+    several wrappers share a connection and write in one transaction.
+    """
+    def __init__(self, conn: PooledConnection | None = None):
+        self.pooled = conn is None
+        self.conn = get_connection_pool().acquire() if conn is None else conn
+
+    def create_tables(self):
+        raise NotImplementedError("create_tables method must be implemented by subclasses.")
+
+    def close(self):
+        """Return the database connection to the pool"""
+        if self.conn and self.pooled:
+            get_connection_pool().release(self.conn)
+        self.conn = None
+
+
+def _create_schema(pool: ConnectionPool):
+    """Create every table and index the application uses."""
+    from .file_db import FileDB
+    from .conversion_db import ConversionDB
+    from .conversion_relations_db import ConversionRelationsDB
+    from .job_db import JobDB
+    from .conversion_cache_db import ConversionCacheDB
+    from .blob_db import BlobDB
+    from .upload_db import UploadDB
+
+    with pool.connection() as conn:
+        for db_class in (FileDB, ConversionDB, ConversionRelationsDB, JobDB, ConversionCacheDB, BlobDB, UploadDB):
+            db_class(conn).create_tables()
+
+
+@lru_cache
+def get_connection_pool() -> ConnectionPool:
+    """
+    Cached connection pool.
+
+    The schema is created the first time the pool is requested, once per process.
+    """
+    pool = ConnectionPool(settings.db_path, settings.db_pool_size)
+    _create_schema(pool)
+    return pool
@@ -0,0 +1,77 @@
+from core import get_settings
+from .connection import SQLiteDB
+
+class ConversionCacheDB(SQLiteDB):
+    settings = get_settings()
+    TABLE_NAME = settings.conversion_cache_table_name
+
+    def create_tables(self):
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                cache_key TEXT PRIMARY KEY UNIQUE,
+                storage_path TEXT,
+                size_bytes INTEGER,
+                sha256_checksum TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                last_used_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_last_used_at
+                ON {self.TABLE_NAME} (last_used_at)
+            """)
+
+    def insert_entry(self, metadata: dict):
+        required_fields = [
+            'cache_key',
+            'storage_path',
+            'size_bytes',
+            'sha256_checksum'
+        ]
+        if metadata.keys() != set(required_fields):
+            raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                INSERT OR REPLACE INTO {self.TABLE_NAME} (
+                cache_key, storage_path, size_bytes, sha256_checksum
+                ) VALUES (?, ?, ?, ?)
+            """, (
+                metadata['cache_key'],
+                metadata['storage_path'],
+                metadata['size_bytes'],
+                metadata['sha256_checksum']
+            ))
+
+    def get_entry(self, cache_key: str) -> dict | None:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE cache_key = ?", (cache_key,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def touch_entry(self, cache_key: str):
+        """Mark an entry as recently used so eviction keeps it around longer."""
+        with self.conn.transaction():
+            self.conn.execute(
+                f"UPDATE {self.TABLE_NAME} SET last_used_at = CURRENT_TIMESTAMP WHERE cache_key = ?",
+                (cache_key,)
+            )
+
+    def get_total_size(self) -> int:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT COALESCE(SUM(size_bytes), 0) FROM {self.TABLE_NAME}")
+        return cursor.fetchone()[0]
+
+    def list_least_recently_used(self, limit: int = 100) -> list[dict]:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} ORDER BY last_used_at ASC LIMIT ?", (limit,))
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def delete_entry(self, cache_key: str):
+        with self.conn.transaction():
+            self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE cache_key = ?", (cache_key,))
@@ -1,17 +1,14 @@
-import sqlite3
+from typing import Iterator
 from core import get_settings
+from .connection import SQLiteDB
 
-class ConversionRelationsDB:
+class ConversionRelationsDB(SQLiteDB):
     settings = get_settings()
-    DB_PATH = settings.db_path
     TABLE_NAME = settings.conversion_relations_table_name
+    CONVERSION_TABLE_NAME = settings.conversion_table_name
 
-    def __init__(self):
-        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False)
-        self.create_tables()
-    
     def create_tables(self):
-        with self.conn:
+        with self.conn.transaction():
             self.conn.execute(f"""
                 CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
                 original_file_id TEXT,
@@ -22,6 +19,15 @@ class ConversionRelationsDB:
                 original_size_bytes INTEGER
                 )
             """)
+            # Every converted file has exactly one relation, lookups and deletes go through these
+            self.conn.execute(f"""
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_converted_file_id
+                ON {self.TABLE_NAME} (converted_file_id)
+            """)
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_original_file_id
+                ON {self.TABLE_NAME} (original_file_id)
+            """)
 
     def insert_conversion_relation(self, metadata: dict):
         required_fields = [
@@ -34,7 +40,7 @@ class ConversionRelationsDB:
         ]
         if metadata.keys() != set(required_fields):
             raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
-        with self.conn:
+        with self.conn.transaction():
             self.conn.execute(f"""
                 INSERT INTO {self.TABLE_NAME} (
                 original_file_id, converted_file_id, original_filename, 
@@ -66,11 +72,11 @@ class ConversionRelationsDB:
         return row[0]
     
     def delete_relation_by_original(self, original_file_id: str):
-        with self.conn:
+        with self.conn.transaction():
             self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE original_file_id = ?", (original_file_id,))
     
     def delete_relation_by_converted(self, converted_file_id: str):
-        with self.conn:
+        with self.conn.transaction():
             self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE converted_file_id = ?", (converted_file_id,))
     
     def list_relations(self) -> list[dict]:
@@ -88,8 +94,49 @@ class ConversionRelationsDB:
             }
             for row in rows
         ]
-    
-    def close(self):
-        """Close the database connection"""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+
+    def iter_conversion_records(self, limit: int | None = None, after: tuple[str, str] | None = None) -> Iterator[dict]:
+        """
+        Yield converted files joined with the original file metadata from their relation.
+
+        Conversions without a relation are left out. The original file comes
+        from the denormalized relation columns, so history survives the
+        original upload being deleted. Records are yielded newest first, one
+        row at a time.
+
+        Args:
+            limit: Maximum number of records, None for all
+            after: (created_at, id) of the last record of the previous page
+        """
+        query = f"""
+            SELECT c.*,
+                r.original_file_id AS rel_original_file_id,
+                r.original_filename AS rel_original_filename,
+                r.original_media_type AS rel_original_media_type,
+                r.original_extension AS rel_original_extension,
+                r.original_size_bytes AS rel_original_size_bytes
+            FROM {self.CONVERSION_TABLE_NAME} c
+            JOIN {self.TABLE_NAME} r ON r.converted_file_id = c.id
+        """
+        params: tuple = ()
+        if after is not None:
+            query += " WHERE (c.created_at, c.id) < (?, ?)"
+            params = tuple(after)
+        query += " ORDER BY c.created_at DESC, c.id DESC LIMIT ?"
+        params += (-1 if limit is None else limit,)
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        for row in cursor:
+            record = dict(zip(columns, row))
+            record['original_file'] = {
+                'id': record.pop('rel_original_file_id'),
+                'original_filename': record.pop('rel_original_filename'),
+                'media_type': record.pop('rel_original_media_type'),
+                'extension': record.pop('rel_original_extension'),
+                'size_bytes': record.pop('rel_original_size_bytes')
+            }
+            yield record
+
+    def list_conversion_records(self, limit: int | None = None, after: tuple[str, str] | None = None) -> list[dict]:
+        return list(self.iter_conversion_records(limit, after))
\ No newline at end of file
@@ -1,17 +1,13 @@
-import sqlite3
+from typing import Iterator
 from core import get_settings
+from .connection import SQLiteDB
 
-class FileDB:
+class FileDB(SQLiteDB):
     settings = get_settings()
-    DB_PATH = settings.db_path
     TABLE_NAME = settings.file_table_name
 
-    def __init__(self):
-        self.conn = sqlite3.connect(self.DB_PATH, check_same_thread=False)
-        self.create_tables()
-    
     def create_tables(self):
-        with self.conn:
+        with self.conn.transaction():
             self.conn.execute(f"""
                 CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
                 id TEXT PRIMARY KEY UNIQUE,
@@ -24,6 +20,11 @@ class FileDB:
                 created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
                 )
             """)
+            # Keyset pagination walks this index newest first
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_created_at_id
+                ON {self.TABLE_NAME} (created_at, id)
+            """)
   
     def insert_file_metadata(self, metadata: dict):
         required_fields = [
@@ -37,7 +38,7 @@ class FileDB:
         ]
         if metadata.keys() != set(required_fields):
             raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
-        with self.conn:
+        with self.conn.transaction():
             self.conn.execute(f"""
                 INSERT INTO {self.TABLE_NAME} (
                 id, storage_path, original_filename, media_type, extension, size_bytes, sha256_checksum
@@ -61,18 +62,50 @@ class FileDB:
         columns = [column[0] for column in cursor.description]
         return dict(zip(columns, row))
 
-    def list_files(self) -> list[dict]:
+    def get_files_metadata(self, file_ids: list[str]) -> dict[str, dict]:
+        """
+        Look up many files at once.
+
+        Returns:
+            Dictionary mapping each ID that was found to its metadata
+        """
+        result = {}
+        unique_ids = list(dict.fromkeys(file_ids))
+        # Stay well under SQLite's limit on bound parameters per statement
+        for start in range(0, len(unique_ids), 500):
+            chunk = unique_ids[start:start + 500]
+            placeholders = ", ".join("?" for _ in chunk)
+            cursor = self.conn.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE id IN ({placeholders})", chunk)
+            columns = [column[0] for column in cursor.description]
+            for row in cursor.fetchall():
+                metadata = dict(zip(columns, row))
+                result[metadata['id']] = metadata
+        return result
+
+    def iter_files(self, limit: int | None = None, after: tuple[str, str] | None = None) -> Iterator[dict]:
+        """
+        Yield file metadata newest first, one row at a time.
+
+        Args:
+            limit: Maximum number of rows, None for all
+            after: (created_at, id) of the last row of the previous page
+        """
+        query = f"SELECT * FROM {self.TABLE_NAME}"
+        params: tuple = ()
+        if after is not None:
+            query += " WHERE (created_at, id) < (?, ?)"
+            params = tuple(after)
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params += (-1 if limit is None else limit,)
         cursor = self.conn.cursor()
-        cursor.execute(f"SELECT * FROM {self.TABLE_NAME}")
-        rows = cursor.fetchall()
+        cursor.execute(query, params)
         columns = [column[0] for column in cursor.description]
-        return [dict(zip(columns, row)) for row in rows]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def list_files(self, limit: int | None = None, after: tuple[str, str] | None = None) -> list[dict]:
+        return list(self.iter_files(limit, after))
 
     def delete_file_metadata(self, file_id: str):
-        with self.conn:
-            self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE id = ?", (file_id,))
-    
-    def close(self):
-        """Close the database connection"""
-        if self.conn:
-            self.conn.close()
\ No newline at end of file
+        with self.conn.transaction():
+            self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE id = ?", (file_id,))
\ No newline at end of file
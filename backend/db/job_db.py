@@ -0,0 +1,191 @@
+from typing import Iterator
+from core import get_settings
+from .connection import SQLiteDB
+
+class JobDB(SQLiteDB):
+    settings = get_settings()
+    TABLE_NAME = settings.job_table_name
+
+    # Columns that may be changed after a job has been created
+    UPDATABLE_FIELDS = {
+        'status',
+        'progress',
+        'started_at',
+        'finished_at',
+        'error',
+        'converted_file_id'
+    }
+
+    def create_tables(self):
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                id TEXT PRIMARY KEY UNIQUE,
+                converter_id TEXT,
+                status TEXT,
+                progress INTEGER DEFAULT 0,
+                params_json TEXT,
+                original_file_id TEXT,
+                converted_file_id TEXT,
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                started_at TIMESTAMP,
+                finished_at TIMESTAMP,
+                error TEXT,
+                batch_id TEXT
+                )
+            """)
+            # Databases created before batches existed lack the batch_id column
+            columns = {row[1] for row in self.conn.execute(f"PRAGMA table_info({self.TABLE_NAME})")}
+            if 'batch_id' not in columns:
+                self.conn.execute(f"ALTER TABLE {self.TABLE_NAME} ADD COLUMN batch_id TEXT")
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_batch_id
+                ON {self.TABLE_NAME} (batch_id)
+            """)
+            # Keyset pagination walks this index newest first
+            self.conn.execute(f"""
+                CREATE INDEX IF NOT EXISTS idx_{self.TABLE_NAME}_created_at_id
+                ON {self.TABLE_NAME} (created_at, id)
+            """)
+
+    def insert_job(self, metadata: dict):
+        required_fields = [
+            'id',
+            'converter_id',
+            'status',
+            'params_json',
+            'original_file_id'
+        ]
+        if metadata.keys() != set(required_fields):
+            raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                INSERT INTO {self.TABLE_NAME} (
+                id, converter_id, status, params_json, original_file_id
+                ) VALUES (?, ?, ?, ?, ?)
+            """, (
+                metadata['id'],
+                metadata['converter_id'],
+                metadata['status'],
+                metadata['params_json'],
+                metadata['original_file_id']
+            ))
+
+    def insert_jobs(self, jobs: list[dict]):
+        """
+        Insert the jobs of a batch in a single transaction.
+
+        Args:
+            jobs: Job metadata, each with the insert_job() fields plus batch_id
+        """
+        required_fields = [
+            'id',
+            'converter_id',
+            'status',
+            'params_json',
+            'original_file_id',
+            'batch_id'
+        ]
+        for metadata in jobs:
+            if metadata.keys() != set(required_fields):
+                raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
+        with self.conn.transaction():
+            self.conn.executemany(f"""
+                INSERT INTO {self.TABLE_NAME} (
+                id, converter_id, status, params_json, original_file_id, batch_id
+                ) VALUES (?, ?, ?, ?, ?, ?)
+            """, [(
+                metadata['id'],
+                metadata['converter_id'],
+                metadata['status'],
+                metadata['params_json'],
+                metadata['original_file_id'],
+                metadata['batch_id']
+            ) for metadata in jobs])
+
+    def update_job(self, job_id: str, expected_status: str | None = None, **fields) -> bool:
+        """
+        Update fields of a job.
+
+        Args:
+            job_id: ID of the job to update
+            expected_status: Only apply the update if the job currently has this status
+            **fields: Column values to set, limited to UPDATABLE_FIELDS
+
+        Returns:
+            True if a row was updated
+        """
+        unknown_fields = set(fields) - self.UPDATABLE_FIELDS
+        if unknown_fields:
+            raise ValueError(f"Cannot update job fields: {unknown_fields}")
+        if not fields:
+            return False
+        assignments = ", ".join(f"{name} = ?" for name in fields)
+        query = f"UPDATE {self.TABLE_NAME} SET {assignments} WHERE id = ?"
+        params = (*fields.values(), job_id)
+        if expected_status is not None:
+            query += " AND status = ?"
+            params += (expected_status,)
+        with self.conn.transaction():
+            cursor = self.conn.execute(query, params)
+        return cursor.rowcount > 0
+
+    def get_job(self, job_id: str) -> dict | None:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE id = ?", (job_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        return dict(zip(columns, row))
+
+    def list_jobs(self, status: str | None = None) -> list[dict]:
+        cursor = self.conn.cursor()
+        if status is None:
+            cursor.execute(f"SELECT * FROM {self.TABLE_NAME} ORDER BY created_at DESC")
+        else:
+            cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE status = ? ORDER BY created_at DESC", (status,))
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
+
+    def iter_jobs(
+        self,
+        limit: int | None = None,
+        after: tuple[str, str] | None = None,
+        status: str | None = None
+    ) -> Iterator[dict]:
+        """
+        Yield jobs newest first, one row at a time.
+
+        Args:
+            limit: Maximum number of rows, None for all
+            after: (created_at, id) of the last row of the previous page
+            status: Only yield jobs with this status, None for all
+        """
+        conditions = []
+        params: tuple = ()
+        if after is not None:
+            conditions.append("(created_at, id) < (?, ?)")
+            params += tuple(after)
+        if status is not None:
+            conditions.append("status = ?")
+            params += (status,)
+        query = f"SELECT * FROM {self.TABLE_NAME}"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY created_at DESC, id DESC LIMIT ?"
+        params += (-1 if limit is None else limit,)
+        cursor = self.conn.cursor()
+        cursor.execute(query, params)
+        columns = [column[0] for column in cursor.description]
+        for row in cursor:
+            yield dict(zip(columns, row))
+
+    def list_jobs_by_batch(self, batch_id: str) -> list[dict]:
+        """List the jobs of a batch in the order they were submitted."""
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE batch_id = ? ORDER BY rowid", (batch_id,))
+        rows = cursor.fetchall()
+        columns = [column[0] for column in cursor.description]
+        return [dict(zip(columns, row)) for row in rows]
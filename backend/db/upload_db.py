@@ -0,0 +1,92 @@
+import json
+from core import get_settings
+from .connection import SQLiteDB
+
+class UploadDB(SQLiteDB):
+    settings = get_settings()
+    TABLE_NAME = settings.upload_table_name
+
+    def create_tables(self):
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                CREATE TABLE IF NOT EXISTS {self.TABLE_NAME} (
+                id TEXT PRIMARY KEY UNIQUE,
+                original_filename TEXT,
+                extension TEXT,
+                size_bytes INTEGER,
+                storage_path TEXT,
+                received_json TEXT DEFAULT '[]',
+                created_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP,
+                updated_at TIMESTAMP DEFAULT CURRENT_TIMESTAMP
+                )
+            """)
+
+    def insert_upload(self, metadata: dict):
+        required_fields = [
+            'id',
+            'original_filename',
+            'extension',
+            'size_bytes',
+            'storage_path'
+        ]
+        if metadata.keys() != set(required_fields):
+            raise ValueError(f"Metadata must contain the following fields: {required_fields}. Missing or extra fields: {set(required_fields).symmetric_difference(metadata.keys())}")
+        with self.conn.transaction():
+            self.conn.execute(f"""
+                INSERT INTO {self.TABLE_NAME} (
+                id, original_filename, extension, size_bytes, storage_path
+                ) VALUES (?, ?, ?, ?, ?)
+            """, (
+                metadata['id'],
+                metadata['original_filename'],
+                metadata['extension'],
+                metadata['size_bytes'],
+                metadata['storage_path']
+            ))
+
+    def get_upload(self, upload_id: str) -> dict | None:
+        cursor = self.conn.cursor()
+        cursor.execute(f"SELECT * FROM {self.TABLE_NAME} WHERE id = ?", (upload_id,))
+        row = cursor.fetchone()
+        if row is None:
+            return None
+        columns = [column[0] for column in cursor.description]
+        upload = dict(zip(columns, row))
+        upload['received'] = json.loads(upload.pop('received_json'))
+        return upload
+
+    def add_received_range(self, upload_id: str, start: int, end: int) -> list[list[int]] | None:
+        """
+        Record that bytes [start, end) of an upload have been written.
+
+        Returns:
+            The merged, sorted list of received [start, end) ranges, or None if the upload does not exist
+        """
+        with self.conn.transaction():
+            cursor = self.conn.execute(f"SELECT received_json FROM {self.TABLE_NAME} WHERE id = ?", (upload_id,))
+            row = cursor.fetchone()
+            if row is None:
+                return None
+            received = []
+            for range_start, range_end in sorted(json.loads(row[0]) + [[start, end]]):
+                if received and range_start <= received[-1][1]:
+                    received[-1][1] = max(received[-1][1], range_end)
+                else:
+                    received.append([range_start, range_end])
+            self.conn.execute(
+                f"UPDATE {self.TABLE_NAME} SET received_json = ?, updated_at = CURRENT_TIMESTAMP WHERE id = ?",
+                (json.dumps(received), upload_id)
+            )
+        return received
+
+    def list_expired_uploads(self, max_age_hours: float) -> list[dict]:
+        """Uploads not written to in the last max_age_hours, with their id and storage_path."""
+        cursor = self.conn.execute(
+            f"SELECT id, storage_path FROM {self.TABLE_NAME} WHERE updated_at < datetime('now', ?)",
+            (f"-{max_age_hours} hours",)
+        )
+        return [{'id': row[0], 'storage_path': row[1]} for row in cursor.fetchall()]
+
+    def delete_upload(self, upload_id: str):
+        with self.conn.transaction():
+            self.conn.execute(f"DELETE FROM {self.TABLE_NAME} WHERE id = ?", (upload_id,))
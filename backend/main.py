@@ -1,11 +1,30 @@
 from fastapi import FastAPI, HTTPException, Response, Request
 from fastapi.staticfiles import StaticFiles
-from fastapi.responses import FileResponse, RedirectResponse
+from fastapi.responses import FileResponse, JSONResponse, RedirectResponse
 from fastapi.openapi.docs import get_redoc_html
+from contextlib import asynccontextmanager
 from api import router
+from api.routes.uploads import expire_uploads
 from core import get_settings
+from db import get_connection_pool, PoolTimeoutError
+from workers import get_job_queue, shutdown_preview_pool
 import uvicorn
 
+
+@asynccontextmanager
+async def lifespan(app: FastAPI):
+    """Resume pending conversion jobs and drop abandoned uploads on startup, let running jobs finish on shutdown."""
+    # Open the database pool, and create the schema, before serving any request
+    get_connection_pool()
+    expire_uploads()
+    job_queue = get_job_queue()
+    job_queue.recover()
+    yield
+    # Previews render through the process pool, stop them before the job queue shuts it down
+    shutdown_preview_pool(wait=False)
+    job_queue.shutdown()
+
+
 def create_app() -> FastAPI:
     settings = get_settings()
     app = FastAPI(
@@ -14,9 +33,19 @@ def create_app() -> FastAPI:
         version=f"{settings.app_version}",
         docs_url=None,
         redoc_url=None,
-        redirect_slashes=True
+        redirect_slashes=True,
+        lifespan=lifespan
     )
     app.include_router(router, prefix="/api")
+
+    @app.exception_handler(PoolTimeoutError)
+    async def pool_timeout_handler(request: Request, exc: PoolTimeoutError):
+        # Every connection is busy, the client should back off rather than queue up behind them
+        return JSONResponse(
+            status_code=503,
+            content={"detail": "Server is busy, try again shortly"},
+            headers={"Retry-After": "1"}
+        )
     web_dir = settings.web_dir
     if web_dir.exists():
         app.mount("/assets", StaticFiles(directory=web_dir / "assets"), name="assets")
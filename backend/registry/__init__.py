@@ -1,3 +1,3 @@
-from .registry import ConverterRegistry
+from .registry import ConverterRegistry, ConversionStep, get_converter_registry
 
-__all__ = ["ConverterRegistry"]
\ No newline at end of file
+__all__ = ["ConverterRegistry", "ConversionStep", "get_converter_registry"]
\ No newline at end of file
@@ -1,38 +1,62 @@
 import sys
 import os
-import inspect
-from core import media_type_aliases
-from converters import ConverterInterface
-import converters
+import heapq
+from functools import lru_cache
+from types import MappingProxyType
+from typing import NamedTuple
+from core import get_settings, media_type_aliases, lossy_formats
+from converters import ConverterInterface, ConverterManifest, MANIFESTS
+
+settings = get_settings()
+
+# Added to a plan's cost for each lossy intermediate, so png is preferred over jpeg between steps
+LOSSY_INTERMEDIATE_PENALTY = 0.5
+
+
+class ConversionStep(NamedTuple):
+    """One hop of a conversion plan."""
+    converter: ConverterManifest | type[ConverterInterface]  # Calling either creates the converter
+    input_format: str
+    output_format: str
 
 
 class ConverterRegistry:
     """
     Registry for managing available converters.
-    Automatically discovers and registers all converter classes.
+    Registers every converter from its manifest, converter modules and
+    their backends are only imported once a conversion runs.
+
+    Once discovery is done the registry builds a read-only compatibility
+    index (input format -> output format -> converter class), so lookups on
+    the request path are plain dict hits.
+
+    Formats and direct conversions form a weighted graph, edges weighted by
+    the converter's cost. The cheapest chain between every pair of formats is
+    planned up front as well, which makes outputs reachable through an
+    intermediate format (drawio -> png -> webp) available without a
+    dedicated converter.
     """
     def __init__(self):
         self.converters = {}
         self.input_format_map = {}  # Maps input format -> list of converter classes
         self.output_format_map = {}  # Maps output format -> list of converter classes
         self._auto_register()
+        self._build_index()
     
     def _auto_register(self):
         """
-        Automatically discover and register all converter classes from the converters module.
+        Register every converter declared in converters/manifests.py.
         """
-        # Get all classes from the converters module
-        for name, obj in inspect.getmembers(converters, inspect.isclass):
-            # Check if it's a subclass of ConverterInterface (but not the interface itself)
-            if issubclass(obj, ConverterInterface) and obj is not ConverterInterface:
-                self.register_converter(obj)
+        # Manifests carry everything the registry reads, registering one imports nothing
+        for manifest in MANIFESTS:
+            self.register_converter(manifest)
     
     def register_converter(self, converter_class):
         """
-        Register a converter class in the registry.
+        Register a converter in the registry.
         
         Args:
-            converter_class: The converter class to register
+            converter_class: The converter's manifest, or a converter class
         """
         self.converters[converter_class.__name__] = converter_class
         
@@ -48,6 +72,92 @@ class ConverterRegistry:
                 if fmt not in self.output_format_map:
                     self.output_format_map[fmt] = []
                 self.output_format_map[fmt].append(converter_class)
+        # Rebuild the index if a converter is registered after construction
+        if hasattr(self, 'compatibility_index'):
+            self._build_index()
+
+    @staticmethod
+    def _preference(converter_class):
+        """Sort key picking one converter when several handle the same conversion."""
+        return (-converter_class.priority, converter_class.__name__)
+
+    def _build_index(self):
+        """
+        Precompute which converter handles each input/output format pair.
+
+        When several converters can handle a pair, the one with the highest
+        priority wins, ties broken by class name, so the choice is the same on
+        every run.
+        """
+        index = {}
+        for fmt in self.input_format_map:
+            normalized_fmt = self.get_normalized_format(fmt)
+            outputs = index.setdefault(normalized_fmt, {})
+            for converter_class in sorted(self.input_format_map[fmt], key=self._preference):
+                if not hasattr(converter_class, 'get_formats_compatible_with'):
+                    continue
+                for output_fmt in converter_class.get_formats_compatible_with(normalized_fmt):
+                    outputs.setdefault(self.get_normalized_format(output_fmt), converter_class)
+
+        self.compatibility_index = MappingProxyType({
+            fmt: MappingProxyType(outputs) for fmt, outputs in index.items()
+        })
+        self.conversion_plans = MappingProxyType({
+            fmt: MappingProxyType(self._plan_from(fmt)) for fmt in self.compatibility_index
+        })
+        self.compatible_formats = MappingProxyType({
+            fmt: frozenset(plans) for fmt, plans in self.conversion_plans.items()
+        })
+        # Every known format, output-only ones (svg, pdf...) map to an empty set
+        self.compatibility_matrix = MappingProxyType({
+            self.get_normalized_format(fmt): self.compatible_formats.get(self.get_normalized_format(fmt), frozenset())
+            for fmt in self.get_formats()
+        })
+
+    def _plan_from(self, source_format):
+        """
+        Find the cheapest conversion chain from one format to every format reachable from it.
+
+        Dijkstra over the compatibility index, limited to
+        settings.max_conversion_steps hops. Steps after the first only use
+        converters that accept the intermediate format and may turn it into
+        the next format, a step's cost includes its converter's cost for
+        writing that format, and lossy
+        intermediates add LOSSY_INTERMEDIATE_PENALTY. Equal-cost chains are
+        broken by fewer steps, then by the formats visited, so plans are stable.
+
+        Returns:
+            Dictionary mapping each reachable format to its tuple of ConversionSteps
+        """
+        plans = {}
+        queue = [(0.0, 0, (source_format,), ())]
+        while queue:
+            total_cost, hops, path, steps = heapq.heappop(queue)
+            fmt = path[-1]
+            if fmt in plans:
+                continue
+            if steps:
+                plans[fmt] = steps
+            if hops == settings.max_conversion_steps:
+                continue
+            penalty = LOSSY_INTERMEDIATE_PENALTY if steps and fmt in lossy_formats else 0.0
+            for output_fmt, converter_class in self.compatibility_index.get(fmt, {}).items():
+                if output_fmt in plans or output_fmt in path:
+                    continue
+                chainable = converter_class.chainable_input_formats
+                if steps and chainable is not None and fmt not in chainable:
+                    continue
+                chainable_outputs = (converter_class.chainable_output_formats or {}).get(fmt)
+                if steps and chainable_outputs is not None and output_fmt not in chainable_outputs:
+                    continue
+                step_cost = converter_class.cost + converter_class.output_costs.get(output_fmt, 0.0)
+                heapq.heappush(queue, (
+                    total_cost + step_cost + penalty,
+                    hops + 1,
+                    path + (output_fmt,),
+                    steps + (ConversionStep(converter_class, fmt, output_fmt),)
+                ))
+        return plans
     
     def get_converter(self, name):
         """
@@ -119,15 +229,43 @@ class ConverterRegistry:
         Returns:
             Converter class that supports both formats, or None
         """
-        normalized_input = self.get_normalized_format(input_format)
-        normalized_output = self.get_normalized_format(output_format)
-        input_converters = set(self.get_converters_for_input_format(normalized_input))
-        output_converters = set(self.get_converters_for_output_format(normalized_output))
-        
-        # Find converters that support both formats
-        compatible = input_converters & output_converters
-        
-        return compatible.pop() if compatible else None
+        outputs = self.compatibility_index.get(self.get_normalized_format(input_format), {})
+        return outputs.get(self.get_normalized_format(output_format))
+    
+    def plan_conversion(self, input_format, output_format):
+        """
+        Find the cheapest chain of converters for a conversion.
+
+        Args:
+            input_format: Input file format
+            output_format: Output file format
+
+        Returns:
+            Tuple of ConversionSteps to run in order, or None if the output is unreachable
+        """
+        plans = self.conversion_plans.get(self.get_normalized_format(input_format), {})
+        return plans.get(self.get_normalized_format(output_format))
+    
+    def plan_rewrite(self, format_type, option_names=frozenset()):
+        """
+        Plan converting a file to its own format in a single step.
+
+        A rewrite only makes sense with options, rotating a JPEG that stays a
+        JPEG for instance, so rewrites are not part of the planned graph.
+
+        Args:
+            format_type: Format of the file
+            option_names: Options the converter must support
+
+        Returns:
+            Tuple of one ConversionStep, or None if no converter reads and writes the format with those options
+        """
+        normalized_format = self.get_normalized_format(format_type)
+        for converter_class in sorted(self.get_converters_for_input_format(normalized_format), key=self._preference):
+            writes_format = any(self.get_normalized_format(fmt) == normalized_format for fmt in converter_class.supported_output_formats)
+            if writes_format and set(option_names) <= converter_class.supported_options:
+                return (ConversionStep(converter_class, normalized_format, normalized_format),)
+        return None
     
     def list_converters(self):
         """
@@ -138,53 +276,35 @@ class ConverterRegistry:
         """
         result = {}
         for name, converter_class in self.converters.items():
-            if hasattr(converter_class, 'supported_formats'):
-                result[name] = list(converter_class.supported_formats)
-            else:
-                result[name] = []
+            result[name] = sorted(converter_class.supported_input_formats | converter_class.supported_output_formats)
         return result
     
     def get_compatible_formats(self, format_type):
         """
         Get all formats compatible with the given format.
         
-        A format is considered compatible if there exists a converter that
-        supports both the given format and the compatible format, AND the
-        conversion is actually valid in that direction.
+        A format is considered compatible if a chain of converters can
+        produce it from the given format, each step valid in its direction.
         
         Args:
             format_type: File format (e.g., 'jpg', 'mp4', 'csv')
         
         Returns:
-            Set of compatible format strings
+            Frozen set of compatible format strings
         """
-        normalized_format = self.get_normalized_format(format_type)
-        compatible = set()
-        
-        # Find all converters that support this format
-        converters_for_format = self.get_converters_for_input_format(normalized_format)
-        
-        # For each converter, determine valid output formats
-        for converter_class in converters_for_format:
-            if not hasattr(converter_class, 'get_formats_compatible_with'):
-                continue
-            
-            compatible.update(converter_class.get_formats_compatible_with(normalized_format))
-        
-        return compatible
+        return self.compatible_formats.get(self.get_normalized_format(format_type), frozenset())
     
     def get_format_compatibility_matrix(self):
         """
         Get a complete compatibility matrix showing which formats can convert to which.
         
         Returns:
-            Dictionary mapping each format to its set of compatible output formats
+            Read-only mapping of each format, input or output, to its frozen set of compatible output formats
         """
-        matrix = {}
-        all_formats = set(self.input_format_map.keys()) | set(self.output_format_map.keys())
-        
-        for fmt in all_formats:
-            normalized_fmt = self.get_normalized_format(fmt)
-            matrix[normalized_fmt] = self.get_compatible_formats(normalized_fmt)
-        
-        return matrix
\ No newline at end of file
+        return self.compatibility_matrix
+
+
+@lru_cache
+def get_converter_registry() -> ConverterRegistry:
+    """Cached registry, discovery and indexing happen once per process."""
+    return ConverterRegistry()
@@ -0,0 +1,48 @@
+"""
+Shared fixtures for the API tests.
+
+Settings are read once per process when the modules are imported, so the
+data directory is pointed at a temporary one before anything imports them.
+"""
+import os
+import shutil
+import tempfile
+import time
+import pytest
+
+DATA_DIR = tempfile.mkdtemp(prefix="transmute-tests-")
+os.environ["DATA_DIR"] = DATA_DIR
+os.environ.setdefault("PROCESS_POOL_SIZE", "1")
+
+from fastapi.testclient import TestClient  # noqa: E402
+from main import create_app  # noqa: E402
+
+FINISHED_STATUSES = {"completed", "failed", "cancelled"}
+
+
+def pytest_unconfigure(config):
+    shutil.rmtree(DATA_DIR, ignore_errors=True)
+
+
+@pytest.fixture(scope="session")
+def client():
+    with TestClient(create_app()) as test_client:
+        yield test_client
+
+
+def upload(client: TestClient, filename: str, content: bytes) -> dict:
+    """Upload a file in one request and return its metadata."""
+    response = client.post("/api/files/", files={"file": (filename, content)})
+    assert response.status_code == 200, response.text
+    return response.json()["metadata"]
+
+
+def wait_for_job(client: TestClient, job_id: str, timeout: float = 60.0) -> dict:
+    """Poll a job until it finishes."""
+    deadline = time.monotonic() + timeout
+    while True:
+        job = client.get(f"/api/jobs/{job_id}").json()
+        if job["status"] in FINISHED_STATUSES:
+            return job
+        assert time.monotonic() < deadline, f"Job {job_id} still {job['status']}"
+        time.sleep(0.05)
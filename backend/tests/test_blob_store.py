@@ -0,0 +1,74 @@
+"""
+Tests for deduplicated upload storage and blob reference counting.
+
+Run from the backend directory: python -m pytest tests
+"""
+import uuid
+from core.blob_store import blob_path, place_blob, reference_blob, release_blob
+from db import get_connection_pool, BlobDB
+from conftest import upload
+
+
+def get_blob(sha256_checksum: str) -> dict | None:
+    with get_connection_pool().connection() as conn:
+        return BlobDB(conn).get_blob(sha256_checksum)
+
+
+def test_duplicate_uploads_share_one_blob(client):
+    content = uuid.uuid4().bytes * 64
+    first = upload(client, "first.bin", content)
+    second = upload(client, "second.bin", content)
+
+    assert first["id"] != second["id"]
+    assert first["sha256_checksum"] == second["sha256_checksum"]
+    path = blob_path(first["sha256_checksum"])
+    assert path.read_bytes() == content
+    assert get_blob(first["sha256_checksum"])["ref_count"] == 2
+    assert client.get(f"/api/files/{second['id']}").content == content
+
+
+def test_blob_released_on_last_delete(client):
+    content = uuid.uuid4().bytes * 64
+    first = upload(client, "first.bin", content)
+    second = upload(client, "second.bin", content)
+    path = blob_path(first["sha256_checksum"])
+
+    assert client.delete(f"/api/files/{first['id']}").status_code == 200
+    assert path.is_file()
+    assert get_blob(first["sha256_checksum"])["ref_count"] == 1
+    assert client.get(f"/api/files/{second['id']}").content == content
+
+    assert client.delete(f"/api/files/{second['id']}").status_code == 200
+    assert not path.exists()
+    assert get_blob(first["sha256_checksum"]) is None
+    assert client.get(f"/api/files/{second['id']}").status_code == 404
+
+
+def test_upload_after_release_stores_blob_again(client):
+    content = uuid.uuid4().bytes * 64
+    first = upload(client, "first.bin", content)
+    client.delete(f"/api/files/{first['id']}")
+
+    second = upload(client, "second.bin", content)
+    assert blob_path(second["sha256_checksum"]).read_bytes() == content
+    assert get_blob(second["sha256_checksum"])["ref_count"] == 1
+
+
+def test_placed_blob_survives_release_until_referenced(client, tmp_path):
+    # Another upload of the same contents may place the blob before the last reference is dropped
+    content = uuid.uuid4().bytes
+    sha256_checksum = upload(client, "first.bin", content)["sha256_checksum"]
+    temp_path = tmp_path / "upload.tmp"
+    temp_path.write_bytes(content)
+
+    path = place_blob(temp_path, sha256_checksum)
+    assert not temp_path.exists()
+    with get_connection_pool().connection() as conn:
+        blob_db = BlobDB(conn)
+        release_blob(sha256_checksum, blob_db)
+        assert path.is_file()
+
+        reference_blob(sha256_checksum, len(content), blob_db)
+        assert blob_db.get_blob(sha256_checksum)["ref_count"] == 1
+        release_blob(sha256_checksum, blob_db)
+    assert not path.exists()
@@ -0,0 +1,82 @@
+"""
+Tests for serving repeated conversions from the conversion cache.
+
+Run from the backend directory: python -m pytest tests
+"""
+import uuid
+import pytest
+from workers import conversion
+from conftest import upload, wait_for_job
+
+
+@pytest.fixture
+def converter_runs(monkeypatch):
+    """Count the conversions that actually ran converters, cache hits skip them."""
+    runs = []
+    run_plan = conversion.run_plan
+
+    def counting_run_plan(*args, **kwargs):
+        runs.append(args)
+        return run_plan(*args, **kwargs)
+
+    monkeypatch.setattr(conversion, 'run_plan', counting_run_plan)
+    return runs
+
+
+def convert(client, file_id: str, output_format: str, options: dict | None = None) -> dict:
+    body = {"id": file_id, "output_format": output_format}
+    if options is not None:
+        body["options"] = options
+    response = client.post("/api/conversions/", json=body)
+    assert response.status_code == 200, response.text
+    job = wait_for_job(client, response.json()["id"])
+    assert job["status"] == "completed", job["error"]
+    return job
+
+
+def csv_content() -> bytes:
+    return f"name,value\n{uuid.uuid4()},1\n".encode()
+
+
+def test_identical_conversion_hits_cache(client, converter_runs):
+    original = upload(client, "data.csv", csv_content())
+    first = convert(client, original["id"], "json")
+    second = convert(client, original["id"], "json")
+
+    assert len(converter_runs) == 1
+    # Each conversion still gets its own converted file, with the same content
+    assert first["converted_file_id"] != second["converted_file_id"]
+    assert first["result"]["sha256_checksum"] == second["result"]["sha256_checksum"]
+    assert client.get(f"/api/files/{first['converted_file_id']}").content == \
+        client.get(f"/api/files/{second['converted_file_id']}").content
+
+
+def test_same_content_from_another_upload_hits_cache(client, converter_runs):
+    content = csv_content()
+    convert(client, upload(client, "first.csv", content)["id"], "json")
+    convert(client, upload(client, "second.csv", content)["id"], "json")
+    assert len(converter_runs) == 1
+
+
+def test_different_format_misses_cache(client, converter_runs):
+    original = upload(client, "data.csv", csv_content())
+    convert(client, original["id"], "json")
+    convert(client, original["id"], "yaml")
+    assert len(converter_runs) == 2
+
+
+def test_different_content_misses_cache(client, converter_runs):
+    convert(client, upload(client, "data.csv", csv_content())["id"], "json")
+    convert(client, upload(client, "data.csv", csv_content())["id"], "json")
+    assert len(converter_runs) == 2
+
+
+def test_cache_entry_with_missing_file_is_converted_again(client, converter_runs):
+    original = upload(client, "data.csv", csv_content())
+    first = convert(client, original["id"], "json")
+    for cached_file in conversion.conversion_cache.CACHE_DIR.iterdir():
+        cached_file.unlink()
+
+    second = convert(client, original["id"], "json")
+    assert len(converter_runs) == 2
+    assert first["result"]["sha256_checksum"] == second["result"]["sha256_checksum"]
@@ -0,0 +1,158 @@
+"""
+Tests for the conversion job lifecycle, cancellation and the job listing.
+
+Run from the backend directory: python -m pytest tests
+"""
+import threading
+import uuid
+import pytest
+from db import get_connection_pool, JobDB
+from workers import job_queue
+from conftest import upload, wait_for_job
+
+
+def csv_content() -> bytes:
+    # Unique content so no other test's conversion is served from the cache
+    return f"name,value\n{uuid.uuid4()},1\nb,2\n".encode()
+
+
+def convert(client, file_id: str, output_format: str = "json") -> dict:
+    response = client.post("/api/conversions/", json={"id": file_id, "output_format": output_format})
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+def insert_queued_job(file_id: str) -> str:
+    """Store a queued job without handing it to the worker pool."""
+    job_id = str(uuid.uuid4())
+    with get_connection_pool().connection() as conn:
+        JobDB(conn).insert_job({
+            'id': job_id,
+            'converter_id': 'PandasConverter',
+            'status': job_queue.JOB_QUEUED,
+            'params_json': '{"output_format": "json"}',
+            'original_file_id': file_id
+        })
+    return job_id
+
+
+@pytest.fixture
+def blocked_conversion(monkeypatch):
+    """Replace the conversion with one that waits until released, so a job stays running."""
+    started = threading.Event()
+    release = threading.Event()
+
+    def convert_file(*args, **kwargs):
+        started.set()
+        release.wait(30)
+        raise RuntimeError("conversion interrupted")
+
+    monkeypatch.setattr(job_queue, 'convert_file', convert_file)
+    yield started, release
+    release.set()
+
+
+def test_job_completes_with_result(client):
+    original = upload(client, "data.csv", csv_content())
+    job = convert(client, original["id"])
+    assert job["status"] in {"queued", "running", "completed"}
+    assert job["original_file_id"] == original["id"]
+    assert job["params"]["output_format"] == "json"
+
+    job = wait_for_job(client, job["id"])
+    assert job["status"] == "completed", job["error"]
+    assert job["progress"] == 100
+    assert job["started_at"] is not None and job["finished_at"] is not None
+    assert job["result"]["id"] == job["converted_file_id"]
+    assert job["result"]["media_type"] == "json"
+
+    converted = client.get(f"/api/files/{job['converted_file_id']}")
+    assert converted.status_code == 200
+    assert converted.json()[0]["value"] == 1
+
+
+def test_failed_conversion_records_error(client, blocked_conversion):
+    started, release = blocked_conversion
+    original = upload(client, "data.csv", csv_content())
+    job = convert(client, original["id"])
+    assert started.wait(30)
+    assert client.get(f"/api/jobs/{job['id']}").json()["status"] == "running"
+
+    release.set()
+    job = wait_for_job(client, job["id"])
+    assert job["status"] == "failed"
+    assert job["error"] == "conversion interrupted"
+    assert job["result"] is None
+
+
+def test_cancel_running_job(client, blocked_conversion):
+    started, release = blocked_conversion
+    original = upload(client, "data.csv", csv_content())
+    job = convert(client, original["id"])
+    assert started.wait(30)
+
+    response = client.delete(f"/api/jobs/{job['id']}")
+    assert response.status_code == 200
+    release.set()
+    job = wait_for_job(client, job["id"])
+    assert job["status"] == "cancelled"
+    assert job["error"] == "Cancelled"
+
+
+def test_cancel_queued_job(client):
+    original = upload(client, "data.csv", csv_content())
+    job_id = insert_queued_job(original["id"])
+
+    response = client.delete(f"/api/jobs/{job_id}")
+    assert response.status_code == 200
+    assert response.json()["status"] == "cancelled"
+    assert response.json()["finished_at"] is not None
+
+    # A worker picking the job up afterwards leaves it alone
+    job_queue.run_conversion_job(job_id, threading.Event())
+    assert client.get(f"/api/jobs/{job_id}").json()["status"] == "cancelled"
+
+
+def test_cancel_finished_job(client):
+    original = upload(client, "data.csv", csv_content())
+    job = wait_for_job(client, convert(client, original["id"])["id"])
+
+    response = client.delete(f"/api/jobs/{job['id']}")
+    assert response.status_code == 400
+    assert client.get(f"/api/jobs/{job['id']}").json()["status"] == job["status"]
+
+
+def test_cancel_unknown_job(client):
+    assert client.delete(f"/api/jobs/{uuid.uuid4()}").status_code == 404
+
+
+def test_job_listing_pages(client):
+    original = upload(client, "data.csv", csv_content())
+    job_ids = {insert_queued_job(original["id"]) for _ in range(5)}
+    for job_id in job_ids:
+        client.delete(f"/api/jobs/{job_id}")
+
+    everything = client.get("/api/jobs/").json()
+    assert everything["next_cursor"] is None
+    listed = []
+    cursor = None
+    while True:
+        params = {"limit": 2}
+        if cursor is not None:
+            params["cursor"] = cursor
+        page = client.get("/api/jobs/", params=params).json()
+        assert len(page["jobs"]) <= 2
+        listed += [job["id"] for job in page["jobs"]]
+        cursor = page["next_cursor"]
+        if cursor is None:
+            break
+    assert listed == [job["id"] for job in everything["jobs"]]
+    assert job_ids <= set(listed)
+
+    cancelled = client.get("/api/jobs/", params={"status": "cancelled"}).json()["jobs"]
+    assert job_ids <= {job["id"] for job in cancelled}
+    assert {job["status"] for job in cancelled} == {"cancelled"}
+
+
+def test_job_listing_rejects_bad_cursor(client):
+    assert client.get("/api/jobs/", params={"cursor": "not-a-cursor"}).status_code == 400
@@ -0,0 +1,48 @@
+"""
+Tests for the multi-step conversion planner of registry/registry.py.
+
+Run from the backend directory: python -m pytest tests
+"""
+from registry import get_converter_registry
+
+registry = get_converter_registry()
+
+
+def describe(plan) -> list[tuple[str, str, str]]:
+    return [(step.converter.__name__, step.input_format, step.output_format) for step in plan]
+
+
+def test_direct_conversion_is_single_step():
+    assert describe(registry.plan_conversion('csv', 'json')) == [('PandasConverter', 'csv', 'json')]
+    assert describe(registry.plan_conversion('mp4', 'gif')) == [('FFmpegConverter', 'mp4', 'gif')]
+
+
+def test_formats_are_normalized():
+    assert registry.plan_conversion('CSV', 'JSON') == registry.plan_conversion('csv', 'json')
+
+
+def test_chained_conversion_goes_through_intermediate():
+    assert describe(registry.plan_conversion('mp4', 'webp')) == [
+        ('FFmpegConverter', 'mp4', 'gif'),
+        ('PillowConverter', 'gif', 'webp'),
+    ]
+
+
+def test_unreachable_conversion():
+    assert registry.plan_conversion('csv', 'mp4') is None
+
+
+def test_every_plan_chains_from_input_to_output():
+    for input_format, plans in registry.conversion_plans.items():
+        for output_format, plan in plans.items():
+            assert plan[0].input_format == input_format
+            assert plan[-1].output_format == output_format
+            for step, next_step in zip(plan, plan[1:]):
+                assert step.output_format == next_step.input_format
+                # Converters only take the intermediate formats they declare chainable
+                converter = next_step.converter
+                if converter.chainable_input_formats is not None:
+                    assert next_step.input_format in converter.chainable_input_formats
+                chainable_outputs = (converter.chainable_output_formats or {}).get(next_step.input_format)
+                if chainable_outputs is not None:
+                    assert next_step.output_format in chainable_outputs
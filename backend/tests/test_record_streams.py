@@ -0,0 +1,126 @@
+"""
+Tests for the incremental JSON and YAML readers of converters/record_streams.py.
+
+Run from the backend directory: python -m pytest tests
+"""
+import io
+import json
+import pytest
+import yaml
+from converters import record_streams
+from converters.record_streams import iter_records, is_sequence, write_records
+
+RECORDS = [
+    1,
+    2.5,
+    -12345678901234567890,
+    "x",
+    "é" * 10,
+    None,
+    True,
+    False,
+    {"a": [1, {"b": "c"}], "d": "]},["},
+    [],
+    {},
+]
+
+
+@pytest.fixture
+def tiny_reads(monkeypatch):
+    # A few characters per read, so items, strings and literals all span refills
+    monkeypatch.setattr(record_streams, 'JSON_READ_SIZE', 3)
+
+
+def write_file(tmp_path, text, name='records.json'):
+    path = tmp_path / name
+    path.write_text(text)
+    return str(path)
+
+
+@pytest.mark.parametrize('read_size', [1, 2, 3, 7, 1024 * 1024])
+def test_json_array_across_buffer_refills(tmp_path, monkeypatch, read_size):
+    monkeypatch.setattr(record_streams, 'JSON_READ_SIZE', read_size)
+    path = write_file(tmp_path, json.dumps(RECORDS, indent=2))
+    assert list(iter_records(path, 'json')) == RECORDS
+
+
+def test_json_item_larger_than_buffer(tmp_path, tiny_reads):
+    record = {"text": "a" * 1000, "values": list(range(200))}
+    path = write_file(tmp_path, json.dumps([record, record]))
+    assert list(iter_records(path, 'json')) == [record, record]
+
+
+@pytest.mark.parametrize('text, expected', [
+    ('[]', []),
+    ('  [ ]  ', []),
+    ('[1,2]', [1, 2]),
+    ('\n[\n 1 ,\n 2 \n]\n', [1, 2]),
+])
+def test_json_whitespace_and_empty(tmp_path, tiny_reads, text, expected):
+    assert list(iter_records(write_file(tmp_path, text), 'json')) == expected
+
+
+@pytest.mark.parametrize('text', ['1234567', 'true', 'false', 'null', '-0.5e10'])
+def test_json_literal_split_at_buffer_end(tmp_path, tiny_reads, text):
+    # A number or literal ending exactly at the buffer end must not be cut short
+    path = write_file(tmp_path, f'[{text}]')
+    assert list(iter_records(path, 'json')) == [json.loads(text)]
+
+
+@pytest.mark.parametrize('text', ['[1,]', '[1,2,]', '[,]', '[,1]'])
+def test_json_trailing_or_leading_comma(tmp_path, tiny_reads, text):
+    with pytest.raises(ValueError):
+        list(iter_records(write_file(tmp_path, text), 'json'))
+
+
+@pytest.mark.parametrize('text', ['[1', '[1,', '[tru', '[1e', '["abc', '[{"a": 1', '['])
+def test_json_truncated(tmp_path, tiny_reads, text):
+    with pytest.raises(ValueError):
+        list(iter_records(write_file(tmp_path, text), 'json'))
+
+
+@pytest.mark.parametrize('text', ['[1 2]', '[1] x', '[1][2]'])
+def test_json_malformed(tmp_path, tiny_reads, text):
+    with pytest.raises(ValueError):
+        list(iter_records(write_file(tmp_path, text), 'json'))
+
+
+def test_json_not_an_array(tmp_path):
+    path = write_file(tmp_path, '{"a": 1}')
+    assert not is_sequence(path, 'json')
+    with pytest.raises(ValueError):
+        list(iter_records(path, 'json'))
+
+
+def test_yaml_sequence(tmp_path):
+    path = write_file(tmp_path, yaml.dump(RECORDS), 'records.yaml')
+    assert is_sequence(path, 'yaml')
+    assert list(iter_records(path, 'yaml')) == RECORDS
+
+
+def test_yaml_explicit_document_markers(tmp_path):
+    path = write_file(tmp_path, '---\n- 1\n- 2\n...\n', 'records.yaml')
+    assert list(iter_records(path, 'yaml')) == [1, 2]
+
+
+def test_yaml_multiple_documents(tmp_path):
+    path = write_file(tmp_path, '- 1\n- 2\n---\n- 3\n', 'records.yaml')
+    with pytest.raises(ValueError):
+        list(iter_records(path, 'yaml'))
+
+
+@pytest.mark.parametrize('fmt', ['json', 'yaml', 'ndjson'])
+def test_round_trip(tmp_path, fmt):
+    out = io.StringIO()
+    write_records(iter(RECORDS), out, fmt)
+    path = write_file(tmp_path, out.getvalue(), f'records.{fmt}')
+    assert list(iter_records(path, fmt)) == RECORDS
+
+
+def test_write_matches_whole_document_dump():
+    out = io.StringIO()
+    write_records(iter(RECORDS), out, 'json')
+    assert out.getvalue() == json.dumps(RECORDS, indent=2)
+    out = io.StringIO()
+    write_records(iter(RECORDS), out, 'yaml')
+    assert out.getvalue() == yaml.dump(RECORDS, default_flow_style=False)
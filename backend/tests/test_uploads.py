@@ -0,0 +1,103 @@
+"""
+Tests for the range handling and checksums of resumable uploads.
+
+Run from the backend directory: python -m pytest tests
+"""
+import hashlib
+import os
+import pytest
+from api.routes import uploads
+
+
+def create_upload(client, content: bytes, filename: str = "data.bin") -> str:
+    response = client.post("/api/uploads/", json={"filename": filename, "size_bytes": len(content)})
+    assert response.status_code == 200, response.text
+    return response.json()["id"]
+
+
+def put_chunk(client, upload_id: str, content: bytes, start: int, end: int) -> dict:
+    response = client.put(f"/api/uploads/{upload_id}", params={"offset": start}, content=content[start:end])
+    assert response.status_code == 200, response.text
+    return response.json()
+
+
+@pytest.fixture
+def content() -> bytes:
+    return os.urandom(300_000)
+
+
+def test_out_of_order_chunks_complete(client, content):
+    upload_id = create_upload(client, content)
+
+    status = put_chunk(client, upload_id, content, 200_000, 300_000)
+    assert status["offset"] == 0
+    assert status["received"] == [[200_000, 300_000]]
+
+    status = put_chunk(client, upload_id, content, 100_000, 200_000)
+    assert status["offset"] == 0
+    assert status["received"] == [[100_000, 300_000]]
+
+    status = put_chunk(client, upload_id, content, 0, 100_000)
+    assert status["offset"] == 300_000
+    assert status["received"] == [[0, 300_000]]
+
+    response = client.post(f"/api/uploads/{upload_id}/complete")
+    assert response.status_code == 200, response.text
+    metadata = response.json()["metadata"]
+    assert metadata["sha256_checksum"] == hashlib.sha256(content).hexdigest()
+    assert metadata["size_bytes"] == len(content)
+    assert client.get(f"/api/files/{metadata['id']}").content == content
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+
+
+def test_overlapping_and_repeated_chunks(client, content):
+    upload_id = create_upload(client, content)
+    put_chunk(client, upload_id, content, 0, 150_000)
+    put_chunk(client, upload_id, content, 100_000, 250_000)
+    put_chunk(client, upload_id, content, 0, 50_000)
+    status = put_chunk(client, upload_id, content, 200_000, 300_000)
+    assert status["received"] == [[0, 300_000]]
+
+    metadata = client.post(f"/api/uploads/{upload_id}/complete").json()["metadata"]
+    assert metadata["sha256_checksum"] == hashlib.sha256(content).hexdigest()
+
+
+def test_checksum_rebuilt_after_restart(client, content):
+    upload_id = create_upload(client, content)
+    put_chunk(client, upload_id, content, 150_000, 300_000)
+    put_chunk(client, upload_id, content, 0, 150_000)
+    # A restart loses the running checksums, completing reads the file back instead
+    uploads._hash_states.clear()
+
+    metadata = client.post(f"/api/uploads/{upload_id}/complete").json()["metadata"]
+    assert metadata["sha256_checksum"] == hashlib.sha256(content).hexdigest()
+
+
+def test_incomplete_upload_cannot_complete(client, content):
+    upload_id = create_upload(client, content)
+    put_chunk(client, upload_id, content, 0, 100_000)
+    put_chunk(client, upload_id, content, 200_000, 300_000)
+
+    response = client.post(f"/api/uploads/{upload_id}/complete")
+    assert response.status_code == 409
+    status = client.get(f"/api/uploads/{upload_id}").json()
+    assert status["offset"] == 100_000
+    assert status["received"] == [[0, 100_000], [200_000, 300_000]]
+    head = client.head(f"/api/uploads/{upload_id}")
+    assert head.headers["Upload-Offset"] == "100000"
+    assert head.headers["Upload-Length"] == "300000"
+
+
+def test_chunk_past_declared_size(client, content):
+    upload_id = create_upload(client, content)
+    response = client.put(f"/api/uploads/{upload_id}", params={"offset": 250_000}, content=content[:100_000])
+    assert response.status_code == 400
+    assert client.get(f"/api/uploads/{upload_id}").json()["received"] == []
+
+
+def test_aborted_upload_is_gone(client, content):
+    upload_id = create_upload(client, content)
+    put_chunk(client, upload_id, content, 0, 100_000)
+    assert client.delete(f"/api/uploads/{upload_id}").status_code == 200
+    assert client.get(f"/api/uploads/{upload_id}").status_code == 404
+    assert client.put(f"/api/uploads/{upload_id}", params={"offset": 0}, content=b"x").status_code == 404
@@ -0,0 +1,15 @@
+from .conversion import convert_file
+from .executors import run_converter, get_process_pool
+from .previews import get_preview, preview_kind, shutdown_preview_pool, PREVIEW_READY, PREVIEW_PENDING, PREVIEW_UNAVAILABLE
+from .probes import ensure_probe, probe_file, probe_upload
+from .job_queue import (
+    JobQueue,
+    get_job_queue,
+    JOB_QUEUED,
+    JOB_RUNNING,
+    JOB_COMPLETED,
+    JOB_FAILED,
+    JOB_CANCELLED
+)
+
+__all__ = ["convert_file", "run_converter", "get_process_pool", "get_preview", "preview_kind", "shutdown_preview_pool", "PREVIEW_READY", "PREVIEW_PENDING", "PREVIEW_UNAVAILABLE", "ensure_probe", "probe_file", "probe_upload", "JobQueue", "get_job_queue", "JOB_QUEUED", "JOB_RUNNING", "JOB_COMPLETED", "JOB_FAILED", "JOB_CANCELLED"]
\ No newline at end of file
@@ -0,0 +1,130 @@
+import shutil
+import uuid
+from pathlib import Path
+from typing import Sequence
+from core import get_settings, compute_sha256
+from db import get_connection_pool, ConversionDB, ConversionRelationsDB, ConversionCacheDB
+from registry import ConversionStep
+from .executors import run_converter
+from . import conversion_cache
+
+settings = get_settings()
+TEMP_DIR = settings.tmp_dir
+CONVERTED_DIR = settings.output_dir
+
+
+def run_plan(
+    input_file: str,
+    output_format: str,
+    plan: Sequence[ConversionStep],
+    scratch_dir: Path,
+    options: dict | None = None,
+    probe: dict | None = None
+) -> str:
+    """
+    Run each converter of a plan in turn, feeding every step the previous step's output.
+
+    Args:
+        input_file: File the first step reads
+        output_format: Format the last step writes
+        plan: Converter steps producing output_format
+        scratch_dir: Directory the steps write to, the caller removes it
+        options: Conversion options, each one is applied by the earliest step that supports it
+        probe: Media probe of input_file, handed to the first step so it need not read the file to plan
+
+    Returns:
+        Path of the last step's output, inside scratch_dir
+    """
+    current_file = input_file
+    pending_options = dict(options or {})
+    for step_number, step in enumerate(plan):
+        # Intermediates stay in the scratch directory, only the last step names the requested format
+        step_output_format = output_format if step_number == len(plan) - 1 else step.output_format
+        step_options = {key: pending_options.pop(key) for key in list(pending_options) if key in step.converter.supported_options}
+        current_file = run_converter(
+            step.converter,
+            current_file,
+            f'{scratch_dir}/{step_number}/',
+            step.input_format,
+            step_output_format,
+            step_options,
+            probe if step_number == 0 else None
+        )[0]
+    return current_file
+
+
+def convert_file(
+    og_metadata: dict,
+    output_format: str,
+    plan: Sequence[ConversionStep],
+    options: dict | None = None,
+    probe: dict | None = None
+) -> dict:
+    """
+    Convert a previously uploaded file and record the result.
+
+    Identical conversions (same input bytes, target format, converters and
+    options) are served from the conversion cache without running the
+    converters again. Pooled connections are only borrowed around the cache
+    lookup and the writes, none is held while the converters run.
+
+    Args:
+        og_metadata: Metadata of the original file, as stored in FileDB
+        output_format: Sanitized target format
+        plan: Converter steps producing output_format, from ConverterRegistry.plan_conversion()
+        options: Converter options that affect the output
+        probe: Media probe stored for the original file at upload, if any
+
+    Returns:
+        Metadata of the converted file
+    """
+    og_id = og_metadata['id']
+    converted_id = str(uuid.uuid4())
+    converted_metadata = dict(og_metadata)
+    output_path = Path(f'{CONVERTED_DIR}/{converted_id}.{output_format}')
+
+    cache_key = conversion_cache.make_cache_key(og_metadata['sha256_checksum'], output_format, plan, options)
+    pool = get_connection_pool()
+    with pool.connection() as conn:
+        cached = conversion_cache.lookup(ConversionCacheDB(conn), cache_key)
+    if cached is not None:
+        # Cache hit, reuse the existing output instead of converting again
+        conversion_cache.link_or_copy(Path(cached['storage_path']), output_path)
+        size_bytes = cached['size_bytes']
+        sha256_checksum = cached['sha256_checksum']
+    else:
+        # Perform the conversion using the converter interface. Each conversion gets its own
+        # scratch directory since deduplicated inputs share a file name.
+        scratch_dir = Path(TEMP_DIR) / converted_id
+        try:
+            current_file = run_plan(og_metadata['storage_path'], output_format, plan, scratch_dir, options, probe)
+            Path(current_file).rename(output_path)
+        finally:
+            shutil.rmtree(scratch_dir, ignore_errors=True)
+        size_bytes = output_path.stat().st_size
+        sha256_checksum = compute_sha256(output_path)
+        with pool.connection() as conn:
+            conversion_cache.store(ConversionCacheDB(conn), cache_key, output_path, size_bytes, sha256_checksum)
+
+    # Store the converted file metadata in the conversion database and create a relation to the original file
+    converted_metadata['id'] = converted_id
+    converted_metadata['media_type'] = f"{output_format}"
+    converted_metadata['extension'] = f".{output_format}"
+    converted_metadata['storage_path'] = str(output_path)
+    converted_metadata['size_bytes'] = size_bytes
+    converted_metadata['sha256_checksum'] = sha256_checksum
+    converted_metadata.pop('created_at', None)  # Remove created_at from original metadata if it exists
+    # Metadata and relation are written together so history never sees one without the other
+    with pool.connection() as conn, conn.transaction():
+        ConversionDB(conn).insert_file_metadata(converted_metadata)
+        # Store relation with denormalized original file metadata
+        ConversionRelationsDB(conn).insert_conversion_relation({
+            'original_file_id': og_id,
+            'converted_file_id': converted_id,
+            'original_filename': og_metadata['original_filename'],
+            'original_media_type': og_metadata['media_type'],
+            'original_extension': og_metadata['extension'],
+            'original_size_bytes': og_metadata['size_bytes']
+        })
+
+    return converted_metadata
@@ -0,0 +1,114 @@
+import hashlib
+import json
+import os
+import shutil
+import uuid
+from pathlib import Path
+from typing import Sequence
+from core import get_settings, media_type_aliases
+from db import ConversionCacheDB
+from registry import ConversionStep
+
+settings = get_settings()
+CACHE_DIR = settings.cache_dir
+
+
+def make_cache_key(
+    input_checksum: str,
+    output_format: str,
+    plan: Sequence[ConversionStep],
+    options: dict | None = None
+) -> str:
+    """
+    Build the cache key identifying a conversion result.
+
+    Args:
+        input_checksum: sha256 of the input file
+        output_format: Target format, aliases are normalized
+        plan: Converter steps that produce the output
+        options: Converter options that affect the output
+
+    Returns:
+        Hex digest uniquely identifying the conversion
+    """
+    normalized_format = media_type_aliases.get(output_format.lower(), output_format.lower())
+    key_material = json.dumps([
+        input_checksum,
+        normalized_format,
+        [[step.converter.__name__, step.converter.version, step.output_format] for step in plan],
+        options or {}
+    ], sort_keys=True)
+    return hashlib.sha256(key_material.encode()).hexdigest()
+
+
+def link_or_copy(source: Path, destination: Path):
+    """
+    Make destination refer to the same content as source.
+
+    Hard links share the data blocks, so a cache hit costs no I/O. Falls back
+    to a copy when the paths are on different filesystems.
+    """
+    temp_destination = destination.with_name(f".{uuid.uuid4()}.tmp")
+    try:
+        os.link(source, temp_destination)
+    except OSError:
+        shutil.copyfile(source, temp_destination)
+    os.replace(temp_destination, destination)
+
+
+def lookup(cache_db: ConversionCacheDB, cache_key: str) -> dict | None:
+    """
+    Find a cached conversion result.
+
+    Returns:
+        Cache entry with storage_path, size_bytes and sha256_checksum, or None
+    """
+    entry = cache_db.get_entry(cache_key)
+    if entry is None:
+        return None
+    if not Path(entry['storage_path']).is_file():
+        # Cached file was removed out from under us, forget it
+        cache_db.delete_entry(cache_key)
+        return None
+    cache_db.touch_entry(cache_key)
+    return entry
+
+
+def store(cache_db: ConversionCacheDB, cache_key: str, output_file: Path, size_bytes: int, sha256_checksum: str):
+    """
+    Add a freshly converted file to the cache, then evict down to the size limit.
+
+    Args:
+        cache_db: Database tracking cache entries
+        cache_key: Key from make_cache_key()
+        output_file: Converted file, linked (not moved) into the cache
+        size_bytes: Size of the converted file
+        sha256_checksum: Checksum of the converted file
+    """
+    if size_bytes > settings.conversion_cache_max_bytes:
+        return
+    cached_file = CACHE_DIR / f"{cache_key}{output_file.suffix}"
+    link_or_copy(output_file, cached_file)
+    cache_db.insert_entry({
+        'cache_key': cache_key,
+        'storage_path': str(cached_file),
+        'size_bytes': size_bytes,
+        'sha256_checksum': sha256_checksum
+    })
+    evict(cache_db, settings.conversion_cache_max_bytes)
+
+
+def evict(cache_db: ConversionCacheDB, max_bytes: int):
+    """Drop least recently used entries until the cache fits in max_bytes."""
+    total_size = cache_db.get_total_size()
+    while total_size > max_bytes:
+        entries = cache_db.list_least_recently_used()
+        if not entries:
+            return
+        for entry in entries:
+            if total_size <= max_bytes:
+                return
+            # Conversions that were served from this entry keep their own hard link
+            Path(entry['storage_path']).unlink(missing_ok=True)
+            cache_db.delete_entry(entry['cache_key'])
+            total_size -= entry['size_bytes']
@@ -0,0 +1,101 @@
+import multiprocessing
+import os
+import threading
+from concurrent.futures import ProcessPoolExecutor
+from functools import lru_cache
+import converters
+from converters import ConverterManifest
+from core import get_settings
+
+settings = get_settings()
+
+_semaphores: dict[str, threading.BoundedSemaphore] = {}
+_semaphores_lock = threading.Lock()
+
+
+def _create_converter(converter_type, args: tuple, probe: dict | None):
+    converter = converter_type(*args)
+    converter.probe = probe
+    return converter
+
+
+def _convert_in_subprocess(converter_name: str, args: tuple, probe: dict | None) -> list[str]:
+    """Entry point executed inside a process pool worker, the converter's module is first imported here."""
+    return _create_converter(getattr(converters, converter_name), args, probe).convert()
+
+
+def get_process_pool_size() -> int:
+    """Number of workers in the process pool, settings.process_pool_size or the CPU count."""
+    return settings.process_pool_size or os.cpu_count() or 1
+
+
+@lru_cache
+def get_process_pool() -> ProcessPoolExecutor:
+    """
+    Cached process pool shared by all process-lane converters.
+
+    Uses the spawn start method since the parent process is multithreaded.
+    """
+    return ProcessPoolExecutor(
+        max_workers=get_process_pool_size(),
+        mp_context=multiprocessing.get_context("spawn")
+    )
+
+
+def _get_semaphore(converter_name: str) -> threading.BoundedSemaphore | None:
+    """Get the concurrency limit for a converter, or None if it is unlimited."""
+    limit = settings.converter_concurrency.get(converter_name)
+    if limit is None:
+        return None
+    with _semaphores_lock:
+        if converter_name not in _semaphores:
+            _semaphores[converter_name] = threading.BoundedSemaphore(limit)
+        return _semaphores[converter_name]
+
+
+def run_converter(
+    converter_type: ConverterManifest,
+    input_file: str,
+    output_dir: str,
+    input_type: str,
+    output_type: str,
+    options: dict | None = None,
+    probe: dict | None = None
+) -> list[str]:
+    """
+    Create a converter and run it in the execution lane it asks for.
+
+    Process-lane converters are created inside the shared process pool, only
+    their name and arguments are sent there, so the backends they import
+    (pandas, pyarrow, Pillow...) never load into this process. They are
+    bounded by their per-converter concurrency limit. Everything else is
+    created and run on the calling thread.
+
+    Args:
+        converter_type: Manifest, or class, of the converter to run
+        input_file: File to convert
+        output_dir: Directory the converter writes to
+        input_type: Format of input_file
+        output_type: Format to convert to
+        options: Conversion options the converter supports
+        probe: Stored media probe of input_file, see ConverterInterface.probe
+
+    Returns:
+        List of paths to the converted output files.
+    """
+    args = (input_file, output_dir, input_type, output_type, options)
+    if converter_type.execution_lane != "process":
+        return _create_converter(converter_type, args, probe).convert()
+
+    semaphore = _get_semaphore(converter_type.__name__)
+    if semaphore is None:
+        return get_process_pool().submit(_convert_in_subprocess, converter_type.__name__, args, probe).result()
+    with semaphore:
+        return get_process_pool().submit(_convert_in_subprocess, converter_type.__name__, args, probe).result()
+
+
+def shutdown_process_pool(wait: bool = True):
+    """Shut down the process pool if it was ever started."""
+    if get_process_pool.cache_info().currsize:
+        get_process_pool().shutdown(wait=wait, cancel_futures=True)
+        get_process_pool.cache_clear()
@@ -0,0 +1,173 @@
+import json
+import logging
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import lru_cache
+from core import get_settings, cancellation_scope
+from db import get_connection_pool, FileDB, JobDB, BlobDB
+from registry import ConversionStep, get_converter_registry
+from .conversion import convert_file
+from .executors import get_process_pool_size, shutdown_process_pool
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+registry = get_converter_registry()
+
+JOB_QUEUED = "queued"
+JOB_RUNNING = "running"
+JOB_COMPLETED = "completed"
+JOB_FAILED = "failed"
+JOB_CANCELLED = "cancelled"
+
+
+def _now() -> str:
+    """Current UTC time in the same format SQLite uses for CURRENT_TIMESTAMP."""
+    return datetime.now(timezone.utc).strftime("%Y-%m-%d %H:%M:%S")
+
+
+def run_conversion_job(job_id: str, cancel_event: threading.Event):
+    """
+    Execute a queued conversion job and record its outcome in the job table.
+
+    Runs on a worker thread. Pooled connections are only borrowed for the
+    job's reads and writes, never while the converters run, since a
+    conversion may take as long as ffmpeg_timeout_seconds. Setting
+    cancel_event kills any external process the converter is running.
+    """
+    pool = get_connection_pool()
+    try:
+        with pool.connection() as conn:
+            job_db = JobDB(conn)
+            job = job_db.get_job(job_id)
+            if job is None or cancel_event.is_set():
+                return
+            if not job_db.update_job(job_id, expected_status=JOB_QUEUED, status=JOB_RUNNING, started_at=_now()):
+                return
+            og_metadata = FileDB(conn).get_file_metadata(job['original_file_id'])
+            if og_metadata is None:
+                raise FileNotFoundError(f"No file found with id {job['original_file_id']}")
+            probe = BlobDB(conn).get_probe(og_metadata['sha256_checksum'])
+
+        params = json.loads(job['params_json'])
+        # Jobs queued before conversions were planned name a single converter
+        steps = params.get('steps') or [[job['converter_id'], og_metadata['media_type'], params['output_format']]]
+        plan = []
+        for converter_id, input_format, output_format in steps:
+            converter_type = registry.get_converter(converter_id)
+            if converter_type is None:
+                raise ValueError(f"Converter {converter_id} is not registered")
+            plan.append(ConversionStep(converter_type, input_format, output_format))
+
+        with cancellation_scope(cancel_event):
+            converted_metadata = convert_file(
+                og_metadata,
+                params['output_format'],
+                plan,
+                params.get('options'),
+                probe
+            )
+        with pool.connection() as conn:
+            JobDB(conn).update_job(
+                job_id,
+                status=JOB_COMPLETED,
+                progress=100,
+                finished_at=_now(),
+                converted_file_id=converted_metadata['id']
+            )
+    except Exception as e:
+        with pool.connection() as conn:
+            job_db = JobDB(conn)
+            if cancel_event.is_set():
+                job_db.update_job(job_id, status=JOB_CANCELLED, finished_at=_now(), error="Cancelled")
+            else:
+                logger.exception("Conversion job %s failed", job_id)
+                job_db.update_job(job_id, status=JOB_FAILED, finished_at=_now(), error=str(e))
+
+
+class JobQueue:
+    """
+    In-process queue that runs conversion jobs on a fixed-size worker pool.
+
+    Job state lives in JobDB, so the queue itself only holds job IDs.
+    """
+    def __init__(self, worker_count: int):
+        self.executor = ThreadPoolExecutor(max_workers=worker_count, thread_name_prefix="transmute-worker")
+        self.cancel_events: dict[str, threading.Event] = {}
+        self.lock = threading.Lock()
+
+    def submit(self, job_id: str):
+        """
+        Schedule a queued job for execution.
+
+        Args:
+            job_id: ID of a job already stored in JobDB with status 'queued'
+        """
+        cancel_event = threading.Event()
+        with self.lock:
+            self.cancel_events[job_id] = cancel_event
+        future = self.executor.submit(run_conversion_job, job_id, cancel_event)
+        future.add_done_callback(lambda _: self._forget(job_id))
+
+    def _forget(self, job_id: str):
+        with self.lock:
+            self.cancel_events.pop(job_id, None)
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Request cancellation of a queued or running job.
+
+        Queued jobs are marked cancelled right away and skipped by the worker
+        pool. Running jobs have their external processes killed; conversions
+        that do not shell out finish normally.
+
+        Args:
+            job_id: ID of the job to cancel
+
+        Returns:
+            True if the job was still known to the worker pool
+        """
+        with self.lock:
+            cancel_event = self.cancel_events.get(job_id)
+        if cancel_event is not None:
+            cancel_event.set()
+        job_db = JobDB()
+        try:
+            job_db.update_job(job_id, expected_status=JOB_QUEUED, status=JOB_CANCELLED, finished_at=_now(), error="Cancelled")
+        finally:
+            job_db.close()
+        return cancel_event is not None
+
+    def recover(self):
+        """
+        Reconcile jobs left over from a previous run of the server.
+
+        Jobs that were running when the server stopped are marked as failed,
+        jobs that never started are scheduled again.
+        """
+        job_db = JobDB()
+        try:
+            for job in job_db.list_jobs(status=JOB_RUNNING):
+                job_db.update_job(job['id'], status=JOB_FAILED, finished_at=_now(), error="Interrupted by server restart")
+            for job in reversed(job_db.list_jobs(status=JOB_QUEUED)):
+                self.submit(job['id'])
+        finally:
+            job_db.close()
+
+    def shutdown(self, wait: bool = True):
+        """Stop accepting jobs and optionally wait for running ones to finish."""
+        self.executor.shutdown(wait=wait, cancel_futures=True)
+        shutdown_process_pool(wait=wait)
+
+
+@lru_cache
+def get_job_queue() -> JobQueue:
+    """
+    Cached job queue instance.
+
+    Ensures a single worker pool is shared by the whole process. Without a
+    configured worker_count there is a job thread per process pool worker,
+    so CPU-bound conversions can keep the whole pool busy.
+    """
+    return JobQueue(settings.worker_count or get_process_pool_size())
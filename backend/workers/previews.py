@@ -0,0 +1,166 @@
+import logging
+import os
+import shutil
+import threading
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+from functools import lru_cache
+from pathlib import Path
+from typing import Optional
+from converters.manifests import FFMPEG, PANDAS, PILLOW
+from core import get_settings, run_command
+from registry import get_converter_registry
+from .conversion import run_plan
+from .executors import run_converter
+
+logger = logging.getLogger(__name__)
+
+settings = get_settings()
+PREVIEW_DIR = settings.preview_dir
+TEMP_DIR = settings.tmp_dir
+# Keyframe extraction reads a few packets at most, a stuck ffmpeg should not hold a request for long
+KEYFRAME_TIMEOUT_SECONDS = 30
+
+PREVIEW_READY = "ready"
+PREVIEW_PENDING = "pending"
+PREVIEW_UNAVAILABLE = "unavailable"
+
+# Previews being generated, by file name, so each is only queued once
+_pending: set[str] = set()
+_pending_lock = threading.Lock()
+
+# Media type of each kind of preview
+PREVIEW_MEDIA_TYPES = {
+    'image': 'image/webp',
+    'video': 'image/webp',
+    'table': 'application/json',
+}
+
+
+def preview_kind(media_type: str) -> Optional[str]:
+    """
+    How a file of the given media type is previewed.
+
+    Returns:
+        "image" for a thumbnail made by converters, "video" for a keyframe
+        thumbnail, "table" for a snippet of the first rows, None if the type
+        cannot be previewed
+    """
+    if media_type in PANDAS.supported_input_formats:
+        return 'table'
+    if media_type in PILLOW.supported_input_formats:
+        return 'image'
+    if media_type in FFMPEG.video_formats:
+        return 'video'
+    plan = get_converter_registry().plan_conversion(media_type, 'webp')
+    if plan is not None and not any(step.converter is FFMPEG for step in plan):
+        # Diagrams and other formats rendered to an image on the way
+        return 'image'
+    return None
+
+
+@lru_cache
+def get_preview_pool() -> ThreadPoolExecutor:
+    """
+    Cached thread pool previews are generated on.
+
+    Kept apart from the request threads and the job queue, so a page full of
+    thumbnails neither stalls requests nor waits behind long conversions.
+    """
+    return ThreadPoolExecutor(max_workers=settings.preview_worker_count, thread_name_prefix="transmute-preview")
+
+
+def shutdown_preview_pool(wait: bool = True):
+    """Stop generating previews, dropping those not started yet."""
+    if get_preview_pool.cache_info().currsize:
+        get_preview_pool().shutdown(wait=wait, cancel_futures=True)
+        get_preview_pool.cache_clear()
+
+
+def get_preview(metadata: dict) -> tuple[str, Optional[Path], Optional[str]]:
+    """
+    Preview of an uploaded or converted file, queued for generation on first use.
+
+    Previews are cached on disk by the file's checksum, so files with the
+    same contents share one and each is only ever generated once. Failures
+    are cached the same way, a file that cannot be previewed is not tried again.
+
+    Args:
+        metadata: File metadata, as stored in FileDB or ConversionDB
+
+    Returns:
+        PREVIEW_READY with the path and media type of the preview,
+        PREVIEW_PENDING while it is generated, or PREVIEW_UNAVAILABLE if the
+        file's type cannot be previewed or generating its preview failed
+    """
+    kind = preview_kind(metadata['media_type'])
+    if kind is None:
+        return PREVIEW_UNAVAILABLE, None, None
+    # Rows stored before checksums were recorded fall back to their ID
+    # Named "<key>-<size>" so core.remove_previews() finds every preview of a file
+    key = metadata.get('sha256_checksum') or metadata['id']
+    if kind == 'table':
+        stem, extension = f"{key}-{settings.preview_rows}", "json"
+    else:
+        stem, extension = f"{key}-{settings.preview_max_dimension}", "webp"
+    preview_path = PREVIEW_DIR / f"{stem}.{extension}"
+    if preview_path.is_file():
+        return PREVIEW_READY, preview_path, PREVIEW_MEDIA_TYPES[kind]
+    failed_path = PREVIEW_DIR / f"{stem}.failed"
+    if failed_path.is_file():
+        return PREVIEW_UNAVAILABLE, None, None
+    with _pending_lock:
+        if preview_path.name not in _pending:
+            _pending.add(preview_path.name)
+            get_preview_pool().submit(
+                _write_preview, kind, metadata['storage_path'], metadata['media_type'], preview_path, failed_path
+            )
+    return PREVIEW_PENDING, None, None
+
+
+def _write_preview(kind: str, input_file: str, media_type: str, preview_path: Path, failed_path: Path):
+    """Generate a preview into the cache, or record that it cannot be generated."""
+    scratch_dir = Path(TEMP_DIR) / f"preview-{uuid.uuid4()}"
+    try:
+        generated = _generate_preview(kind, input_file, media_type, scratch_dir)
+        os.replace(generated, preview_path)
+    except Exception as e:
+        logger.warning("Preview generation for %s failed: %s", input_file, e)
+        failed_path.write_text(str(e))
+    finally:
+        shutil.rmtree(scratch_dir, ignore_errors=True)
+        with _pending_lock:
+            _pending.discard(preview_path.name)
+
+
+def _generate_preview(kind: str, input_file: str, media_type: str, scratch_dir: Path) -> str:
+    """Write a preview into scratch_dir and return its path."""
+    if kind == 'table':
+        return run_converter(PANDAS, input_file, f'{scratch_dir}/', media_type, 'json', {'limit': settings.preview_rows})[0]
+
+    if kind == 'image':
+        options = {'max_dimension': settings.preview_max_dimension}
+        if media_type in PILLOW.supported_input_formats:
+            # Same-format conversions are not planned, webp inputs included
+            return run_converter(PILLOW, input_file, f'{scratch_dir}/', media_type, 'webp', options)[0]
+        plan = get_converter_registry().plan_conversion(media_type, 'webp')
+        return run_plan(input_file, 'webp', plan, scratch_dir, options)
+
+    # Video: decode only keyframes and keep the first, no need to decode anything in between
+    scratch_dir.mkdir(parents=True, exist_ok=True)
+    output_file = str(scratch_dir / "keyframe.webp")
+    size = settings.preview_max_dimension
+    cmd = [
+        'ffmpeg', '-nostdin', '-y',
+        '-skip_frame', 'nokey',
+        '-i', input_file,
+        '-an',
+        '-frames:v', '1',
+        '-vf', f"scale={size}:{size}:force_original_aspect_ratio=decrease",
+        '-c:v', 'libwebp',
+        output_file
+    ]
+    result = run_command(cmd, timeout=KEYFRAME_TIMEOUT_SECONDS)
+    if result.returncode != 0 or not os.path.isfile(output_file):
+        raise RuntimeError(f"FFmpeg keyframe extraction failed: {result.stderr}")
+    return output_file
@@ -0,0 +1,160 @@
+import logging
+from typing import Optional
+from converters.ffmpeg_convert import probe_media
+from converters.manifests import FFMPEG, PILLOW
+from core import media_type_aliases
+from db import get_connection_pool, BlobDB
+from .executors import get_process_pool
+
+logger = logging.getLogger(__name__)
+
+# Tabular formats whose schema is stored in the file or readable from its first block
+TABLE_PROBE_FORMATS = {'parquet', 'csv'}
+
+
+def probe_kind(media_type: str) -> Optional[str]:
+    """
+    How a file of the given media type is probed.
+
+    Returns:
+        "image" for Pillow's header reader, "media" for ffprobe, "table" for
+        the schema of a Parquet or CSV file, None if the type is not probed
+    """
+    media_type = media_type_aliases.get(media_type, media_type)
+    # Animated gifs are media to ffmpeg too, Pillow reads their header without spawning anything
+    if media_type in PILLOW.supported_input_formats and media_type != 'svg':
+        return 'image'
+    if media_type in FFMPEG.supported_input_formats:
+        return 'media'
+    if media_type in TABLE_PROBE_FORMATS:
+        return 'table'
+    return None
+
+
+def probe_file(input_file: str, media_type: str) -> Optional[dict]:
+    """
+    Read the dimensions, duration, codec and layout of a file without decoding it.
+
+    Every probe has "kind", "width", "height", "duration", "codec" and
+    "pages", None where they do not apply. Media probes add the container
+    "format" and ffprobe's "streams", image probes the Pillow "format" and
+    "mode", table probes the "columns" and, for Parquet, the "rows".
+
+    Args:
+        input_file: File to probe
+        media_type: Detected media type of the file
+
+    Returns:
+        The probe, None if the type is not probed or the file could not be read
+    """
+    kind = probe_kind(media_type)
+    if kind is None:
+        return None
+    if kind == 'media':
+        return _probe_media(input_file, media_type)
+    # Pillow and pyarrow stay out of the API process, the process pool workers load them for conversions anyway
+    return get_process_pool().submit(_read_header, input_file, media_type).result()
+
+
+def ensure_probe(sha256_checksum: str, input_file: str, media_type: str) -> Optional[dict]:
+    """
+    Probe stored for a blob, probing the file and storing the result if there is none.
+
+    A pooled connection is only borrowed to read and to store the probe,
+    none is held while ffprobe or the process pool work.
+
+    Returns:
+        The probe, None if the type is not probed or the file could not be read
+
+    Raises:
+        Whatever reading the file raised, for files that are not what their type says
+    """
+    pool = get_connection_pool()
+    with pool.connection() as conn:
+        probe = BlobDB(conn).get_probe(sha256_checksum)
+    if probe is not None:
+        return probe
+    probe = probe_file(input_file, media_type)
+    if probe is not None:
+        with pool.connection() as conn:
+            BlobDB(conn).set_probe(sha256_checksum, probe)
+    return probe
+
+
+def probe_upload(sha256_checksum: str, input_file: str, media_type: str):
+    """
+    Probe an uploaded file and store the result with its blob.
+
+    Runs after the upload response is sent. Probes are keyed by checksum, so
+    files with the same contents are only ever probed once. Failures are
+    logged and leave the blob unprobed, nothing depends on a probe being there.
+    """
+    try:
+        ensure_probe(sha256_checksum, input_file, media_type)
+    except Exception as e:
+        # Mostly files whose extension does not match their contents
+        logger.warning("Probing %s failed: %s", input_file, e)
+
+
+def _new_probe(kind: str, **fields) -> dict:
+    return {'kind': kind, 'width': None, 'height': None, 'duration': None, 'codec': None, 'pages': None, **fields}
+
+
+def _probe_media(input_file: str, media_type: str) -> Optional[dict]:
+    """Probe an audio or video file with ffprobe."""
+    info = probe_media(input_file)
+    streams = info.get('streams')
+    if not streams:
+        return None
+    video = next((stream for stream in streams if stream.get('codec_type') == 'video'), None)
+    audio = next((stream for stream in streams if stream.get('codec_type') == 'audio'), None)
+    # Audio files may carry their cover art as a video stream, it is not what the file is
+    main = audio if media_type in FFMPEG.audio_formats or video is None else video
+    duration = info.get('format', {}).get('duration') or (main or {}).get('duration')
+    return _new_probe(
+        'audio' if media_type in FFMPEG.audio_formats else 'video',
+        width=video.get('width') if video and main is video else None,
+        height=video.get('height') if video and main is video else None,
+        duration=float(duration) if duration else None,
+        codec=main.get('codec_name') if main else None,
+        format=info.get('format', {}).get('format_name'),
+        streams=streams
+    )
+
+
+def _read_header(input_file: str, media_type: str) -> dict:
+    """Probe an image or table from its header, entry point executed inside a process pool worker."""
+    if probe_kind(media_type) == 'image':
+        # Loading the converter registers the HEIF opener in this process
+        PILLOW.load()
+        from PIL import Image
+        # Opening only parses the header, pixels are decoded on first access
+        with Image.open(input_file) as img:
+            return _new_probe(
+                'image',
+                width=img.width,
+                height=img.height,
+                codec=img.format.lower() if img.format else None,
+                pages=getattr(img, 'n_frames', 1),
+                format=img.format,
+                mode=img.mode
+            )
+
+    if media_type == 'parquet':
+        import pyarrow.parquet as pq
+        # The footer holds the schema and row count, no row group is read
+        metadata = pq.read_metadata(input_file)
+        schema = metadata.schema.to_arrow_schema()
+        return _new_probe('table', codec='parquet', rows=metadata.num_rows, columns=_columns(schema))
+
+    from pyarrow import csv
+    # Opening a CSV reader infers the schema from its first block only
+    reader = csv.open_csv(input_file)
+    try:
+        return _new_probe('table', codec='csv', rows=None, columns=_columns(reader.schema))
+    finally:
+        reader.close()
+
+
+def _columns(schema) -> list[dict]:
+    return [{'name': field.name, 'type': str(field.type)} for field in schema]
@@ -1,3 +1,5 @@
+import { useEffect, useState } from 'react'
+
 export interface FileInfo {
     id: string
     original_filename: string
@@ -27,6 +29,24 @@ interface FileListItemProps {
     isDeleting?: boolean
     isDownloading?: boolean
     isPending?: boolean // true for pending conversions, false for completed
+    previewId?: string // file or conversion ID to show a preview of
+}
+
+// Formats previewed as their first rows rather than a thumbnail
+const TABULAR_FORMATS = new Set(['csv', 'xlsx', 'parquet', 'json', 'yaml', 'ndjson'])
+
+// Previews are generated in the background, the API answers 202 until one is ready
+const PREVIEW_POLL_MS = 1000
+const PREVIEW_MAX_POLLS = 30
+
+type Row = Record<string, unknown>
+
+async function fetchPreview(previewId: string, signal?: AbortSignal): Promise<Response> {
+    for (let attempt = 0; ; attempt++) {
+        const response = await fetch(`/api/files/${previewId}/preview`, { signal })
+        if (response.status !== 202 || attempt >= PREVIEW_MAX_POLLS) return response
+        await new Promise(resolve => setTimeout(resolve, PREVIEW_POLL_MS))
+    }
 }
 
 function formatFileSize(bytes: number): string {
@@ -40,6 +60,12 @@ function formatFileSize(bytes: number): string {
     return `${(gb / 1024).toFixed(1)} TB`
 }
 
+function formatCell(value: unknown): string {
+    if (value === null || value === undefined) return ''
+    if (typeof value === 'object') return JSON.stringify(value)
+    return String(value)
+}
+
 function FileListItem({
     file,
     conversion,
@@ -50,7 +76,60 @@ function FileListItem({
     isDeleting = false,
     isDownloading = false,
     isPending = false,
+    previewId,
 }: FileListItemProps) {
+    const [thumbnailFailed, setThumbnailFailed] = useState(false)
+    const [thumbnailUrl, setThumbnailUrl] = useState<string | null>(null)
+    const [rows, setRows] = useState<Row[] | null>(null)
+    const [showRows, setShowRows] = useState(false)
+    const [rowsError, setRowsError] = useState<string | null>(null)
+
+    const previewType = conversion?.media_type || file.media_type
+    const isTabular = TABULAR_FORMATS.has(previewType)
+
+    useEffect(() => {
+        if (!previewId || isTabular) return
+        const controller = new AbortController()
+        let objectUrl: string | null = null
+        fetchPreview(previewId, controller.signal)
+            .then(response => {
+                if (response.status !== 200) throw new Error('No preview available')
+                return response.blob()
+            })
+            .then(blob => {
+                objectUrl = URL.createObjectURL(blob)
+                setThumbnailUrl(objectUrl)
+            })
+            .catch(() => {
+                if (!controller.signal.aborted) setThumbnailFailed(true)
+            })
+        return () => {
+            controller.abort()
+            if (objectUrl) URL.revokeObjectURL(objectUrl)
+        }
+    }, [previewId, isTabular])
+
+    const toggleRows = async () => {
+        if (showRows) {
+            setShowRows(false)
+            return
+        }
+        setShowRows(true)
+        if (rows !== null || !previewId) return
+        try {
+            const response = await fetchPreview(previewId)
+            if (response.status !== 200) throw new Error('No preview available')
+            const data = await response.json()
+            setRows(Array.isArray(data) ? data : [data])
+        } catch (err) {
+            setRowsError(err instanceof Error ? err.message : 'No preview available')
+        }
+    }
+
+    const columns = rows
+        ? Array.from(new Set(rows.flatMap(row => (row && typeof row === 'object' ? Object.keys(row) : []))))
+        : []
+
     const sortedFormats = file.compatible_formats
         ? [...file.compatible_formats].sort()
         : []
@@ -69,77 +148,131 @@ function FileListItem({
     }
 
     return (
-        <div className="bg-surface-light border border-surface-dark rounded-lg p-4 flex items-center gap-4">
-            <div className="flex-1 min-w-0">
-                {/* Format conversion indicator */}
-                <div className="flex items-center gap-2 mb-1">
-                    <span className="text-xs font-mono uppercase bg-surface-dark px-2 py-0.5 rounded text-text-muted">
-                        {file.media_type}
-                    </span>
-                    {(conversion || selectedFormat) && (
-                        <>
-                            <span className="text-text-muted text-xs">→</span>
-                            {isPending && sortedFormats.length > 0 && onFormatChange ? (
-                                <select
-                                    value={selectedFormat || ''}
-                                    onChange={(e) => onFormatChange(e.target.value)}
-                                    className="text-xs font-mono uppercase bg-primary/20 px-2 py-0.5 rounded text-primary border-none focus:outline-none focus:ring-1 focus:ring-primary cursor-pointer"
-                                >
-                                    {sortedFormats.map((format) => (
-                                        <option key={format} value={format}>
-                                            {format}
-                                        </option>
-                                    ))}
-                                </select>
-                            ) : (
-                                <span className="text-xs font-mono uppercase bg-primary/20 px-2 py-0.5 rounded text-primary">
-                                    {conversion?.media_type || selectedFormat}
-                                </span>
-                            )}
-                        </>
-                    )}
+        <div className="bg-surface-light border border-surface-dark rounded-lg p-4">
+            <div className="flex items-center gap-4">
+                {previewId && !isTabular && !thumbnailFailed && (
+                    thumbnailUrl ? (
+                        <img
+                            src={thumbnailUrl}
+                            alt=""
+                            onError={() => setThumbnailFailed(true)}
+                            className="w-16 h-16 object-contain rounded bg-surface-dark flex-shrink-0"
+                        />
+                    ) : (
+                        <div className="w-16 h-16 rounded bg-surface-dark flex-shrink-0" />
+                    )
+                )}
+                <div className="flex-1 min-w-0">
+                    {/* Format conversion indicator */}
+                    <div className="flex items-center gap-2 mb-1">
+                        <span className="text-xs font-mono uppercase bg-surface-dark px-2 py-0.5 rounded text-text-muted">
+                            {file.media_type}
+                        </span>
+                        {(conversion || selectedFormat) && (
+                            <>
+                                <span className="text-text-muted text-xs">→</span>
+                                {isPending && sortedFormats.length > 0 && onFormatChange ? (
+                                    <select
+                                        value={selectedFormat || ''}
+                                        onChange={(e) => onFormatChange(e.target.value)}
+                                        className="text-xs font-mono uppercase bg-primary/20 px-2 py-0.5 rounded text-primary border-none focus:outline-none focus:ring-1 focus:ring-primary cursor-pointer"
+                                    >
+                                        {sortedFormats.map((format) => (
+                                            <option key={format} value={format}>
+                                                {format}
+                                            </option>
+                                        ))}
+                                    </select>
+                                ) : (
+                                    <span className="text-xs font-mono uppercase bg-primary/20 px-2 py-0.5 rounded text-primary">
+                                        {conversion?.media_type || selectedFormat}
+                                    </span>
+                                )}
+                            </>
+                        )}
+                    </div>
+
+                    {/* Filename */}
+                    <p className="text-sm font-medium text-text truncate">
+                        {getDisplayFilename()}
+                    </p>
+
+                    {/* File metadata */}
+                    <p className="text-xs text-text-muted/70 mt-0.5">
+                        {file.created_at && (
+                            <>
+                                {new Date(file.created_at).toLocaleString()} &middot;{' '}
+                            </>
+                        )}
+                        {formatFileSize(file.size_bytes)}
+                        {conversion && (
+                            <> → {formatFileSize(conversion.size_bytes)}</>
+                        )}
+                    </p>
                 </div>
 
-                {/* Filename */}
-                <p className="text-sm font-medium text-text truncate">
-                    {getDisplayFilename()}
-                </p>
-
-                {/* File metadata */}
-                <p className="text-xs text-text-muted/70 mt-0.5">
-                    {file.created_at && (
-                        <>
-                            {new Date(file.created_at).toLocaleString()} &middot;{' '}
-                        </>
+                {/* Action buttons */}
+                <div className="flex gap-2 flex-shrink-0">
+                    {previewId && isTabular && (
+                        <button
+                            onClick={toggleRows}
+                            className="bg-surface-dark hover:bg-surface-dark/70 text-text-muted hover:text-text text-sm font-semibold py-2 px-4 rounded-lg transition duration-200 shadow-sm"
+                        >
+                            {showRows ? 'Hide Rows' : 'Preview'}
+                        </button>
                     )}
-                    {formatFileSize(file.size_bytes)}
-                    {conversion && (
-                        <> → {formatFileSize(conversion.size_bytes)}</>
+                    {onDownload && conversion && (
+                        <button
+                            onClick={onDownload}
+                            disabled={isDownloading}
+                            className="bg-success hover:bg-success-dark text-white text-sm font-semibold py-2 px-4 rounded-lg transition duration-200 shadow-sm disabled:opacity-50 disabled:cursor-not-allowed"
+                        >
+                            {isDownloading ? 'Downloading...' : 'Download'}
+                        </button>
                     )}
-                </p>
+                    {onDelete && (
+                        <button
+                            onClick={onDelete}
+                            disabled={isDeleting}
+                            className="bg-primary/20 hover:bg-primary/40 text-primary-light text-sm font-semibold py-2 px-4 rounded-lg transition duration-200 shadow-sm disabled:opacity-50 disabled:cursor-not-allowed"
+                        >
+                            {isDeleting ? 'Deleting...' : 'Delete'}
+                        </button>
+                    )}
+                </div>
             </div>
 
-            {/* Action buttons */}
-            <div className="flex gap-2 flex-shrink-0">
-                {onDownload && conversion && (
-                    <button
-                        onClick={onDownload}
-                        disabled={isDownloading}
-                        className="bg-success hover:bg-success-dark text-white text-sm font-semibold py-2 px-4 rounded-lg transition duration-200 shadow-sm disabled:opacity-50 disabled:cursor-not-allowed"
-                    >
-                        {isDownloading ? 'Downloading...' : 'Download'}
-                    </button>
-                )}
-                {onDelete && (
-                    <button
-                        onClick={onDelete}
-                        disabled={isDeleting}
-                        className="bg-primary/20 hover:bg-primary/40 text-primary-light text-sm font-semibold py-2 px-4 rounded-lg transition duration-200 shadow-sm disabled:opacity-50 disabled:cursor-not-allowed"
-                    >
-                        {isDeleting ? 'Deleting...' : 'Delete'}
-                    </button>
-                )}
-            </div>
+            {/* First rows of a table */}
+            {showRows && (
+                <div className="mt-3 overflow-x-auto max-h-64 overflow-y-auto">
+                    {rowsError && <p className="text-xs text-text-muted">{rowsError}</p>}
+                    {!rowsError && rows === null && <p className="text-xs text-text-muted">Loading preview...</p>}
+                    {rows !== null && (
+                        <table className="text-xs font-mono text-text-muted border-collapse">
+                            <thead>
+                                <tr>
+                                    {columns.map(column => (
+                                        <th key={column} className="text-left px-2 py-1 border-b border-surface-dark text-text">
+                                            {column}
+                                        </th>
+                                    ))}
+                                </tr>
+                            </thead>
+                            <tbody>
+                                {rows.map((row, index) => (
+                                    <tr key={index}>
+                                        {columns.map(column => (
+                                            <td key={column} className="px-2 py-0.5 whitespace-nowrap">
+                                                {formatCell(row?.[column])}
+                                            </td>
+                                        ))}
+                                    </tr>
+                                ))}
+                            </tbody>
+                        </table>
+                    )}
+                </div>
+            )}
         </div>
     )
 }
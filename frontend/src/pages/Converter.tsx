@@ -12,6 +12,119 @@ interface CompletedConversion {
   conversion: ConversionInfo
 }
 
+interface ConversionJob {
+  id: string
+  status: string
+  original_file_id: string
+  error?: string
+  result?: ConversionInfo
+}
+
+interface ConversionBatch {
+  id: string
+  status: string
+  counts: Record<string, number>
+  jobs: ConversionJob[]
+}
+
+const BATCH_POLL_INTERVAL_MS = 1000
+
+// Poll a batch of conversions until the worker pool has finished every job in it
+async function waitForBatch(
+  batch: ConversionBatch,
+  onProgress: (batch: ConversionBatch) => void
+): Promise<ConversionBatch> {
+  while (batch.status === 'queued' || batch.status === 'running') {
+    onProgress(batch)
+    await new Promise((resolve) => setTimeout(resolve, BATCH_POLL_INTERVAL_MS))
+    const response = await fetch(`/api/conversions/batch/${batch.id}`)
+    if (!response.ok) {
+      throw new Error(`Failed to check conversion status: ${response.statusText}`)
+    }
+    batch = await response.json()
+  }
+  return batch
+}
+
+// Files at least this large are sent as a resumable upload in parallel chunks
+const RESUMABLE_UPLOAD_THRESHOLD = 64 * 1024 * 1024
+const UPLOAD_CHUNK_SIZE = 8 * 1024 * 1024
+const PARALLEL_CHUNK_UPLOADS = 4
+const CHUNK_UPLOAD_ATTEMPTS = 5
+
+interface UploadStatus {
+  id: string
+  size_bytes: number
+  offset: number
+  received: number[][]
+}
+
+// Upload a file in chunks that survive dropped connections, resolves to the same body as POST /api/files/
+async function uploadResumable(file: File) {
+  const createResponse = await fetch('/api/uploads/', {
+    method: 'POST',
+    headers: {
+      'Content-Type': 'application/json',
+    },
+    body: JSON.stringify({ filename: file.name, size_bytes: file.size }),
+  })
+  if (!createResponse.ok) {
+    throw new Error(`Upload failed for ${file.name}: ${createResponse.statusText}`)
+  }
+  const upload: UploadStatus = await createResponse.json()
+
+  const offsets: number[] = []
+  for (let offset = 0; offset < file.size; offset += UPLOAD_CHUNK_SIZE) {
+    offsets.push(offset)
+  }
+
+  const sendChunk = async (offset: number) => {
+    const end = Math.min(offset + UPLOAD_CHUNK_SIZE, file.size)
+    let start = offset
+    for (let attempt = 1; ; attempt++) {
+      let response: Response | null = null
+      try {
+        response = await fetch(`/api/uploads/${upload.id}?offset=${start}`, {
+          method: 'PUT',
+          body: file.slice(start, end),
+        })
+      } catch {
+        // Network error, retried below
+      }
+      if (response?.ok) return
+      if (response && response.status < 500) throw new Error(response.statusText)
+      if (attempt >= CHUNK_UPLOAD_ATTEMPTS) throw new Error('too many failed attempts')
+      // Resume after whatever part of the chunk made it before the failure
+      const statusResponse = await fetch(`/api/uploads/${upload.id}`)
+      if (statusResponse.ok) {
+        const status: UploadStatus = await statusResponse.json()
+        const covering = status.received.find(([s, e]) => s <= start && start < e)
+        if (covering) start = covering[1]
+        if (start >= end) return
+      }
+    }
+  }
+
+  // A few chunks in flight at once make better use of the link than one long request
+  const workers = Array.from({ length: Math.min(PARALLEL_CHUNK_UPLOADS, offsets.length) }, async () => {
+    let offset: number | undefined
+    while ((offset = offsets.shift()) !== undefined) {
+      await sendChunk(offset)
+    }
+  })
+  try {
+    await Promise.all(workers)
+  } catch (err) {
+    throw new Error(`Upload failed for ${file.name}: ${err instanceof Error ? err.message : 'unknown error'}`)
+  }
+
+  const completeResponse = await fetch(`/api/uploads/${upload.id}/complete`, { method: 'POST' })
+  if (!completeResponse.ok) {
+    throw new Error(`Upload failed for ${file.name}: ${completeResponse.statusText}`)
+  }
+  return completeResponse.json()
+}
+
 function Converter() {
   const location = useLocation()
   const navigate = useNavigate()
@@ -21,7 +134,7 @@ function Converter() {
   const [uploadCount, setUploadCount] = useState(0)
   const [error, setError] = useState<string | null>(null)
   const [converting, setConverting] = useState(false)
-  const [convertingIndex, setConvertingIndex] = useState<number | null>(null)
+  const [finishedIds, setFinishedIds] = useState<Set<string>>(new Set())
   const [deletingId, setDeletingId] = useState<string | null>(null)
   const [downloadingId, setDownloadingId] = useState<string | null>(null)
 
@@ -55,20 +168,25 @@ function Converter() {
     const newPendingFiles: PendingFile[] = []
 
     for (const file of Array.from(files)) {
-      const formData = new FormData()
-      formData.append('file', file)
-
       try {
-        const response = await fetch('/api/files/', {
-          method: 'POST',
-          body: formData,
-        })
-
-        if (!response.ok) {
-          throw new Error(`Upload failed for ${file.name}: ${response.statusText}`)
+        let data
+        if (file.size >= RESUMABLE_UPLOAD_THRESHOLD) {
+          data = await uploadResumable(file)
+        } else {
+          const formData = new FormData()
+          formData.append('file', file)
+
+          const response = await fetch('/api/files/', {
+            method: 'POST',
+            body: formData,
+          })
+
+          if (!response.ok) {
+            throw new Error(`Upload failed for ${file.name}: ${response.statusText}`)
+          }
+          data = await response.json()
         }
 
-        const data = await response.json()
         const fileInfo: FileInfo = {
           id: data.metadata.id,
           original_filename: data.metadata.original_filename,
@@ -130,37 +248,51 @@ function Converter() {
     if (pendingFiles.length === 0) return
 
     setConverting(true)
+    setFinishedIds(new Set())
     setError(null)
 
-    const filesToConvert = [...pendingFiles]
+    const filesToConvert = pendingFiles.filter(({ selectedFormat }) => selectedFormat)
+    const filesById = new Map(filesToConvert.map(({ file }) => [file.id, file]))
     const newCompletedConversions: CompletedConversion[] = []
 
-    for (let i = 0; i < filesToConvert.length; i++) {
-      const { file, selectedFormat } = filesToConvert[i]
-      setConvertingIndex(i)
-
-      if (!selectedFormat) continue
+    try {
+      // One request queues every conversion, the server validates them all before starting any
+      const response = await fetch('/api/conversions/batch', {
+        method: 'POST',
+        headers: {
+          'Content-Type': 'application/json',
+        },
+        body: JSON.stringify({
+          items: filesToConvert.map(({ file, selectedFormat }) => ({
+            id: file.id,
+            output_formats: [selectedFormat],
+          })),
+        }),
+      })
 
-      const inputFormat = file.extension?.replace(/^\./, '') || ''
+      if (!response.ok) {
+        const body = await response.json().catch(() => null)
+        throw new Error(`Conversion failed: ${body?.detail || response.statusText}`)
+      }
 
-      try {
-        const response = await fetch('/api/conversions/', {
-          method: 'POST',
-          headers: {
-            'Content-Type': 'application/json',
-          },
-          body: JSON.stringify({
-            id: file.id,
-            input_format: inputFormat,
-            output_format: selectedFormat,
-          }),
-        })
+      const batch = await waitForBatch(await response.json(), (progress) =>
+        setFinishedIds(new Set(
+          progress.jobs
+            .filter((job) => job.status !== 'queued' && job.status !== 'running')
+            .map((job) => job.original_file_id)
+        ))
+      )
 
-        if (!response.ok) {
-          throw new Error(`Conversion failed for ${file.original_filename}: ${response.statusText}`)
+      const failures: string[] = []
+      for (const job of batch.jobs) {
+        const file = filesById.get(job.original_file_id)
+        if (!file) continue
+        if (job.status !== 'completed' || !job.result) {
+          failures.push(`${file.original_filename}: ${job.error || 'unknown error'}`)
+          continue
         }
 
-        const data = await response.json()
+        const data = job.result
         const conversionInfo: ConversionInfo = {
           id: data.id,
           original_filename: data.original_filename,
@@ -174,15 +306,18 @@ function Converter() {
           file,
           conversion: conversionInfo,
         })
-      } catch (err) {
-        setError(err instanceof Error ? err.message : 'Conversion failed')
       }
+      if (failures.length > 0) {
+        setError(`Conversion failed for ${failures.join('; ')}`)
+      }
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Conversion failed')
     }
 
     setCompletedConversions((prev) => [...newCompletedConversions, ...prev])
     setPendingFiles([])
     setConverting(false)
-    setConvertingIndex(null)
+    setFinishedIds(new Set())
   }
 
   const handleDownload = async (conversion: ConversionInfo) => {
@@ -299,9 +434,9 @@ function Converter() {
               Pending Conversions ({pendingFiles.length})
             </h2>
             <div className="space-y-3 mb-4">
-              {pendingFiles.map((pf, index) => (
+              {pendingFiles.map((pf) => (
                 <div key={pf.file.id} className="relative">
-                  {converting && convertingIndex === index && (
+                  {converting && !finishedIds.has(pf.file.id) && (
                     <div className="absolute inset-0 bg-surface-dark/50 rounded-lg flex items-center justify-center z-10">
                       <span className="text-sm text-primary font-medium">Converting...</span>
                     </div>
@@ -323,7 +458,7 @@ function Converter() {
               className="w-full bg-primary hover:bg-primary-dark text-text font-semibold py-3 px-6 rounded-lg transition duration-200 shadow-md hover:shadow-lg disabled:opacity-50 disabled:cursor-not-allowed"
             >
               {converting
-                ? `Converting ${(convertingIndex ?? 0) + 1} of ${pendingFiles.length}...`
+                ? `Converted ${finishedIds.size} of ${pendingFiles.length}...`
                 : `Convert ${pendingFiles.length} File${pendingFiles.length > 1 ? 's' : ''}`}
             </button>
           </div>
@@ -3,6 +3,8 @@ import { useNavigate } from 'react-router-dom'
 import { FaCheckSquare, FaSquare } from 'react-icons/fa'
 import FileListItem, { FileInfo } from '../components/FileListItem'
 
+const PAGE_SIZE = 100
+
 function Files() {
   const [files, setFiles] = useState<FileInfo[]>([])
   const [loading, setLoading] = useState(true)
@@ -10,24 +12,38 @@ function Files() {
   const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set())
   const [deletingId, setDeletingId] = useState<string | null>(null)
   const [deletingSelected, setDeletingSelected] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
   const navigate = useNavigate()
 
+  const fetchFiles = async (cursor: string | null = null) => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) })
+    if (cursor) params.set('cursor', cursor)
+    const response = await fetch(`/api/files/?${params}`)
+    if (!response.ok) throw new Error('Failed to fetch files')
+    const data = await response.json()
+    setFiles(prev => cursor ? [...prev, ...data.files] : data.files)
+    setNextCursor(data.next_cursor ?? null)
+  }
+
   useEffect(() => {
-    const fetchFiles = async () => {
-      try {
-        const response = await fetch('/api/files/')
-        if (!response.ok) throw new Error('Failed to fetch files')
-        const data = await response.json()
-        setFiles(data.files)
-      } catch (err) {
-        setError(err instanceof Error ? err.message : 'Failed to load files')
-      } finally {
-        setLoading(false)
-      }
-    }
     fetchFiles()
+      .catch(err => setError(err instanceof Error ? err.message : 'Failed to load files'))
+      .finally(() => setLoading(false))
   }, [])
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      await fetchFiles(nextCursor)
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load files')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleDelete = async (fileId: string) => {
     setDeletingId(fileId)
     try {
@@ -160,11 +176,23 @@ function Files() {
                     onDelete={() => handleDelete(file.id)}
                     isDeleting={deletingId === file.id}
                     isPending={true}
+                    previewId={file.id}
                   />
                 </div>
               </div>
             ))}
             </div>
+            {nextCursor && (
+              <div className="mt-4 flex justify-center">
+                <button
+                  onClick={handleLoadMore}
+                  disabled={loadingMore}
+                  className="bg-surface-light hover:bg-surface-dark text-text-muted hover:text-text text-sm font-medium py-1.5 px-4 rounded-lg transition duration-200 disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {loadingMore ? 'Loading...' : 'Load More'}
+                </button>
+              </div>
+            )}
           </>
         )}
       </div>
@@ -21,6 +21,8 @@ interface ConversionRecord {
   original_file?: OriginalFileInfo
 }
 
+const PAGE_SIZE = 100
+
 function History() {
   const [conversions, setConversions] = useState<ConversionRecord[]>([])
   const [loading, setLoading] = useState(true)
@@ -30,23 +32,37 @@ function History() {
   const [selectedIds, setSelectedIds] = useState<Set<string>>(new Set())
   const [deletingSelected, setDeletingSelected] = useState(false)
   const [downloadingSelected, setDownloadingSelected] = useState(false)
+  const [nextCursor, setNextCursor] = useState<string | null>(null)
+  const [loadingMore, setLoadingMore] = useState(false)
+
+  const fetchConversions = async (cursor: string | null = null) => {
+    const params = new URLSearchParams({ limit: String(PAGE_SIZE) })
+    if (cursor) params.set('cursor', cursor)
+    const response = await fetch(`/api/conversions/complete?${params}`)
+    if (!response.ok) throw new Error('Failed to fetch conversions')
+    const data = await response.json()
+    setConversions(prev => cursor ? [...prev, ...data.conversions] : data.conversions)
+    setNextCursor(data.next_cursor ?? null)
+  }
 
   useEffect(() => {
-    const fetchConversions = async () => {
-      try {
-        const response = await fetch('/api/conversions/complete')
-        if (!response.ok) throw new Error('Failed to fetch conversions')
-        const data = await response.json()
-        setConversions(data.conversions)
-      } catch (err) {
-        setError(err instanceof Error ? err.message : 'Failed to load conversions')
-      } finally {
-        setLoading(false)
-      }
-    }
     fetchConversions()
+      .catch(err => setError(err instanceof Error ? err.message : 'Failed to load conversions'))
+      .finally(() => setLoading(false))
   }, [])
 
+  const handleLoadMore = async () => {
+    if (!nextCursor) return
+    setLoadingMore(true)
+    try {
+      await fetchConversions(nextCursor)
+    } catch (err) {
+      setError(err instanceof Error ? err.message : 'Failed to load conversions')
+    } finally {
+      setLoadingMore(false)
+    }
+  }
+
   const handleDownload = async (conversion: ConversionRecord) => {
     setDownloadingId(conversion.id)
     try {
@@ -136,35 +152,36 @@ function History() {
     setError(null)
 
     const conversionsToDownload = sortedConversions.filter(c => selectedIds.has(c.id))
-    for (const conversion of conversionsToDownload) {
-      try {
-        const response = await fetch(`/api/files/${conversion.id}`)
-        if (!response.ok) throw new Error('Download failed')
-
-        const blob = await response.blob()
-        const url = window.URL.createObjectURL(blob)
-        const a = document.createElement('a')
-        a.href = url
-
-        let filename = conversion.original_filename || 'download'
-        const lastDotIndex = filename.lastIndexOf('.')
-        if (lastDotIndex > 0) {
-          filename = filename.substring(0, lastDotIndex)
-        }
-        filename += conversion.extension || ''
+    if (conversionsToDownload.length === 1) {
+      await handleDownload(conversionsToDownload[0])
+      setDownloadingSelected(false)
+      return
+    }
 
-        a.download = filename
-        document.body.appendChild(a)
-        a.click()
-        window.URL.revokeObjectURL(url)
-        document.body.removeChild(a)
-        
-        // Small delay between downloads to avoid browser blocking
-        await new Promise(resolve => setTimeout(resolve, 300))
-      } catch (err) {
-        setError(err instanceof Error ? err.message : 'Download failed')
-      }
+    // Several files come back as one ZIP archive the server streams as it builds. Submitting a
+    // form lets the browser save it straight to disk, fetch() would hold all of it in memory.
+    // The form targets a hidden frame so an error response does not replace the page.
+    let frame = document.querySelector<HTMLIFrameElement>('iframe[name="archive-download"]')
+    if (!frame) {
+      frame = document.createElement('iframe')
+      frame.name = 'archive-download'
+      frame.style.display = 'none'
+      document.body.appendChild(frame)
     }
+    const form = document.createElement('form')
+    form.method = 'POST'
+    form.action = '/api/files/archive/form'
+    form.target = frame.name
+    for (const conversion of conversionsToDownload) {
+      const input = document.createElement('input')
+      input.type = 'hidden'
+      input.name = 'ids'
+      input.value = conversion.id
+      form.appendChild(input)
+    }
+    document.body.appendChild(form)
+    form.submit()
+    document.body.removeChild(form)
 
     setDownloadingSelected(false)
   }
@@ -261,12 +278,24 @@ function History() {
                       isDeleting={deletingId === conversion.id}
                       isDownloading={downloadingId === conversion.id}
                       isPending={false}
+                      previewId={conversion.id}
                     />
                   </div>
                 </div>
               )
             })}
             </div>
+            {nextCursor && (
+              <div className="mt-4 flex justify-center">
+                <button
+                  onClick={handleLoadMore}
+                  disabled={loadingMore}
+                  className="bg-surface-light hover:bg-surface-dark text-text-muted hover:text-text text-sm font-medium py-1.5 px-4 rounded-lg transition duration-200 disabled:opacity-50 disabled:cursor-not-allowed"
+                >
+                  {loadingMore ? 'Loading...' : 'Load More'}
+                </button>
+              </div>
+            )}
           </>
         )}
       </div>